@@ -0,0 +1,193 @@
+# pipeline/batch_runner.py
+"""Produce many videos in one run from a jobs file.
+Each job names a topic, a prompt template, a voice and a format (``long``
+or ``shorts``). Jobs run through a bounded worker pool, each as its own
+stage graph (see ``dag_runner``) in ``<output-dir>/<name>/`` with its own
+build manifest, while sharing one OpenAI client, one pooled HTTP session
+and one Pexels rate limiter. A failed job is reported and the rest carry on.
+
+Jobs file (JSON list, or ``{"jobs": [...]}``)::
+
+    [
+      {"name": "discipline", "topic": "discipline", "format": "long",
+       "prompt": "Write a 2000-word motivational script about {topic}.",
+       "voice": "en-US-DavisNeural", "keywords": ["runner at dawn"], "upload": false},
+      {"name": "gratitude", "topic": "gratitude", "format": "shorts"}
+    ]
+
+Only ``topic`` is required. Without a ``prompt`` the format's default prompt
+is used with the topic appended. ``{topic}`` in a prompt is replaced.
+
+Jobs with ``"upload": true`` hand their video to the background upload
+queue (see ``upload_queue``), so no job waits on the network.
+
+With ``--prefetch-llm`` every job's script and metadata requests are first
+sent together (see ``llm_batch``), so the stage graphs find them cached.
+
+    python -m pipeline.batch_runner jobs.json [--output-dir output/batch] [--workers N]
+                                    [--prefetch-llm concurrent|batch]
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .build_manifest import BuildManifest
+from .config import BATCH_WORKERS, PEXELS_CONCURRENCY
+from .dag_runner import long_form_stages, run_stages, shorts_stages
+
+FORMATS = ("long", "shorts")
+
+
+def load_jobs(path: Path):
+    """Read and validate a jobs file; returns a list of job dicts."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    seen = set()
+    for i, job in enumerate(jobs):
+        if not job.get("topic"):
+            raise RuntimeError(f"Job {i + 1} has no topic")
+        job.setdefault("name", f"job{i + 1}")
+        job.setdefault("format", "long")
+        if job["format"] not in FORMATS:
+            raise RuntimeError(f"Job {job['name']}: unknown format {job['format']!r}")
+        if job["name"] in seen:
+            raise RuntimeError(f"Duplicate job name: {job['name']}")
+        seen.add(job["name"])
+    return jobs
+
+
+def job_prompt(job: dict) -> str:
+    """The job's prompt with ``{topic}`` filled in (default: the format's prompt plus the topic)."""
+    if job.get("prompt"):
+        return job["prompt"].replace("{topic}", job["topic"])
+    if job["format"] == "shorts":
+        from .shorts_script_generator import PROMPT
+    else:
+        from .script_generator import PROMPT
+    return f"{PROMPT}\nTopic: {job['topic']}\n"
+
+
+def shared_clients(workers: int) -> dict:
+    """One OpenAI client, HTTP session and Pexels rate limiter for every job."""
+    from .llm_client import make_client
+    from .pexels_downloader import make_session
+    from .rate_limiter import RateLimitedScheduler
+    return {
+        "openai": make_client(),
+        "session": make_session(PEXELS_CONCURRENCY * max(workers, 1)),
+        "scheduler": RateLimitedScheduler(burst=PEXELS_CONCURRENCY),
+    }
+
+
+def job_stages(job: dict, output_dir: Path, clients: dict):
+    overrides = {
+        "prompt": job_prompt(job),
+        "voice": job.get("voice"),
+        "keywords": job.get("keywords"),
+        "clients": clients,
+    }
+    if job["format"] == "shorts":
+        return shorts_stages(output_dir, **overrides)
+    return long_form_stages(output_dir, upload=job.get("upload", False), queue_upload=True, **overrides)
+
+
+def run_job(job: dict, root: Path, clients: dict):
+    """Run one job's stage graph; returns ``(stages, error)``, never raises."""
+    output_dir = root / job["name"]
+    stages = []
+    try:
+        stages = job_stages(job, output_dir, clients)
+        manifest = BuildManifest(output_dir / f"manifest_{job['format']}.json")
+        run_stages(stages, manifest=manifest, label=job["name"])
+        return stages, None
+    except Exception as e:
+        print(f"❌ Job {job['name']} failed: {e}")
+        return stages, e
+
+
+def run_batch(jobs, output_dir: Path = Path("output/batch"), workers: int = BATCH_WORKERS, clients: dict = None):
+    """Run ``jobs`` at most ``workers`` at a time; returns ``{name: (stages, error)}``."""
+    workers = max(1, min(workers, len(jobs) or 1))
+    clients = clients if clients is not None else shared_clients(workers)
+    results, spans = {}, {}
+    lock = threading.Lock()
+    print(f"🚀 Batch of {len(jobs)} job(s), {workers} at a time")
+    origin = time.perf_counter()
+
+    def work(job):
+        began = time.perf_counter()
+        outcome = run_job(job, output_dir, clients)
+        with lock:
+            results[job["name"]] = outcome
+            spans[job["name"]] = (began, time.perf_counter())
+            status = "failed" if outcome[1] else "done"
+            print(f"{'❌' if outcome[1] else '✓'} Job {job['name']} {status} ({len(results)}/{len(jobs)})")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(work, jobs))
+    batch_report(results, time.perf_counter() - origin, workers, spans)
+    return results
+
+
+def batch_report(results: dict, wall: float, workers: int, spans: dict = None):
+    """Print throughput, how full the worker slots were and where the time went.
+
+    A job holds one worker slot from start to finish, so slot occupancy is
+    the summed job wall time over ``wall * workers``. Stages of one job can
+    run in parallel inside that slot, so per-stage seconds are shown as a
+    share of all stage time, not of the slots.
+    """
+    done = [name for name, (_, error) in results.items() if error is None]
+    failed = [name for name, (_, error) in results.items() if error is not None]
+    busy, counts = {}, {}
+    for stages, _ in results.values():
+        for stage in stages:
+            busy[stage.name] = busy.get(stage.name, 0.0) + stage.seconds
+            if stage.status in ("done", "cached"):
+                counts[stage.name] = counts.get(stage.name, 0) + 1
+    print("\n📊 Batch summary")
+    print(f"  {len(done)} done, {len(failed)} failed in {wall:.1f}s "
+          f"→ {len(done) * 3600 / max(wall, 1e-9):.1f} videos/hour")
+    if failed:
+        print(f"  failed: {', '.join(failed)}")
+    if spans:
+        occupied = sum(end - start for start, end in spans.values())
+        print(f"  worker slots {occupied / max(wall * workers, 1e-9):.0%} occupied "
+              f"({occupied:.1f}s of {wall:.1f}s × {workers})")
+    total = max(sum(busy.values()), 1e-9)
+    print(f"  {'stage':12s} {'busy':>9s} {'runs':>5s} {'share':>6s}")
+    for name, seconds in sorted(busy.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:12s} {seconds:8.1f}s {counts.get(name, 0):5d} {seconds / total:6.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Produce a batch of videos from a jobs file.")
+    parser.add_argument("jobs", type=Path, help="JSON list of jobs")
+    parser.add_argument("--output-dir", type=Path, default=Path("output/batch"))
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="jobs running at once")
+    parser.add_argument("--llm-cache", choices=["read", "refresh", "offline", "off"], default=None,
+                        help="LLM response cache mode (default: LLM_CACHE_MODE)")
+    parser.add_argument("--prefetch-llm", choices=["concurrent", "batch"], default=None,
+                        help="send all script/metadata requests up front")
+    args = parser.parse_args()
+
+    if args.llm_cache:
+        from .llm_client import set_mode
+        set_mode(args.llm_cache)
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, json.JSONDecodeError, RuntimeError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    if args.prefetch_llm:
+        from .llm_batch import prefetch
+        try:
+            prefetch(jobs, args.output_dir, args.prefetch_llm)
+        except Exception as e:  # e.g. a batch that expired or an unreachable API
+            print(f"⚠ LLM prefetch failed ({e}); each job will call the API itself")
+    results = run_batch(jobs, args.output_dir, args.workers)
+    if any(error is not None for _, error in results.values()):
+        raise SystemExit(1)
@@ -0,0 +1,114 @@
+# pipeline/build_manifest.py
+"""Content-hash build manifest that lets unchanged pipeline stages be skipped.
+For every stage the manifest records a fingerprint of what went in
+(parameters such as keywords, voice settings and config values, the source
+of the modules doing the work, and the hashes of upstream artifacts) and
+the hashes of what came out. A stage whose fingerprint matches the last
+successful run, and whose outputs are still on disk, is reported as
+"cached" instead of being run again, like make or a build cache.
+
+Outputs edited by hand since the last run (say, a tweaked ``script.txt``)
+are kept rather than regenerated. Their new hashes flow into the
+fingerprints of downstream stages, which then run again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from .image_store import file_sha256
+
+PACKAGE_DIR = Path(__file__).parent
+
+
+def path_digest(path: Path):
+    """SHA-256 of a file, or of a directory's relative names and file hashes.
+    Returns ``None`` for a missing path. Hidden files are ignored.
+    """
+    path = Path(path)
+    if path.is_file():
+        return file_sha256(path)
+    if not path.is_dir():
+        return None
+    digest = hashlib.sha256()
+    for child in sorted(path.rglob("*")):
+        rel = child.relative_to(path)
+        if child.is_file() and not any(part.startswith(".") for part in rel.parts):
+            digest.update(f"{rel.as_posix()}\0{file_sha256(child)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def source_digest(module: str) -> str:
+    """Hash of a ``pipeline`` module's source, so code and prompt edits invalidate stages."""
+    return file_sha256(PACKAGE_DIR / f"{module}.py")
+
+
+class BuildManifest:
+    """Per-run record of stage fingerprints and output hashes.
+
+    Args:
+        path (Path): JSON file holding the manifest (e.g. ``output/manifest_long.json``).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stages = self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")).get("stages", {})
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stages": self._stages}, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def fingerprint(stage) -> str:
+        """Hash of a stage's parameters, source modules and input artifacts."""
+        spec = {
+            "params": stage.params,
+            "sources": {m: source_digest(m) for m in stage.sources},
+            "inputs": {str(p): path_digest(p) for p in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def lookup(self, stage, fingerprint: str):
+        """``"cached"`` if the stage can be skipped, ``"edited"`` if it can be
+        skipped but its outputs changed by hand, else ``None``.
+        """
+        with self._lock:
+            entry = self._stages.get(stage.name)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        outputs = {str(p): path_digest(p) for p in stage.outputs}
+        if any(digest is None for digest in outputs.values()):
+            return None
+        if outputs != entry["outputs"]:
+            self.record(stage, fingerprint, outputs)
+            return "edited"
+        return "cached"
+
+    def record(self, stage, fingerprint: str, outputs: dict = None):
+        """Store a successful run of ``stage``."""
+        if outputs is None:
+            outputs = {str(p): path_digest(p) for p in stage.outputs}
+        with self._lock:
+            self._stages[stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": outputs,
+                "finished": time.time(),
+            }
+            self._save()
+
+    def forget(self, name: str):
+        with self._lock:
+            if self._stages.pop(name, None) is not None:
+                self._save()
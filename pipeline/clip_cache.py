@@ -0,0 +1,123 @@
+# pipeline/clip_cache.py
+"""Per-slide encoded clip cache for incremental re-renders.
+Each slide (image content + duration + effect + resolution + encoder
+settings) is encoded once into a short clip named by a content hash. The
+final video is a stream-copy concatenation of the cached clips plus a fresh
+audio mux, so swapping 5 of 400 images re-encodes 5 clips.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .config import CACHE_DIR, IMAGE_DURATION_SECONDS, RENDER_WORKERS, VIDEO_RESOLUTION
+from .image_normalizer import normalize_images, normalized_dir
+from .image_store import file_sha256
+from .video_assembler import (
+    FPS,
+    SEGMENT_CODEC_ARGS,
+    ZOOM_EXPR,
+    mux_segments,
+    run_ffmpeg,
+)
+
+
+class ClipCache:
+    """Directory of encoded slide clips keyed by a hash of everything that affects them.
+
+    Args:
+        root (Path): Cache directory (default: ``<CACHE_DIR>/clips``).
+        resolution (str): Output ``WxH`` of every clip.
+        duration (int): Seconds per slide.
+    """
+
+    def __init__(self, root: Path = None, resolution: str = VIDEO_RESOLUTION, duration: int = IMAGE_DURATION_SECONDS):
+        self.root = Path(root) if root else Path(CACHE_DIR) / "clips"
+        self.resolution = resolution
+        self.duration = duration
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def slide_filter(self) -> str:
+        return (
+            f"zoompan=z='{ZOOM_EXPR}':d={self.duration * FPS}"
+            f":s={self.resolution}:fps={FPS},format=yuv420p"
+        )
+
+    def key(self, image: Path) -> str:
+        """Content hash of the image plus every render setting."""
+        spec = {
+            "image": file_sha256(image),
+            "duration": self.duration,
+            "effect": self.slide_filter(),
+            "resolution": self.resolution,
+            "encoder": SEGMENT_CODEC_ARGS,
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def clip_path(self, image: Path) -> Path:
+        key = self.key(image)
+        return self.root / key[:2] / f"{key}.mp4"
+
+    def encode(self, image: Path, clip: Path):
+        """Encode one slide into ``clip`` (written to a temp name, then renamed)."""
+        clip.parent.mkdir(parents=True, exist_ok=True)
+        tmp = clip.with_name(f"{clip.stem}.{os.getpid()}.{threading.get_ident()}.tmp.mp4")
+        cmd = [
+            "ffmpeg", "-y", "-v", "error",
+            "-i", str(image),
+            "-vf", self.slide_filter(),
+            *SEGMENT_CODEC_ARGS,
+            "-threads", "1", "-an", str(tmp),
+        ]
+        try:
+            run_ffmpeg(cmd)
+        except RuntimeError:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, clip)
+
+    def clips_for(self, images, workers: int = RENDER_WORKERS):
+        """Return one clip per image, encoding only the ones not yet cached."""
+        clips = [self.clip_path(img) for img in images]
+        missing = {}
+        for img, clip in zip(images, clips):
+            if not clip.exists():
+                missing.setdefault(clip, img)
+        print(f"  clip cache: {len(images) - len(missing)} hit(s), {len(missing)} to encode")
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+                list(pool.map(lambda item: self.encode(item[1], item[0]), missing.items()))
+        return clips
+
+
+def assemble_video_incremental(
+    image_dir: Path = Path("output/images"),
+    audio_path: Path = Path("output/audio.mp3"),
+    output_path: Path = Path("output/final_video.mp4"),
+    workers: int = RENDER_WORKERS,
+    cache: ClipCache = None,
+):
+    """Build the final video from cached per-slide clips.
+    Errors are raised as ``RuntimeError``.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    sources = sorted(image_dir.glob("*.jpg"))
+    if not sources:
+        raise RuntimeError(f"No images found in {image_dir}")
+    cache = cache or ClipCache()
+    images = normalize_images(sources, normalized_dir(image_dir, cache.resolution, "crop"), cache.resolution, fit="crop")
+
+    started = time.perf_counter()
+    clips = cache.clips_for(images, workers)
+    print(f"  clips ready in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    mux_segments(clips, audio_path, output_path)
+    print(f"  concat + audio mux: {time.perf_counter() - started:.1f}s")
+    print(f"Video assembled at {output_path}")
+
+
+if __name__ == "__main__":
+    assemble_video_incremental()
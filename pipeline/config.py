@@ -15,3 +15,39 @@ IMAGE_DURATION_SECONDS = 3  # 3 seconds per image as requested
 VIDEO_RESOLUTION = "1920x1080"
 BACKGROUND_MUSIC_PATH = "assets/background.mp3"
 BEAT_DROP_TIMESTAMP = 120
+
+# Pexels fetching
+PEXELS_CONCURRENCY = int(os.getenv("PEXELS_CONCURRENCY", "8"))  # parallel searches/downloads
+PEXELS_SEARCH_TTL_HOURS = float(os.getenv("PEXELS_SEARCH_TTL_HOURS", "168"))  # 0 disables the search cache
+PEXELS_MAX_RPS = float(os.getenv("PEXELS_MAX_RPS", "5"))  # request rate while the quota is comfortable
+PEXELS_LOW_WATER = int(os.getenv("PEXELS_LOW_WATER", "200"))  # remaining quota below which requests are paced
+
+# Local caches shared across runs
+CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", ".cache")
+IMAGE_STORE_MAX_MB = int(os.getenv("IMAGE_STORE_MAX_MB", "4096"))  # LRU-evicted above this
+
+# Rendering
+SHORTS_RESOLUTION = "1080x1920"
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", str(os.cpu_count() or 4)))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "4"))  # parallel encode segments; 1 = single pass
+
+# Text-to-speech
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))  # chunks synthesized at once
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "1000"))  # max characters per chunk
+TTS_CHUNK_GAP_SECONDS = float(os.getenv("TTS_CHUNK_GAP_SECONDS", "0.3"))  # silence between chunks
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "1024"))  # synthesized segments, LRU-evicted above this
+
+# LLM responses: read | refresh | offline | off (see llm_client)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "read")
+SEO_DIGEST_TOKENS = int(os.getenv("SEO_DIGEST_TOKENS", "300"))  # script digest sent with metadata prompts
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. a local stand-in server; unset = api.openai.com
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))  # batched requests in flight at once
+
+# YouTube upload
+YOUTUBE_UPLOAD_URL = os.getenv("YOUTUBE_UPLOAD_URL", "https://www.googleapis.com/upload/youtube/v3/videos")
+UPLOAD_CHUNK_SECONDS = float(os.getenv("UPLOAD_CHUNK_SECONDS", "8"))  # chunks are sized to take about this long
+UPLOAD_QUEUE_DIR = os.getenv("UPLOAD_QUEUE_DIR", "output/upload_queue")  # background upload queue and spool
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))  # API units per day (an upload costs 1600)
+
+# Batch runs
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))  # videos produced at once
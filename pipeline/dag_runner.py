@@ -0,0 +1,503 @@
+# pipeline/dag_runner.py
+"""Run the pipeline stages as a dependency graph instead of a fixed sequence.
+Each stage declares the stages it depends on and the files it reads and
+writes. A stage starts as soon as all of its dependencies have finished, so
+independent branches (images, voice, SEO) run side by side and a video
+takes about as long as its longest branch. A critical-path timing report is
+printed at the end.
+
+Runs are recorded in a build manifest (see ``build_manifest``). By default
+every stage runs, so each run makes a new video. With ``--incremental`` a
+stage whose inputs, parameters and code are unchanged since its last
+successful run is skipped as "cached" (e.g. to resume after a failure or
+re-render after editing the script).
+
+    python -m pipeline.dag_runner [long|shorts|custom] [--no-upload] [--workers N]
+                                  [--incremental] [--rebuild STAGE ...] [--no-manifest]
+                                  [--stream-voice] [--queue-upload]
+                                  [--llm-cache read|refresh|offline|off]
+"""
+import argparse
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from .build_manifest import BuildManifest, path_digest
+from .config import (
+    BACKGROUND_MUSIC_PATH,
+    BEAT_DROP_TIMESTAMP,
+    IMAGE_DURATION_SECONDS,
+    SHORTS_RESOLUTION,
+    TTS_CHUNK_CHARS,
+    TTS_CHUNK_GAP_SECONDS,
+    VIDEO_RESOLUTION,
+)
+
+MTIME_SLACK = 2.0  # seconds; file systems with coarse timestamps round mtimes down
+
+
+class Stage:
+    """One node of the pipeline graph.
+
+    Args:
+        name (str): Unique stage name.
+        run (callable): Zero-argument function doing the work.
+        deps (tuple[str]): Stages that must finish first.
+        inputs (tuple[Path]): Files that must exist before ``run`` is called.
+        outputs (tuple[Path]): Files ``run`` must produce.
+        params (dict): Settings that change the result (keywords, voice, config values).
+        sources (tuple[str]): ``pipeline`` modules whose code changes the result.
+        still_valid (callable): Returns ``False`` when a recorded run no longer
+            holds (e.g. its queued upload failed later), so it runs again.
+    """
+
+    def __init__(self, name: str, run, deps=(), inputs=(), outputs=(), params=None, sources=(), still_valid=None):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.inputs = tuple(Path(p) for p in inputs)
+        self.outputs = tuple(Path(p) for p in outputs)
+        self.params = params or {}
+        self.sources = tuple(sources)
+        self.still_valid = still_valid
+        self.start = None
+        self.end = None
+        self.status = "pending"
+        self.error = None
+
+    @property
+    def seconds(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+def check_graph(stages):
+    """Raise ``RuntimeError`` on duplicate names, unknown dependencies or cycles."""
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise RuntimeError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise RuntimeError(f"Stage {stage.name} depends on unknown stage {dep}")
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in visiting:
+            raise RuntimeError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return by_name
+
+
+def _written_since(path: Path, began: float) -> bool:
+    """Whether ``path`` was (re)written after ``began``; a directory must also be non-empty.
+    Some generators print an error and return instead of raising, which
+    would otherwise leave a previous run's file looking like a fresh result.
+    """
+    if path.is_dir() and not any(path.iterdir()):
+        return False
+    return path.stat().st_mtime >= began - MTIME_SLACK
+
+
+def _execute(stage: Stage, origin: float, manifest: BuildManifest = None, force: bool = False):
+    """Run one stage (or reuse it from ``manifest``); returns ``done``, ``cached`` or ``edited``."""
+    missing = [str(p) for p in stage.inputs if not p.exists()]
+    if missing:
+        raise RuntimeError(f"Missing inputs for {stage.name}: {', '.join(missing)}")
+    stage.start = time.perf_counter() - origin
+    fingerprint = None
+    if manifest is not None:
+        fingerprint = manifest.fingerprint(stage)
+        hit = None if force else manifest.lookup(stage, fingerprint)
+        if hit and stage.still_valid is not None and not stage.still_valid():
+            hit = None
+        if hit:
+            stage.end = time.perf_counter() - origin
+            return hit
+    began = time.time()
+    for path in stage.outputs:
+        # Write new files rather than into the old ones: a queued upload may hard-link them
+        if path.is_file():
+            path.unlink()
+    try:
+        if force:
+            # A forced stage must not replay the LLM answer its last run got
+            from .llm_client import fresh_responses
+            with fresh_responses():
+                stage.run()
+        else:
+            stage.run()
+    finally:
+        stage.end = time.perf_counter() - origin
+    missing = [str(p) for p in stage.outputs if not p.exists()]
+    if missing:
+        raise RuntimeError(f"Stage {stage.name} did not produce: {', '.join(missing)}")
+    stale = [str(p) for p in stage.outputs if not _written_since(p, began)]
+    if stale:
+        raise RuntimeError(f"Stage {stage.name} left stale output from an earlier run: {', '.join(stale)}")
+    if manifest is not None:
+        manifest.record(stage, fingerprint)
+    return "done"
+
+
+def run_stages(stages, max_workers: int = None, manifest: BuildManifest = None, force=(), label: str = ""):
+    """Run ``stages`` as soon as their dependencies finish; return the stages.
+    With a ``manifest``, stages whose fingerprint is unchanged are skipped
+    as cached; names in ``force`` always run, with fresh LLM answers. Stages downstream of a failure
+    are skipped. Errors are raised as ``RuntimeError`` after the timing report.
+    ``label`` prefixes progress lines when several pipelines share a console.
+    """
+    by_name = check_graph(stages)
+    tag = f"[{label}] " if label else ""
+    origin = time.perf_counter()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as pool:
+        while True:
+            for stage in stages:
+                if stage.status != "pending":
+                    continue
+                dep_status = {by_name[d].status for d in stage.deps}
+                if dep_status & {"failed", "skipped"}:
+                    stage.status = "skipped"
+                    print(f"{tag}⏭ {stage.name} skipped (upstream failure)")
+                elif dep_status <= {"done", "cached"}:
+                    stage.status = "running"
+                    print(f"{tag}▶ {stage.name} started")
+                    running[pool.submit(_execute, stage, origin, manifest, stage.name in force)] = stage
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    result = future.result()
+                    if result == "done":
+                        stage.status = "done"
+                        print(f"{tag}✓ {stage.name} finished in {stage.seconds:.1f}s")
+                    else:
+                        stage.status = "cached"
+                        note = " (hand-edited output kept)" if result == "edited" else ""
+                        print(f"{tag}⏸ {stage.name} cached{note}")
+                except Exception as e:
+                    stage.status = "failed"
+                    stage.error = e
+                    print(f"{tag}❌ {stage.name} failed: {e}")
+    wall = time.perf_counter() - origin
+    report(stages, wall, label)
+    failed = [s.name for s in stages if s.status == "failed"]
+    if failed:
+        raise RuntimeError(f"Pipeline failed in: {', '.join(failed)}")
+    return stages
+
+
+def critical_path(stages):
+    """The chain of stages that determined the finish time, in run order."""
+    by_name = {s.name: s for s in stages}
+    timed = [s for s in stages if s.end is not None]
+    if not timed:
+        return []
+    stage = max(timed, key=lambda s: s.end)
+    path = [stage]
+    while True:
+        deps = [by_name[d] for d in stage.deps if by_name[d].end is not None]
+        if not deps:
+            break
+        stage = max(deps, key=lambda s: s.end)
+        path.append(stage)
+    return path[::-1]
+
+
+def report(stages, wall: float, label: str = ""):
+    path = critical_path(stages)
+    on_path = {s.name for s in path}
+    print(f"\n📊 Stage timings{f' ({label})' if label else ''}")
+    for stage in sorted(stages, key=lambda s: (s.start is None, s.start or 0)):
+        if stage.start is None:
+            print(f"  {stage.name:12s} {stage.status}")
+            continue
+        marker = "*" if stage.name in on_path else " "
+        print(f"  {stage.name:12s} {stage.start:7.1f}s → {stage.end:7.1f}s  {stage.seconds:7.1f}s {marker} {stage.status}")
+    total = sum(s.seconds for s in stages)
+    print(f"  critical path (*): {' → '.join(s.name for s in path)} = {sum(s.seconds for s in path):.1f}s")
+    print(f"  wall clock {wall:.1f}s vs {total:.1f}s if run in sequence")
+
+
+# --- Pipelines ---------------------------------------------------------------
+
+def voice_params(module: str, voice_name: str = None) -> dict:
+    """Voice settings of a voice generator module, for stage fingerprints."""
+    from importlib import import_module
+    voice = import_module(f".{module}", __package__)
+    return {
+        "voice": voice_name or voice.VOICE,
+        "rate": voice.RATE,
+        "pitch": voice.PITCH,
+        "chunk_chars": TTS_CHUNK_CHARS,
+        "chunk_gap": TTS_CHUNK_GAP_SECONDS,
+    }
+
+
+def prompt_params(prompt: str, default: str) -> dict:
+    """Fingerprint params for a script prompt; the module default is covered by its source hash."""
+    return {} if prompt == default else {"prompt": prompt}
+
+
+def render_params(resolution: str) -> dict:
+    """Render settings (and the background music) for stage fingerprints."""
+    return {
+        "resolution": resolution,
+        "image_seconds": IMAGE_DURATION_SECONDS,
+        "beat_drop": BEAT_DROP_TIMESTAMP,
+        "music": path_digest(Path(BACKGROUND_MUSIC_PATH)),
+    }
+
+
+def upload_stage(video: Path, metadata: Path, receipt: Path, deps, queued: bool = False):
+    """Upload stage; writes ``receipt`` so a finished upload is never repeated.
+    With ``queued`` the video is handed to the background upload queue (see
+    ``upload_queue``) and the stage finishes without waiting for the network.
+    """
+
+    def run_upload():
+        if queued:
+            from .upload_queue import UploadQueue, ensure_worker
+            queue = UploadQueue()
+            item_id = queue.add(video, metadata)
+            ensure_worker(queue)
+            receipt.write_text(json.dumps({"queued": item_id}), encoding="utf-8")
+            return
+        from .youtube_uploader import upload_video
+        video_id = upload_video(video, metadata)
+        if not video_id:
+            raise RuntimeError("Upload did not complete")
+        receipt.write_text(json.dumps({"video_id": video_id}), encoding="utf-8")
+
+    def upload_held():
+        """A queued upload only counts while the queue has not given up on it."""
+        try:
+            item_id = json.loads(receipt.read_text(encoding="utf-8")).get("queued")
+        except (OSError, json.JSONDecodeError):
+            return False
+        if item_id is None:
+            return True
+        from .upload_queue import UploadQueue
+        item = UploadQueue().item(item_id)
+        if item is not None and item["status"] != "failed":
+            return True
+        print(f"⚠ Queued upload #{item_id} failed ({item['error'] if item else 'not in queue'}); queuing again")
+        return False
+
+    return Stage(
+        "upload", run_upload, deps=deps, inputs=[video, metadata], outputs=[receipt],
+        sources=["youtube_uploader", "resumable_upload", "upload_queue"], still_valid=upload_held,
+    )
+
+
+def long_form_stages(output_dir: Path = Path("output"), upload: bool = True, prompt: str = None,
+                     voice: str = None, keywords=None, clients: dict = None, stream_voice: bool = False,
+                     queue_upload: bool = False):
+    """script → {voice, seo}, images → assemble → upload.
+    ``prompt``, ``voice`` and ``keywords`` override the module defaults;
+    ``clients`` holds shared ``openai``/``session``/``scheduler`` objects
+    (see ``batch_runner``). With ``stream_voice`` the script stage narrates
+    the script while it is generated (see ``script_to_voice``), so the voice
+    stage only has to reassemble it from the TTS cache. With ``queue_upload``
+    the upload runs in the background upload worker.
+    """
+    from .image_fetcher import LONG_FORM_KEYWORDS
+    from .script_generator import PROMPT
+    from .voice_generator import VOICE
+
+    prompt = prompt or PROMPT
+    voice = voice or VOICE
+    keywords = keywords or LONG_FORM_KEYWORDS
+    clients = clients or {}
+
+    script = output_dir / "script.txt"
+    images = output_dir / "images"
+    audio = output_dir / "audio.mp3"
+    metadata = output_dir / "metadata.json"
+    video = output_dir / "final_video.mp4"
+
+    def run_script():
+        if stream_voice:
+            from .script_to_voice import stream_script_to_voice
+            stream_script_to_voice(script, audio, prompt, voice, clients.get("openai"))
+            return
+        from .script_generator import generate_script
+        generate_script(script, prompt, clients.get("openai"))
+
+    def run_images():
+        from .image_fetcher import fetch_images
+        fetch_images(keywords, images, per_keyword=5,
+                     session=clients.get("session"), scheduler=clients.get("scheduler"))
+
+    def run_voice():
+        from .voice_generator import generate_voice
+        generate_voice(script, audio, voice=voice)
+
+    def run_seo():
+        from .seo import generate_metadata
+        if not generate_metadata(script, metadata, clients.get("openai")):
+            raise RuntimeError("Metadata could not be generated")
+
+    def run_assemble():
+        from .video_assembler import assemble_video
+        assemble_video(images, audio, video)
+
+    stages = [
+        Stage("script", run_script, outputs=[script], params=prompt_params(prompt, PROMPT),
+              sources=["script_generator"]),
+        Stage("images", run_images, outputs=[images],
+              params={"keywords": keywords, "per_keyword": 5}, sources=["image_fetcher"]),
+        Stage("voice", run_voice, deps=["script"], inputs=[script], outputs=[audio],
+              params=voice_params("voice_generator", voice), sources=["voice_generator", "tts_engine"]),
+        Stage("seo", run_seo, deps=["script"], inputs=[script], outputs=[metadata], sources=["seo"]),
+        Stage("assemble", run_assemble, deps=["images", "voice"], inputs=[images, audio], outputs=[video],
+              params=render_params(VIDEO_RESOLUTION), sources=["video_assembler"]),
+    ]
+    if upload:
+        stages.append(upload_stage(video, metadata, output_dir / "upload.json", deps=["assemble", "seo"],
+                                   queued=queue_upload))
+    return stages
+
+
+def shorts_stages(output_dir: Path = Path("output"), prompt: str = None, voice: str = None,
+                  keywords=None, clients: dict = None):
+    """script → {voice, seo}, images → video. Overrides as in ``long_form_stages``."""
+    from .pinterest_style_fetcher import SHORTS_KEYWORDS
+    from .shorts_script_generator import PROMPT
+    from .shorts_voice_generator import VOICE
+
+    prompt = prompt or PROMPT
+    voice = voice or VOICE
+    keywords = keywords or SHORTS_KEYWORDS
+    clients = clients or {}
+    script = output_dir / "shorts_script.txt"
+    images = output_dir / "shorts_images"
+    audio = output_dir / "shorts_audio.m4a"
+    metadata = output_dir / "shorts_metadata.txt"
+    video = output_dir / "shorts_final.mp4"
+
+    def run_script():
+        from .shorts_script_generator import generate_shorts_script
+        generate_shorts_script(script, prompt, clients.get("openai"))
+
+    def run_images():
+        from .pinterest_style_fetcher import fetch_shorts_images
+        fetch_shorts_images(images, keywords=keywords,
+                            session=clients.get("session"), scheduler=clients.get("scheduler"))
+
+    def run_voice():
+        from .shorts_voice_generator import generate_shorts_voice
+        generate_shorts_voice(script, audio, voice=voice)
+
+    def run_seo():
+        from .shorts_seo import generate_shorts_seo
+        generate_shorts_seo(script, metadata, clients.get("openai"))
+
+    def run_video():
+        from .shorts_video_maker import make_shorts_video
+        if not make_shorts_video(images, audio, video):
+            raise RuntimeError("Shorts render failed")
+
+    return [
+        Stage("script", run_script, outputs=[script], params=prompt_params(prompt, PROMPT),
+              sources=["shorts_script_generator"]),
+        Stage("images", run_images, outputs=[images], params={"keywords": keywords},
+              sources=["pinterest_style_fetcher"]),
+        Stage("voice", run_voice, deps=["script"], inputs=[script], outputs=[audio],
+              params=voice_params("shorts_voice_generator", voice), sources=["shorts_voice_generator", "tts_engine"]),
+        Stage("seo", run_seo, deps=["script"], inputs=[script], outputs=[metadata], sources=["shorts_seo"]),
+        Stage("video", run_video, deps=["images", "voice"], inputs=[images, audio], outputs=[video],
+              params=render_params(SHORTS_RESOLUTION), sources=["shorts_video_maker"]),
+    ]
+
+
+def custom_stages(output_dir: Path = Path("output")):
+    """{images, voice (from an existing script)} → fast assemble."""
+    from .image_fetcher import LONG_FORM_KEYWORDS
+
+    script = output_dir / "script.txt"
+    images = output_dir / "images"
+    audio = output_dir / "audio.mp3"
+    video = output_dir / "final_video.mp4"
+
+    def run_images():
+        from .image_fetcher import fetch_images
+        fetch_images(LONG_FORM_KEYWORDS, images, per_keyword=5)
+
+    def run_voice():
+        from .voice_generator import generate_voice
+        generate_voice(script, audio)
+
+    def run_assemble():
+        from .video_assembler_fast import assemble_video_fast
+        assemble_video_fast(images, audio, video)
+
+    return [
+        Stage("images", run_images, outputs=[images],
+              params={"keywords": LONG_FORM_KEYWORDS, "per_keyword": 5}, sources=["image_fetcher"]),
+        Stage("voice", run_voice, inputs=[script], outputs=[audio],
+              params=voice_params("voice_generator"), sources=["voice_generator", "tts_engine"]),
+        Stage("assemble", run_assemble, deps=["images", "voice"], inputs=[images, audio], outputs=[video],
+              params=render_params(VIDEO_RESOLUTION), sources=["video_assembler_fast"]),
+    ]
+
+
+PIPELINES = {
+    "long": long_form_stages,
+    "shorts": shorts_stages,
+    "custom": custom_stages,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a video pipeline as a stage graph.")
+    parser.add_argument("pipeline", nargs="?", default="long", choices=sorted(PIPELINES))
+    parser.add_argument("--output-dir", type=Path, default=Path("output"))
+    parser.add_argument("--no-upload", action="store_true", help="skip the upload stage (long only)")
+    parser.add_argument("--workers", type=int, default=None, help="maximum stages running at once")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip stages unchanged since their last successful run")
+    parser.add_argument("--rebuild", nargs="+", default=[], metavar="STAGE",
+                        help="run these stages even if cached (implies --incremental)")
+    parser.add_argument("--no-manifest", action="store_true", help="run every stage and record nothing")
+    parser.add_argument("--llm-cache", choices=["read", "refresh", "offline", "off"], default=None,
+                        help="LLM response cache mode (default: LLM_CACHE_MODE)")
+    parser.add_argument("--stream-voice", action="store_true",
+                        help="synthesize speech while the script is generated (long only)")
+    parser.add_argument("--queue-upload", action="store_true",
+                        help="upload in the background upload worker instead of waiting (long only)")
+    args = parser.parse_args()
+
+    if args.llm_cache:
+        from .llm_client import set_mode
+        set_mode(args.llm_cache)
+    if args.pipeline == "long":
+        stages = long_form_stages(args.output_dir, upload=not args.no_upload, stream_voice=args.stream_voice,
+                                  queue_upload=args.queue_upload)
+    else:
+        stages = PIPELINES[args.pipeline](args.output_dir)
+    manifest = None if args.no_manifest else BuildManifest(args.output_dir / f"manifest_{args.pipeline}.json")
+    if args.incremental or args.rebuild:
+        force = set(args.rebuild)
+    else:
+        force = {stage.name for stage in stages}  # a new video; the run is still recorded for --incremental
+    try:
+        run_stages(stages, args.workers, manifest, force=force)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
@@ -0,0 +1,99 @@
+# pipeline/image_normalizer.py
+"""Pre-normalize slideshow images to the exact render resolution.
+Every source image is decoded, cropped or padded, and resized once by its
+own FFmpeg worker process, so the renderers read frames that are already
+``VIDEO_RESOLUTION`` (or 1080x1920 for Shorts) instead of rescaling ~400
+large JPEGs inside the encode loop. Results are cached by
+(source hash, target size, fit mode) and reused on re-renders.
+"""
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .config import CACHE_DIR, NORMALIZE_WORKERS, VIDEO_RESOLUTION
+from .image_store import file_sha256, link_or_copy
+
+FIT_MODES = ("pad", "crop")
+
+
+def scale_filter(size: str, fit: str = "pad") -> str:
+    """FFmpeg filter that maps any image onto exactly ``size`` (``WxH``)."""
+    width, height = size.split("x")
+    if fit == "crop":
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height},setsar=1"
+        )
+    if fit == "pad":
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1"
+        )
+    raise ValueError(f"Unknown fit mode {fit!r}; expected one of {FIT_MODES}")
+
+
+def normalize_image(src: Path, size: str, fit: str = "pad", cache_dir: Path = None) -> Path:
+    """Return the cached normalized copy of ``src``, rendering it on a miss."""
+    cache_dir = Path(cache_dir) if cache_dir else Path(CACHE_DIR) / "normalized"
+    cached = cache_dir / f"{file_sha256(src)}_{size}_{fit}.jpg"
+    if cached.exists():
+        return cached
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Identical sources (hard-linked store photos, concurrent batch jobs) render at the same time
+    tmp = cached.with_name(f"{cached.stem}.{os.getpid()}.{threading.get_ident()}.tmp.jpg")
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", str(src),
+        "-vf", scale_filter(size, fit),
+        "-frames:v", "1",
+        "-q:v", "2",
+        str(tmp),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"FFmpeg failed to normalize {src}: {result.stderr}")
+    tmp.replace(cached)
+    return cached
+
+
+def normalize_images(images, output_dir: Path, size: str = VIDEO_RESOLUTION, fit: str = "pad",
+                     workers: int = NORMALIZE_WORKERS, cache_dir: Path = None):
+    """Normalize ``images`` in parallel and link the results into ``output_dir``.
+
+    Args:
+        images (list[Path]): Source images, in slideshow order.
+        output_dir (Path): Directory that receives the pre-sized frames.
+        size (str): Target ``WxH``.
+        fit (str): ``"pad"`` letterboxes, ``"crop"`` fills and trims.
+        workers (int): Number of concurrent FFmpeg processes.
+
+    Returns:
+        list[Path]: Normalized images, in the same order as ``images``.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("*.jpg"):
+        stale.unlink()
+
+    def work(src):
+        return link_or_copy(normalize_image(src, size, fit, cache_dir), output_dir / src.name)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        normalized = list(pool.map(work, images))
+    print(f"✓ Normalized {len(normalized)} images to {size} ({fit})")
+    return normalized
+
+
+def normalized_dir(image_dir: Path, size: str, fit: str) -> Path:
+    """Sibling directory used for the normalized copy of ``image_dir``."""
+    return image_dir.parent / f"{image_dir.name}_{size}_{fit}"
+
+
+if __name__ == "__main__":
+    # python -m pipeline.image_normalizer [image_dir] [WxH] [pad|crop]
+    src_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("output/images")
+    target = sys.argv[2] if len(sys.argv) > 2 else VIDEO_RESOLUTION
+    mode = sys.argv[3] if len(sys.argv) > 3 else "pad"
+    normalize_images(sorted(src_dir.glob("*.jpg")), normalized_dir(src_dir, target, mode), target, mode)
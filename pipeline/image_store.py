@@ -0,0 +1,123 @@
+# pipeline/image_store.py
+"""Persistent content-addressed store for downloaded Pexels photos.
+Blobs are named by their SHA-256 and indexed by (Pexels photo id, size
+variant). Run directories get hard links into the store, so a photo used
+by several runs or keywords only exists once on disk. The store is kept
+under a size budget by evicting the least recently used blobs.
+"""
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from .config import CACHE_DIR, IMAGE_STORE_MAX_MB
+from .shared_index import SharedIndex
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Path, dest: Path):
+    """Hard-link ``src`` to ``dest``, falling back to a copy across devices."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+    return dest
+
+
+class ImageStore:
+    """Content-addressed image store with LRU eviction.
+
+    Args:
+        root (Path): Store directory (default: ``<CACHE_DIR>/images``).
+        max_bytes (int): Size budget; older blobs are evicted above it.
+    """
+
+    def __init__(self, root: Path = None, max_bytes: int = IMAGE_STORE_MAX_MB * 1024 * 1024):
+        self.root = Path(root) if root else Path(CACHE_DIR) / "images"
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._index = SharedIndex(self.index_path)  # shared with other stores on the same root
+
+    @staticmethod
+    def key(photo_id, variant: str) -> str:
+        return f"{photo_id}:{variant}"
+
+    def blob_path(self, sha: str) -> Path:
+        return self.objects / sha[:2] / f"{sha}.jpg"
+
+    def lookup(self, photo_id, variant: str):
+        """Return the blob for a photo, or ``None`` if missing or corrupt."""
+        key = self.key(photo_id, variant)
+        entry = self._index.load().get(key)
+        if entry is None:
+            return None
+        blob = self.blob_path(entry["sha256"])
+        if not blob.exists() or blob.stat().st_size != entry["size"] or file_sha256(blob) != entry["sha256"]:
+            with self._index.update() as index:
+                if index.get(key, {}).get("sha256") == entry["sha256"]:
+                    del index[key]
+            return None
+        with self._index.update() as index:
+            if key in index:
+                index[key]["last_used"] = time.time()
+        return blob
+
+    def add(self, photo_id, variant: str, path: Path) -> Path:
+        """Adopt a freshly downloaded file into the store and return its blob."""
+        sha = file_sha256(path)
+        blob = self.blob_path(sha)
+        with self._index.update() as index:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(path, blob)
+            index[self.key(photo_id, variant)] = {
+                "sha256": sha,
+                "size": blob.stat().st_size,
+                "last_used": time.time(),
+            }
+            self._evict(index)
+        return blob
+
+    def link_into(self, photo_id, variant: str, dest: Path):
+        """Link a stored photo to ``dest``. Returns ``dest`` or ``None`` on a miss."""
+        blob = self.lookup(photo_id, variant)
+        if blob is None:
+            return None
+        try:
+            return link_or_copy(blob, dest)
+        except FileNotFoundError:  # evicted by another process meanwhile
+            return None
+
+    def total_bytes(self) -> int:
+        return self._unique_bytes(self._index.load())
+
+    @staticmethod
+    def _unique_bytes(index: dict) -> int:
+        sizes = {e["sha256"]: e["size"] for e in index.values()}
+        return sum(sizes.values())
+
+    def _evict(self, index: dict):
+        """Drop least recently used blobs until the store fits ``max_bytes``."""
+        total = self._unique_bytes(index)
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            sha = entry["sha256"]
+            del index[key]
+            if any(e["sha256"] == sha for e in index.values()):
+                continue
+            self.blob_path(sha).unlink(missing_ok=True)
+            total -= entry["size"]
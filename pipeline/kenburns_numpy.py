@@ -0,0 +1,257 @@
+# pipeline/kenburns_numpy.py
+"""NumPy Ken Burns frame renderer piped to FFmpeg as raw video.
+Replaces the single-threaded ``zoompan`` filter: pan/zoom crops are computed
+with vectorized bilinear sampling into preallocated buffers, slides are
+rendered across a process pool, and frames are written to the encoder's
+stdin strictly in order.
+
+The motion matches zoompan's defaults: the crop is anchored at the top-left
+corner and the zoom grows by 0.0005 per frame from 1.0, restarting on every
+image, at 30 fps for ``IMAGE_DURATION_SECONDS`` per image.
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from .config import IMAGE_DURATION_SECONDS, RENDER_WORKERS, VIDEO_RESOLUTION
+from .image_normalizer import normalize_images, normalized_dir
+
+FPS = 30
+ZOOM_STEP = 0.0005
+FRAMES_PER_TASK = 15  # frames rendered per worker task; bounds memory per task
+IMAGE_CACHE_SLIDES = 4  # decoded slides kept per worker (the task window spans a few slides)
+
+# Per-process state, reused across tasks
+_image_cache = OrderedDict()  # (path, size) -> decoded slide, least recently used first
+_buffers = {}
+
+
+def parse_size(size: str):
+    width, height = size.split("x")
+    return int(width), int(height)
+
+
+def zoom_curve(frames: int):
+    """Zoom factor for each frame of one slide (``zoom+0.0005`` from 1.0)."""
+    return np.minimum(1.0 + ZOOM_STEP * np.arange(1, frames + 1), 10.0)
+
+
+def axis_plan(out_len: int, src_len: int, zoom: float):
+    """Source indices and weights that map an output axis onto the zoomed crop."""
+    crop = src_len / zoom
+    coords = (np.arange(out_len, dtype=np.float32) + 0.5) * (crop / out_len) - 0.5
+    coords = np.clip(coords, 0, src_len - 1)
+    lo = np.floor(coords).astype(np.intp)
+    hi = np.minimum(lo + 1, src_len - 1)
+    weight = (coords - lo).astype(np.float32)
+    return lo, hi, weight
+
+
+def load_image(path: Path, size: str) -> np.ndarray:
+    """Decode an image to an ``(H, W, 3)`` uint8 RGB array at exactly ``size``."""
+    width, height = parse_size(size)
+    cmd = [
+        "ffmpeg", "-v", "error", "-i", str(path),
+        "-vf", f"scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed to decode {path}: {result.stderr.decode(errors='replace')}")
+    return np.frombuffer(result.stdout, dtype=np.uint8).reshape(height, width, 3)
+
+
+def _cached_image(path: str, size: str) -> np.ndarray:
+    """Decoded slide, kept for the next tasks of the same slide on this worker.
+    Tasks of neighbouring slides interleave across the pool, so several are
+    kept instead of only the last one.
+    """
+    key = (path, size)
+    if key in _image_cache:
+        _image_cache.move_to_end(key)
+    else:
+        _image_cache[key] = load_image(Path(path), size)
+        while len(_image_cache) > IMAGE_CACHE_SLIDES:
+            _image_cache.popitem(last=False)
+    return _image_cache[key]
+
+
+def _frame_buffers(height: int, width: int):
+    key = (height, width)
+    if key not in _buffers:
+        _buffers[key] = {
+            "rows_lo": np.empty((height, width, 3), dtype=np.uint8),
+            "rows_hi": np.empty((height, width, 3), dtype=np.uint8),
+            "a": np.empty((height, width, 3), dtype=np.uint8),
+            "b": np.empty((height, width, 3), dtype=np.uint8),
+            "top": np.empty((height, width, 3), dtype=np.float32),
+            "bottom": np.empty((height, width, 3), dtype=np.float32),
+            "tmp": np.empty((height, width, 3), dtype=np.float32),
+            "out": np.empty((height, width, 3), dtype=np.uint8),
+        }
+    return _buffers[key]
+
+
+def render_frame(img: np.ndarray, zoom: float, out_size) -> np.ndarray:
+    """Crop the top-left ``1/zoom`` window of ``img`` and resize it bilinearly.
+    ``img`` must already be ``out_size`` (see ``load_image``). Returns a reused
+    buffer; copy it if it must outlive the next call.
+    """
+    width, height = out_size
+    src_h, src_w, _ = img.shape
+    y_lo, y_hi, wy = axis_plan(height, src_h, zoom)
+    x_lo, x_hi, wx = axis_plan(width, src_w, zoom)
+    buf = _frame_buffers(height, width)
+    wx = wx[None, :, None]
+    wy = wy[:, None, None]
+
+    # Gather the two source rows for every output row, then the two columns
+    rows_lo = np.take(img, y_lo, axis=0, out=buf["rows_lo"])
+    rows_hi = np.take(img, y_hi, axis=0, out=buf["rows_hi"])
+    np.take(rows_lo, x_lo, axis=1, out=buf["a"])
+    np.take(rows_lo, x_hi, axis=1, out=buf["b"])
+    top = buf["top"]
+    np.subtract(buf["b"], buf["a"], out=top, dtype=np.float32)
+    np.multiply(top, wx, out=top)
+    np.add(top, buf["a"], out=top)
+
+    np.take(rows_hi, x_lo, axis=1, out=buf["a"])
+    np.take(rows_hi, x_hi, axis=1, out=buf["b"])
+    bottom = buf["bottom"]
+    np.subtract(buf["b"], buf["a"], out=bottom, dtype=np.float32)
+    np.multiply(bottom, wx, out=bottom)
+    np.add(bottom, buf["a"], out=bottom)
+
+    # Blend rows and round back to uint8
+    tmp = buf["tmp"]
+    np.subtract(bottom, top, out=tmp)
+    np.multiply(tmp, wy, out=tmp)
+    np.add(tmp, top, out=tmp)
+    np.add(tmp, 0.5, out=tmp)
+    np.copyto(buf["out"], tmp, casting="unsafe")
+    return buf["out"]
+
+
+def render_frames(path: str, start: int, stop: int, size: str) -> bytes:
+    """Worker task: raw RGB bytes for frames ``start..stop`` of one slide."""
+    out_size = parse_size(size)
+    img = _cached_image(path, size)
+    zooms = zoom_curve(stop)[start:stop]
+    return b"".join(render_frame(img, float(z), out_size).tobytes() for z in zooms)
+
+
+def frame_tasks(images, frames_per_image: int):
+    """Yield ``(path, start, stop)`` tasks in playback order."""
+    for img in images:
+        for start in range(0, frames_per_image, FRAMES_PER_TASK):
+            yield str(img), start, min(start + FRAMES_PER_TASK, frames_per_image)
+
+
+def stream_frames(images, size: str, sink, workers: int = RENDER_WORKERS):
+    """Render all slides on a process pool and write frames to ``sink`` in order.
+    At most ``2 * workers`` tasks are in flight, so memory stays bounded.
+    """
+    frames_per_image = IMAGE_DURATION_SECONDS * FPS
+    tasks = frame_tasks(images, frames_per_image)
+    window = max(workers, 1) * 2
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(render_frames, *task, size))
+            if len(pending) >= window:
+                sink.write(pending.popleft().result())
+        while pending:
+            sink.write(pending.popleft().result())
+
+
+def assemble_video_numpy(
+    image_dir: Path = Path("output/images"),
+    audio_path: Path = Path("output/audio.mp3"),
+    output_path: Path = Path("output/final_video.mp4"),
+    workers: int = RENDER_WORKERS,
+    normalize: bool = True,
+):
+    """Render the Ken Burns slideshow with NumPy and encode it with FFmpeg.
+    Errors are raised as ``RuntimeError``.
+    """
+    from .video_assembler import AUDIO_CODEC_ARGS, VIDEO_CODEC_ARGS, audio_inputs, audio_mix_filters
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    images = sorted(image_dir.glob("*.jpg"))
+    if not images:
+        raise RuntimeError(f"No images found in {image_dir}")
+    if normalize:
+        images = normalize_images(images, normalized_dir(image_dir, VIDEO_RESOLUTION, "crop"), VIDEO_RESOLUTION, fit="crop")
+
+    cmd = [
+        "ffmpeg", "-y",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", VIDEO_RESOLUTION, "-r", str(FPS), "-i", "-",
+    ]
+    cmd.extend(audio_inputs(audio_path))
+    cmd.extend(["-filter_complex", ";".join(audio_mix_filters(1, 2))])
+    cmd.extend(["-map", "0:v", "-map", "[aout]", *VIDEO_CODEC_ARGS, *AUDIO_CODEC_ARGS])
+    cmd.extend(["-movflags", "+faststart", str(output_path)])
+
+    print(f"🚀 Rendering {len(images)} images with NumPy on {workers} worker(s)...")
+    with tempfile.TemporaryFile() as stderr:
+        encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr)
+        try:
+            stream_frames(images, VIDEO_RESOLUTION, encoder.stdin, workers)
+        except BrokenPipeError:
+            pass  # The encoder exited early; its stderr explains why
+        finally:
+            encoder.stdin.close()
+            encoder.wait()
+        if encoder.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"FFmpeg failed: {stderr.read().decode(errors='replace')}")
+    print(f"Video assembled at {output_path}")
+
+
+def benchmark(
+    image_dir: Path = Path("output/images"),
+    audio_path: Path = Path("output/audio.mp3"),
+    num_images: int = 10,
+    workers: int = RENDER_WORKERS,
+):
+    """Time the NumPy renderer against the zoompan filtergraph on the same images."""
+    from .video_assembler import assemble_video
+
+    sources = sorted(image_dir.glob("*.jpg"))[:num_images]
+    if not sources:
+        raise RuntimeError(f"No images found in {image_dir}")
+    frames = len(sources) * IMAGE_DURATION_SECONDS * FPS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        bench_dir = tmp / "images"
+        bench_dir.mkdir()
+        for src in sources:
+            (bench_dir / src.name).symlink_to(src.absolute())
+        # Normalize once up front so neither timing includes it
+        normalize_images(sources, normalized_dir(bench_dir, VIDEO_RESOLUTION, "crop"), VIDEO_RESOLUTION, fit="crop")
+
+        results = {}
+        started = time.perf_counter()
+        assemble_video(bench_dir, audio_path, tmp / "zoompan.mp4", workers=1)
+        results["zoompan filtergraph"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        assemble_video_numpy(bench_dir, audio_path, tmp / "numpy.mp4", workers=workers)
+        results[f"numpy ({workers} workers)"] = time.perf_counter() - started
+
+    print(f"\n📊 Ken Burns benchmark: {len(sources)} images, {frames} frames at {VIDEO_RESOLUTION}")
+    for name, seconds in results.items():
+        print(f"  {name:24s} {seconds:7.2f}s  ({frames / seconds:6.1f} fps)")
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark(num_images=int(sys.argv[2]) if len(sys.argv) > 2 else 10)
+    else:
+        assemble_video_numpy()
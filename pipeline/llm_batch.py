@@ -0,0 +1,229 @@
+# pipeline/llm_batch.py
+"""Send the script and metadata requests of many videos at once.
+Instead of one synchronous round-trip per ``generate_script`` /
+``generate_metadata`` / ``generate_shorts_seo`` call, the requests of a
+whole batch of jobs (see ``batch_runner``) are collected and sent either
+
+    concurrent  through one async client, ``LLM_CONCURRENCY`` in flight, or
+    batch       as a JSONL file to the asynchronous Batch API (cheaper, slower).
+
+Answers are demultiplexed into each job's ``script.txt`` /
+``metadata.json`` (or ``shorts_script.txt`` / ``shorts_metadata.txt``)
+and, once saved, stored in the LLM response cache. The stage graphs that run afterwards build the
+same requests and are answered from the cache. Point ``OPENAI_BASE_URL`` at
+a local stand-in server to try it without the real API (``tests/llm_stub.py``
+is one).
+
+    python -m pipeline.llm_batch jobs.json [--output-dir output/batch]
+                                 [--via concurrent|batch] [--concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from .config import LLM_CONCURRENCY
+from .llm_client import LLMCache, get_client, lookup, make_async_client, set_mode, store
+
+VIA = ("concurrent", "batch")
+BATCH_POLL_SECONDS = 30
+
+# Script and metadata files per job format, as the stage graphs name them
+JOB_FILES = {
+    "long": ("script.txt", "metadata.json"),
+    "shorts": ("shorts_script.txt", "shorts_metadata.txt"),
+}
+
+
+class LLMTask:
+    """One request and where its answer goes.
+
+    Args:
+        name (str): Label for progress lines (e.g. ``discipline/script``).
+        request (dict): ``llm_client.chat`` arguments.
+        save (callable): Called with the response text; returns a falsy value if it is unusable.
+    """
+
+    def __init__(self, name: str, request: dict, save):
+        self.name = name
+        self.request = LLMCache.request(**request)
+        self.save = save
+
+
+def script_tasks(jobs, root: Path):
+    """Script requests for the jobs that have no script yet."""
+    from .batch_runner import job_prompt
+    from .script_generator import save_script, script_request
+    from .shorts_script_generator import save_shorts_script, shorts_script_request
+
+    tasks = []
+    for job in jobs:
+        path = root / job["name"] / JOB_FILES[job["format"]][0]
+        if path.exists():
+            continue
+        if job["format"] == "shorts":
+            request, save = shorts_script_request(job_prompt(job)), save_shorts_script
+        else:
+            request, save = script_request(job_prompt(job)), save_script
+        tasks.append(LLMTask(f"{job['name']}/script", request, lambda text, s=save, p=path: s(text, p)))
+    return tasks
+
+
+def metadata_tasks(jobs, root: Path):
+    """Metadata requests for the jobs that have a script."""
+    from .seo import metadata_request, save_metadata
+    from .shorts_seo import save_shorts_seo, shorts_seo_request
+
+    tasks = []
+    for job in jobs:
+        script_name, metadata_name = JOB_FILES[job["format"]]
+        script, path = root / job["name"] / script_name, root / job["name"] / metadata_name
+        if not script.exists():
+            continue
+        if job["format"] == "shorts":
+            request, save = shorts_seo_request(script), save_shorts_seo
+        else:
+            request, save = metadata_request(script), save_metadata
+        tasks.append(LLMTask(f"{job['name']}/metadata", request, lambda text, s=save, p=path: s(text, p)))
+    return tasks
+
+
+async def send_concurrent(requests, concurrency: int = LLM_CONCURRENCY):
+    """Send ``requests`` through one async client.
+
+    Returns:
+        list: ``(text, finish_reason)`` or an exception per request, in order.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def send(client, request):
+        async with semaphore:
+            response = await client.chat.completions.create(**request)
+        return response.choices[0].message.content, response.choices[0].finish_reason
+
+    async with make_async_client() as client:
+        return await asyncio.gather(*(send(client, r) for r in requests), return_exceptions=True)
+
+
+def send_batch_file(requests, poll_seconds: float = None):
+    """Submit ``requests`` as one Batch API job and wait for it; results as in ``send_concurrent``."""
+    poll_seconds = BATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+    client = get_client()
+    lines = [
+        json.dumps({"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": request})
+        for i, request in enumerate(requests)
+    ]
+    upload = client.files.create(file=("requests.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h")
+    print(f"📤 Submitted batch {batch.id} ({len(requests)} requests)")
+    while batch.status in ("validating", "in_progress", "finalizing"):
+        time.sleep(poll_seconds)
+        batch = client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        if counts:
+            print(f"  ⏳ {batch.status}: {counts.completed}/{counts.total} done, {counts.failed} failed")
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended as {batch.status}: {batch.errors}")
+
+    results = [RuntimeError("No result in batch output")] * len(requests)
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                choice = response["body"]["choices"][0]
+                results[int(item["custom_id"])] = choice["message"]["content"], choice.get("finish_reason")
+            else:
+                results[int(item["custom_id"])] = RuntimeError(f"Request failed: {item.get('error') or response.get('body')}")
+    return results
+
+
+def submit(tasks, via: str = "concurrent", concurrency: int = LLM_CONCURRENCY, mode: str = None):
+    """Answer ``tasks`` from the cache or in one batched submission, then save each answer.
+
+    Returns:
+        dict: ``{task name: exception}`` for the tasks that failed.
+    """
+    if via not in VIA:
+        raise RuntimeError(f"Unknown submission path {via!r} (expected one of {', '.join(VIA)})")
+    started = time.perf_counter()
+    answers, failures, pending, fresh = {}, {}, [], {}
+    for task in tasks:
+        try:
+            content, cache = lookup(task.request, mode, announce=False)
+        except RuntimeError as e:
+            failures[task.name] = e
+            continue
+        if content is not None:
+            answers[task.name] = content
+        else:
+            pending.append((task, cache))
+    cached = len(answers)
+
+    if pending:
+        print(f"🚀 Sending {len(pending)} LLM request(s) ({via})")
+        requests = [task.request for task, _ in pending]
+        if via == "batch":
+            results = send_batch_file(requests)
+        else:
+            results = asyncio.run(send_concurrent(requests, concurrency))
+        for (task, cache), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                failures[task.name] = result
+                continue
+            answers[task.name] = result[0]
+            fresh[task.name] = (cache, result[1])
+
+    for task in tasks:
+        if task.name not in answers:
+            continue
+        try:
+            if not task.save(answers[task.name]):
+                failures[task.name] = RuntimeError("Response could not be saved")
+                continue
+        except (OSError, ValueError) as e:
+            failures[task.name] = e
+            continue
+        if task.name in fresh:
+            cache, finish_reason = fresh[task.name]
+            store(cache, task.request, answers[task.name], finish_reason)
+    for name, error in failures.items():
+        print(f"❌ {name}: {error}")
+    print(f"✓ {len(tasks) - len(failures)} of {len(tasks)} LLM answer(s) saved "
+          f"({cached} from cache) in {time.perf_counter() - started:.1f}s")
+    return failures
+
+
+def prefetch(jobs, root: Path = Path("output/batch"), via: str = "concurrent",
+             concurrency: int = LLM_CONCURRENCY, mode: str = None):
+    """Generate every job's script, then every job's metadata, in two batched rounds."""
+    failures = submit(script_tasks(jobs, root), via, concurrency, mode)
+    failures.update(submit(metadata_tasks(jobs, root), via, concurrency, mode))
+    return failures
+
+
+if __name__ == "__main__":
+    from .batch_runner import load_jobs
+
+    parser = argparse.ArgumentParser(description="Generate scripts and metadata for a batch of jobs.")
+    parser.add_argument("jobs", type=Path, help="JSON list of jobs (see batch_runner)")
+    parser.add_argument("--output-dir", type=Path, default=Path("output/batch"))
+    parser.add_argument("--via", choices=VIA, default="concurrent")
+    parser.add_argument("--concurrency", type=int, default=LLM_CONCURRENCY, help="requests in flight (concurrent)")
+    parser.add_argument("--llm-cache", choices=["read", "refresh", "offline", "off"], default=None,
+                        help="LLM response cache mode (default: LLM_CACHE_MODE)")
+    args = parser.parse_args()
+
+    if args.llm_cache:
+        set_mode(args.llm_cache)
+    try:
+        failed = prefetch(load_jobs(args.jobs), args.output_dir, args.via, args.concurrency)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,236 @@
+# pipeline/llm_client.py
+"""Shared chat-completion layer with a deterministic on-disk response cache.
+Every script and SEO generator sends its requests through ``chat`` (or
+``stream_chat``). Responses are stored under a hash of the request (model,
+messages, temperature, max_tokens and seed if set), so re-running later
+stages or iterating on rendering costs no LLM round-trips, and benchmark
+runs replay the exact same text.
+
+Only usable answers are stored: a completion cut off at ``max_tokens``
+(``finish_reason == "length"``) or one the caller's ``validate`` rejects is
+returned but not cached, so the next run asks again instead of replaying it.
+
+Cache modes (``LLM_CACHE_MODE`` or ``mode=``):
+    read     return a cached response, call the API only on a miss (default)
+    refresh  always call the API and overwrite the cached response
+    offline  replay cached responses only; a miss raises ``RuntimeError``
+    off      no cache at all
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from .config import CACHE_DIR, CHATGPT_API_KEY, LLM_CACHE_MODE, OPENAI_BASE_URL
+
+MODES = ("read", "refresh", "offline", "off")
+DEFAULT_MODEL = "gpt-4o-mini"
+
+_client = None
+_client_lock = threading.Lock()
+_mode = LLM_CACHE_MODE
+_local = threading.local()  # per-thread mode set by ``fresh_responses``
+
+
+def set_mode(mode: str):
+    """Change the default cache mode for this process (e.g. from a ``--llm-cache`` flag)."""
+    global _mode
+    if mode not in MODES:
+        raise RuntimeError(f"Unknown LLM cache mode {mode!r} (expected one of {', '.join(MODES)})")
+    _mode = mode
+
+
+@contextmanager
+def fresh_responses():
+    """Within this block (on this thread), ``read`` mode becomes ``refresh``.
+    Used for forced pipeline stages, so ``--rebuild script`` really writes a
+    new script; an explicit ``offline``/``off`` mode is left alone.
+    """
+    previous = getattr(_local, "mode", None)
+    _local.mode = "refresh" if _mode == "read" else _mode
+    try:
+        yield
+    finally:
+        _local.mode = previous
+
+
+def get_client():
+    """The process-wide OpenAI client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = make_client()
+        return _client
+
+
+def make_client():
+    from openai import OpenAI
+    return OpenAI(api_key=CHATGPT_API_KEY, base_url=OPENAI_BASE_URL)
+
+
+def make_async_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=CHATGPT_API_KEY, base_url=OPENAI_BASE_URL)
+
+
+class LLMCache:
+    """Chat responses stored as one JSON file per request hash.
+
+    Args:
+        root (Path): Cache directory (default: ``<CACHE_DIR>/llm``).
+    """
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root) if root else Path(CACHE_DIR) / "llm"
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def request(messages, model: str, temperature: float, max_tokens: int = None, seed: int = None) -> dict:
+        """The fields that identify a response; ``max_tokens``/``seed`` only when set."""
+        request = {"model": model, "messages": list(messages), "temperature": temperature}
+        if max_tokens is not None:
+            request["max_tokens"] = max_tokens
+        if seed is not None:
+            request["seed"] = seed
+        return request
+
+    @staticmethod
+    def key(request: dict) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, request: dict):
+        """Return the cached response text for ``request``, or ``None``."""
+        try:
+            entry = json.loads(self._path(self.key(request)).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry["content"]
+
+    def put(self, request: dict, content: str):
+        path = self._path(self.key(request))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"stored_at": time.time(), "request": request, "content": content}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+    def entries(self):
+        return list(self.root.glob("*/*.json"))
+
+    def clear(self) -> int:
+        paths = self.entries()
+        for path in paths:
+            path.unlink(missing_ok=True)
+        return len(paths)
+
+
+def _resolve(mode: str):
+    mode = mode or getattr(_local, "mode", None) or _mode
+    if mode not in MODES:
+        raise RuntimeError(f"Unknown LLM cache mode {mode!r} (expected one of {', '.join(MODES)})")
+    return mode, (LLMCache() if mode != "off" else None)
+
+
+def lookup(request: dict, mode: str = None, announce: bool = True, validate=None):
+    """Cache step shared by every call path. A cached text ``validate`` rejects counts as a miss.
+
+    Returns:
+        tuple[str | None, LLMCache | None]: The cached text (``None`` when
+        the API must be called) and the cache to store a fresh response in.
+
+    Raises:
+        RuntimeError: On a miss in offline mode.
+    """
+    mode, cache = _resolve(mode)
+    if mode in ("read", "offline"):
+        content = cache.get(request)
+        if content is not None and validate is not None and not validate(content):
+            content = None
+        if content is not None:
+            if announce:
+                print("  ⏸ LLM response replayed from cache")
+            return content, cache
+        if mode == "offline":
+            raise RuntimeError(f"LLM cache miss in offline mode ({request['model']}, {LLMCache.key(request)[:12]})")
+    return None, cache
+
+
+def store(cache, request: dict, content: str, finish_reason: str = None, validate=None) -> bool:
+    """Cache ``content`` unless it was truncated or ``validate`` rejects it; returns whether it was stored."""
+    if cache is None:
+        return False
+    if finish_reason == "length":
+        print("  ⚠ LLM response hit max_tokens; not cached")
+        return False
+    if validate is not None and not validate(content):
+        print("  ⚠ LLM response rejected; not cached")
+        return False
+    cache.put(request, content)
+    return True
+
+
+def chat(messages, model: str = DEFAULT_MODEL, temperature: float = 0.7, max_tokens: int = None,
+         seed: int = None, client=None, mode: str = None, validate=None) -> str:
+    """Return the completion text for ``messages``, from the cache when ``mode`` allows.
+
+    Args:
+        messages (list[dict]): Chat messages.
+        client: OpenAI client to call on a miss (default: ``get_client()``).
+        mode (str): One of ``MODES`` (default: ``LLM_CACHE_MODE``, see ``set_mode``).
+        validate (callable): Returns a falsy value for text that must not be cached (e.g. unparseable JSON).
+    """
+    request = LLMCache.request(messages, model, temperature, max_tokens, seed)
+    content, cache = lookup(request, mode, validate=validate)
+    if content is not None:
+        return content
+    response = (client or get_client()).chat.completions.create(**request)
+    content = response.choices[0].message.content
+    store(cache, request, content, response.choices[0].finish_reason, validate)
+    return content
+
+
+async def stream_chat(messages, model: str = DEFAULT_MODEL, temperature: float = 0.7, max_tokens: int = None,
+                      seed: int = None, client=None, mode: str = None, validate=None):
+    """Yield the completion text as it is generated; same caching as ``chat``.
+    A cached response is yielded at once. The (blocking) API stream is read
+    in a worker thread so the event loop stays free meanwhile.
+    """
+    request = LLMCache.request(messages, model, temperature, max_tokens, seed)
+    content, cache = lookup(request, mode, validate=validate)
+    if content is not None:
+        yield content
+        return
+    loop = asyncio.get_running_loop()  # run_in_executor rather than asyncio.to_thread: Python 3.8
+    create = (client or get_client()).chat.completions.create
+    stream = await loop.run_in_executor(None, lambda: create(stream=True, **request))
+    events = iter(stream)
+    parts = []
+    finish_reason = None
+    try:
+        while (event := await loop.run_in_executor(None, next, events, None)) is not None:
+            if not event.choices:
+                continue
+            finish_reason = event.choices[0].finish_reason or finish_reason
+            if event.choices[0].delta.content:
+                parts.append(event.choices[0].delta.content)
+                yield parts[-1]
+    finally:
+        stream.close()
+    store(cache, request, "".join(parts), finish_reason, validate)
+
+
+if __name__ == "__main__":
+    # python -m pipeline.llm_client [--clear]  -> show usage, optionally empty the cache
+    cache = LLMCache()
+    print(f"LLM cache at {cache.root}: {len(cache.entries())} response(s), mode {_mode}")
+    if "--clear" in sys.argv[1:]:
+        print(f"✓ Cleared {cache.clear()} response(s)")
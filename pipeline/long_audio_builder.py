@@ -1,15 +1,28 @@
 # pipeline/long_audio_builder.py
-"""Build a 20-minute audio compilation from the core script."""
+"""Build a 20-minute audio compilation from the core script.
+All segments stream, chunk by chunk, into a single FFmpeg process that
+writes the trimmed track; there are no per-part files or concat step.
+"""
 import asyncio
-import edge_tts
+import time
 from pathlib import Path
-import subprocess
+from .config import TTS_CONCURRENCY
+from .tts_cache import TTSCache
+from .tts_engine import print_stats, split_script, synthesize_in_order, write_narration
 
-async def generate_segment(text, voice, rate, pitch, output_path):
-    communicate = edge_tts.Communicate(text=text, voice=voice, rate=rate, pitch=pitch)
-    await communicate.save(str(output_path))
+async def segment_results(segments, voice, cache):
+    """Yield chunk results for every segment, in playback order."""
+    for seg in segments:
+        print(f"Generating {seg['name']}...")
+        chunks = synthesize_in_order(split_script(seg["text"]), voice, seg["rate"], seg["pitch"], TTS_CONCURRENCY, cache)
+        try:
+            async for result in chunks:
+                yield result
+        finally:
+            await chunks.aclose()
+        print(f"✓ Generated {seg['name']}")
 
-async def build_long_audio():
+async def build_long_audio(output_path: Path = Path("output/audio.mp3")):
     script_path = Path("output/script.txt")
     script = script_path.read_text(encoding="utf-8")
     
@@ -20,47 +33,27 @@ async def build_long_audio():
     
     segments = [
         # Part 1: Original - Deep & Slow (Intro)
-        {"text": script, "rate": "-15%", "pitch": "-5Hz", "name": "part1.mp3"},
+        {"text": script, "rate": "-15%", "pitch": "-5Hz", "name": "part1"},
         # Part 2: Deeper & Slower (Deep Dive)
-        {"text": script, "rate": "-20%", "pitch": "-10Hz", "name": "part2.mp3"},
+        {"text": script, "rate": "-20%", "pitch": "-10Hz", "name": "part2"},
         # Part 3: Faster & High Intensity (Peak)
-        {"text": "WAKE UP. LOCK IN. THE WORLD IS WAITING. \n" + script, "rate": "+0%", "pitch": "+0Hz", "name": "part3.mp3"},
+        {"text": "WAKE UP. LOCK IN. THE WORLD IS WAITING. \n" + script, "rate": "+0%", "pitch": "+0Hz", "name": "part3"},
     ]
     
-    temp_files = []
-    print("Generating audio segments...")
-    for seg in segments:
-        path = Path(f"output/{seg['name']}")
-        await generate_segment(seg['text'], "en-US-GuyNeural", seg['rate'], seg['pitch'], path)
-        temp_files.append(path)
-        print(f"✓ Generated {seg['name']}")
-
-    # Combine using FFmpeg
     # We want exactly ~20 minutes. 
     # Part 1: ~11 mins
     # Part 2: ~13 mins
-    # Total would be 24 mins. We can trim it or just take what we need.
-    
-    concat_list = Path("output/audio_concat.txt")
-    with open(concat_list, "w") as f:
-        for tf in temp_files:
-            f.write(f"file '{tf.name}'\n")
-
-    output_wav = Path("output/audio.wav")
-    print("Combining segments and trimming to 20 minutes (1200s)...")
-    cmd = [
-        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list),
-        "-t", "1200",  # Limit to 20 minutes
-        "-ar", "44100", "-ac", "2", str(output_wav)
-    ]
-    subprocess.run(cmd, check=True)
-    
-    # Cleanup
-    concat_list.unlink()
-    for tf in temp_files:
-        tf.unlink()
+    # Total would be 24 mins. The encoder stops at 1200s, and synthesis stops with it.
+    print("Generating audio segments and trimming to 20 minutes (1200s)...")
+    started = time.perf_counter()
+    results = await write_narration(
+        segment_results(segments, "en-US-GuyNeural", TTSCache()),
+        output_path,
+        max_seconds=1200,  # Limit to 20 minutes
+    )
+    print_stats(results, time.perf_counter() - started)
         
-    print(f"✓ Final 20-minute audio built: {output_wav}")
+    print(f"✓ Final 20-minute audio built: {output_path}")
 
 if __name__ == "__main__":
     asyncio.run(build_long_audio())
@@ -0,0 +1,274 @@
+# pipeline/media_probe.py
+"""In-process media probing with cached results.
+Reads duration, sample rate, channels and dimensions straight from WAV,
+MP3 and MP4/MOV headers in pure Python, falling back to ``ffprobe`` only
+for formats it does not understand. Results are memoized by
+(path, mtime, size), so every stage gets exact numbers without spawning a
+process per lookup.
+"""
+import json
+import struct
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class MediaInfo(NamedTuple):
+    duration: float
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def probe(path: Path) -> MediaInfo:
+    """Return ``MediaInfo`` for ``path``; cached until the file changes."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return _probe_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def media_duration(path: Path) -> float:
+    """Duration of ``path`` in seconds."""
+    return probe(path).duration
+
+
+@lru_cache(maxsize=1024)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> MediaInfo:
+    parsers = {
+        ".wav": _probe_wav,
+        ".mp3": _probe_mp3,
+        ".mp4": _probe_mp4,
+        ".m4a": _probe_mp4,
+        ".mov": _probe_mp4,
+    }
+    parser = parsers.get(Path(path).suffix.lower())
+    if parser is not None:
+        try:
+            info = parser(path, size)
+            if info is not None:
+                return info
+        except (OSError, ValueError, struct.error):
+            pass
+    return _probe_ffprobe(path)
+
+
+# --- WAV ---------------------------------------------------------------------
+
+def _probe_wav(path: str, size: int):
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff not in (b"RIFF", b"RF64") or wave != b"WAVE":
+            return None
+        channels = sample_rate = byte_rate = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                _, channels, sample_rate, byte_rate = struct.unpack("<HHII", fmt[:12])
+                f.seek(chunk_size % 2, 1)
+            elif chunk_id == b"data":
+                if not byte_rate:
+                    return None
+                # Streamed WAVs leave the size unset; fall back to the bytes on disk
+                data_size = min(chunk_size, size - f.tell())
+                return MediaInfo(data_size / byte_rate, sample_rate, channels)
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+
+# --- MP3 ---------------------------------------------------------------------
+
+MP3_BITRATES = {
+    # (MPEG-1?, layer) -> kbps table indexed by the 4-bit bitrate field
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _probe_mp3(path: str, size: int):
+    with open(path, "rb") as f:
+        head = f.read(10)
+        offset = 0
+        if head[:3] == b"ID3":
+            tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+            offset = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        f.seek(offset)
+        window = f.read(64 * 1024)
+
+    for i in range(len(window) - 4):
+        if window[i] != 0xFF or (window[i + 1] & 0xE0) != 0xE0:
+            continue
+        b1, b2, b3 = window[i + 1], window[i + 2], window[i + 3]
+        version = (b1 >> 3) & 0x03  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+        layer_bits = (b1 >> 1) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+        layer = 4 - layer_bits
+        mpeg1 = version == 3
+        bitrate = MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        channels = 1 if (b3 >> 6) == 3 else 2
+        if layer == 1:
+            samples_per_frame = 384
+        elif layer == 2 or mpeg1:
+            samples_per_frame = 1152
+        else:
+            samples_per_frame = 576
+
+        # A Xing/Info (or VBRI) header gives the exact frame count
+        side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+        frame = window[i:i + 200]
+        xing = frame[4 + side_info:4 + side_info + 12]
+        frames = None
+        if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 0x1:
+            frames = struct.unpack(">I", xing[8:12])[0]
+        elif frame[36:40] == b"VBRI":
+            frames = struct.unpack(">I", frame[50:54])[0]
+        if frames:
+            duration = frames * samples_per_frame / sample_rate
+        else:
+            audio_bytes = size - offset - i - _id3v1_size(path, size)
+            duration = audio_bytes * 8 / bitrate
+        return MediaInfo(duration, sample_rate, channels)
+    return None
+
+
+def mp3_stream_duration(data: bytes) -> float:
+    """Exact decoded duration of raw MP3 frames (no tags), by walking frame headers."""
+    pos, samples, sample_rate = 0, 0, None
+    while pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+            pos += 1
+            continue
+        version = (b1 >> 3) & 0x03
+        layer_bits = (b1 >> 1) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+        layer = 4 - layer_bits
+        mpeg1 = version == 3
+        bitrate = MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 0x01
+        if layer == 1:
+            frame_samples, frame_len = 384, (12 * bitrate // sample_rate + padding) * 4
+        else:
+            frame_samples = 1152 if (layer == 2 or mpeg1) else 576
+            frame_len = frame_samples // 8 * bitrate // sample_rate + padding
+        # A Xing/Info/VBRI header frame decodes to nothing
+        side_info = (32 if (b3 >> 6) != 3 else 17) if mpeg1 else (17 if (b3 >> 6) != 3 else 9)
+        tag = data[pos + 4 + side_info:pos + 8 + side_info]
+        if tag not in (b"Xing", b"Info") and data[pos + 36:pos + 40] != b"VBRI":
+            samples += frame_samples
+        pos += max(frame_len, 1)
+    return samples / sample_rate if sample_rate else 0.0
+
+
+def _id3v1_size(path: str, size: int) -> int:
+    if size < 128:
+        return 0
+    with open(path, "rb") as f:
+        f.seek(size - 128)
+        return 128 if f.read(3) == b"TAG" else 0
+
+
+# --- MP4 / MOV ---------------------------------------------------------------
+
+_CONTAINER_ATOMS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+def _iter_atoms(f, start: int, end: int):
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _probe_mp4(path: str, size: int):
+    info = {"duration": None, "sample_rate": None, "channels": None, "width": None, "height": None}
+    with open(path, "rb") as f:
+        moov = next(((s, e) for kind, s, e in _iter_atoms(f, 0, size) if kind == b"moov"), None)
+        if moov is None:
+            return None
+        _walk_mp4(f, *moov, info, {})
+    if info["duration"] is None:
+        return None
+    return MediaInfo(**info)
+
+
+def _walk_mp4(f, start: int, end: int, info: dict, track: dict):
+    for kind, body, stop in _iter_atoms(f, start, end):
+        if kind == b"trak":
+            _walk_mp4(f, body, stop, info, {})
+        elif kind in _CONTAINER_ATOMS:
+            _walk_mp4(f, body, stop, info, track)
+        elif kind == b"mvhd":
+            f.seek(body)
+            version = f.read(4)[0]
+            if version == 1:
+                _, _, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+            else:
+                _, _, timescale, duration = struct.unpack(">IIII", f.read(16))
+            info["duration"] = duration / timescale if timescale else None
+        elif kind == b"tkhd":
+            f.seek(stop - 8)
+            width, height = struct.unpack(">II", f.read(8))
+            track["width"], track["height"] = width >> 16, height >> 16
+        elif kind == b"hdlr":
+            f.seek(body + 8)
+            handler = f.read(4)
+            if handler == b"vide" and track.get("width"):
+                info["width"], info["height"] = track["width"], track["height"]
+            track["handler"] = handler
+        elif kind == b"stsd" and track.get("handler") == b"soun":
+            # First sample entry: 8-byte atom header, 8 reserved/index, 8 version/vendor
+            f.seek(body + 8 + 8 + 8 + 8)
+            channels, _, _, _, rate = struct.unpack(">HHHHI", f.read(12))
+            info["channels"], info["sample_rate"] = channels, rate >> 16
+
+
+# --- ffprobe fallback --------------------------------------------------------
+
+def _probe_ffprobe(path: str) -> MediaInfo:
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration:stream=codec_type,sample_rate,channels,width,height",
+        "-of", "json", path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {result.stderr}")
+    data = json.loads(result.stdout)
+    info = {"duration": float(data.get("format", {}).get("duration", 0.0))}
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "audio" and "sample_rate" not in info:
+            info["sample_rate"] = int(stream["sample_rate"])
+            info["channels"] = stream.get("channels")
+        elif stream.get("codec_type") == "video" and "width" not in info:
+            info["width"], info["height"] = stream.get("width"), stream.get("height")
+    return MediaInfo(**info)
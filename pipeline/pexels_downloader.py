@@ -0,0 +1,222 @@
+# pipeline/pexels_downloader.py
+"""Concurrent Pexels search and download engine shared by the image fetchers.
+Searches and downloads run on a bounded thread pool over one keep-alive
+``requests.Session``. Files keep deterministic ``img_NNNN.jpg`` names in
+keyword order, no matter which download finishes first. When an
+``ImageStore`` is given, photos already in the store are linked instead of
+downloaded; a ``SearchCache`` likewise answers repeat searches locally.
+Photos are streamed to a ``.part`` file, resumed with HTTP Range after a
+dropped connection, and only renamed into place once they pass an
+integrity check. API searches go through a ``RateLimitedScheduler``.
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+from .config import PEXELS_API_KEY, PEXELS_CONCURRENCY
+from .rate_limiter import RateLimitedScheduler
+
+API_URL = "https://api.pexels.com/v1/search"
+DEFAULT_PER_PAGE = 15  # what the API returns when ``per_page`` is not given
+CHUNK_SIZE = 64 * 1024
+DOWNLOAD_ATTEMPTS = 4
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def expected_length(resp, offset: int):
+    """Return the full size of the resource from Content-Range/Content-Length."""
+    if resp.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    content_range = resp.headers.get("Content-Range", "")
+    if resp.status_code == 206 and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = resp.headers.get("Content-Length")
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def verify_jpeg(path: Path, expected_size=None):
+    """Raise ``RuntimeError`` unless ``path`` is a complete JPEG file."""
+    size = path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise RuntimeError(f"{path.name}: got {size} bytes, expected {expected_size}")
+    with open(path, "rb") as f:
+        head = f.read(2)
+        f.seek(max(size - 64, 0))
+        tail = f.read().rstrip(b"\x00")
+    if head != b"\xff\xd8" or not tail.endswith(b"\xff\xd9"):
+        raise RuntimeError(f"{path.name}: truncated or not a JPEG")
+
+
+def make_session(pool_size: int = PEXELS_CONCURRENCY):
+    """Return a ``requests.Session`` whose connection pool fits ``pool_size`` workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PexelsDownloader:
+    """Search Pexels and download photos with a bounded worker pool.
+
+    Args:
+        concurrency (int): Maximum number of requests in flight.
+        session (requests.Session): Shared session; one is created if omitted.
+        timeout (int): Per-request timeout in seconds.
+        strict (bool): Raise on the first failed search/download instead of
+            printing a warning and skipping it.
+        store (ImageStore): Optional local store consulted before downloading.
+        cache (SearchCache): Optional cache consulted before searching.
+        scheduler (RateLimitedScheduler): Paces and retries API searches.
+    """
+
+    def __init__(self, concurrency: int = PEXELS_CONCURRENCY, session=None, timeout: int = 30, strict: bool = True, store=None, cache=None, scheduler=None):
+        self.concurrency = max(int(concurrency), 1)
+        self.session = session or make_session(self.concurrency)
+        self.timeout = timeout
+        self.strict = strict
+        self.store = store
+        self.cache = cache
+        self.scheduler = scheduler or RateLimitedScheduler(burst=self.concurrency)
+
+    def search(self, params: dict):
+        """Run one ``/v1/search`` request and return its list of photos."""
+        if self.cache is not None:
+            photos = self.cache.get(params)
+            if photos is not None:
+                return photos
+        resp = self.scheduler.request(
+            self.session,
+            "GET",
+            API_URL,
+            headers={"Authorization": PEXELS_API_KEY},
+            params=params,
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        photos = resp.json().get("photos", [])
+        if self.cache is not None:
+            self.cache.put(params, photos)
+        return photos
+
+    def download(self, url: str, dest: Path):
+        """Stream ``url`` to ``dest`` in chunks, resuming after dropped connections.
+
+        The body goes to ``<dest>.part`` and is only renamed to ``dest`` after
+        its size and JPEG end marker check out, so ``dest`` is never truncated.
+        """
+        part = dest.with_name(dest.name + ".part")
+        part.unlink(missing_ok=True)
+        expected = None
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            offset = part.stat().st_size if part.exists() else 0
+            if expected is not None and offset >= expected:
+                break
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+                    resp.raise_for_status()
+                    if offset and resp.status_code != 206:
+                        offset = 0  # Server ignored the Range header; start over
+                    expected = expected_length(resp, offset)
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in resp.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+            except RETRYABLE_ERRORS as e:
+                if attempt == DOWNLOAD_ATTEMPTS:
+                    raise
+                print(f"  ↻ Resuming {dest.name} after: {e}")
+                continue
+            if expected is None or part.stat().st_size >= expected:
+                break
+        try:
+            verify_jpeg(part, expected)
+        except RuntimeError:
+            part.unlink(missing_ok=True)
+            raise
+        # Replace rather than write through: dest may be a hard link into the store
+        os.replace(part, dest)
+        return dest
+
+    def _search_or_warn(self, params: dict):
+        try:
+            return self.search(params)
+        except Exception as e:
+            if self.strict:
+                raise
+            print(f"  ⚠ Warning: Failed to fetch '{params.get('query')}': {e}")
+            return []
+
+    def _download_or_warn(self, job):
+        url, dest, label, photo_id, variant = job
+        if self.store is not None and self.store.link_into(photo_id, variant, dest):
+            print(f"  ✓ Linked {dest.name} from store ({label})")
+            return dest
+        try:
+            self.download(url, dest)
+            if self.store is not None:
+                self.store.add(photo_id, variant, dest)
+        except Exception as e:
+            if self.strict:
+                raise
+            print(f"  ⚠ Warning: Failed to download {dest.name} ({label}): {e}")
+            return None
+        print(f"  ✓ Saved {dest.name} ({label})")
+        return dest
+
+    def plan(self, searches, output_dir: Path, src_key: str, limit=None, start_index: int = 1):
+        """Resolve searches into an ordered list of download jobs.
+
+        Up to ``concurrency`` searches run at once, but results are consumed
+        in the order of ``searches`` so numbering is identical to a sequential
+        run. With a ``limit``, a search is only sent while the ones in flight
+        (at ``per_page`` photos each) cannot cover it, and none after it is met.
+        """
+        jobs = []
+        index = start_index
+        pending = deque()
+        remaining = iter(searches)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                while len(pending) < self.concurrency:
+                    if limit is not None:
+                        in_flight = sum(params.get("per_page") or DEFAULT_PER_PAGE for params, _ in pending)
+                        if len(jobs) + in_flight >= limit:
+                            break
+                    params = next(remaining, None)
+                    if params is None:
+                        break
+                    pending.append((params, pool.submit(self._search_or_warn, params)))
+                if not pending:
+                    return jobs
+                params, future = pending.popleft()
+                for photo in future.result():
+                    if limit is not None and len(jobs) >= limit:
+                        break
+                    dest = output_dir / f"img_{index:04d}.jpg"
+                    jobs.append((photo["src"][src_key], dest, params.get("query"), photo["id"], src_key))
+                    index += 1
+                if limit is not None and len(jobs) >= limit:
+                    for _, queued in pending:
+                        queued.cancel()
+                    return jobs
+
+    def fetch(self, searches, output_dir: Path, src_key: str, limit=None):
+        """Search and download everything; return the saved paths in order.
+
+        Args:
+            searches (list[dict]): Pexels search params, one dict per keyword.
+            output_dir (Path): Directory to save images.
+            src_key (str): Which ``photo["src"]`` variant to download.
+            limit (int): Optional cap on the total number of images.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        jobs = self.plan(searches, output_dir, src_key, limit=limit)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            saved = list(pool.map(self._download_or_warn, jobs))
+        if self.scheduler.requests:
+            self.scheduler.report()
+        return [p for p in saved if p is not None]
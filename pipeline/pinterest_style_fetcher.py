@@ -4,84 +4,73 @@
 Focus on patience and gratitude themed images in portrait orientation.
 """
 import os
-import requests
 from pathlib import Path
-from .config import PEXELS_API_KEY
+from .config import PEXELS_CONCURRENCY
+from .image_store import ImageStore
+from .pexels_downloader import PexelsDownloader
+from .search_cache import SearchCache
 
-API_URL = "https://api.pexels.com/v1/search"
+# Keywords related to patience and gratitude
+SHORTS_KEYWORDS = [
+    "meditation peaceful",
+    "gratitude journal",
+    "mindfulness nature",
+    "peaceful morning",
+    "thankful sunset",
+    "calm ocean",
+    "serene forest",
+    "peaceful garden",
+    "grateful hands",
+    "meditation sunrise",
+    "peaceful lake",
+    "thankful prayer",
+    "calm mountains",
+    "peaceful flowers",
+    "gratitude heart",
+    "mindful breathing",
+    "peaceful sky",
+    "thankful smile",
+    "calm waterfall",
+    "peaceful candle"
+]
 
-def fetch_shorts_images(output_dir: Path = Path("output/shorts_images"), num_images=20):
+def fetch_shorts_images(output_dir: Path = Path("output/shorts_images"), num_images=20, concurrency=PEXELS_CONCURRENCY, use_store=True, use_search_cache=True, keywords=None, session=None, scheduler=None):
     """Download portrait-oriented images for YouTube Shorts.
     
     Args:
         output_dir (Path): Directory to save images.
         num_images (int): Total number of images to fetch (default: 20).
+        concurrency (int): Maximum number of searches/downloads in flight.
+        use_store (bool): Reuse photos from the local image store.
+        use_search_cache (bool): Answer repeat searches from the on-disk cache.
+        keywords (list[str]): Search terms (default: ``SHORTS_KEYWORDS``).
+        session (requests.Session): Shared HTTP session (e.g. across batch jobs).
+        scheduler (RateLimitedScheduler): Shared Pexels rate limiter.
     """
-    # Keywords related to patience and gratitude
-    keywords = [
-        "meditation peaceful",
-        "gratitude journal",
-        "mindfulness nature",
-        "peaceful morning",
-        "thankful sunset",
-        "calm ocean",
-        "serene forest",
-        "peaceful garden",
-        "grateful hands",
-        "meditation sunrise",
-        "peaceful lake",
-        "thankful prayer",
-        "calm mountains",
-        "peaceful flowers",
-        "gratitude heart",
-        "mindful breathing",
-        "peaceful sky",
-        "thankful smile",
-        "calm waterfall",
-        "peaceful candle"
-    ]
-    
-    headers = {"Authorization": PEXELS_API_KEY}
-    output_dir.mkdir(parents=True, exist_ok=True)
+    keywords = keywords or SHORTS_KEYWORDS
     
-    img_index = 1
     images_per_keyword = max(1, num_images // len(keywords))
     
     print(f"Fetching {num_images} portrait images for YouTube Shorts...")
     
-    for kw in keywords:
-        if img_index > num_images:
-            break
-            
-        params = {
+    searches = [
+        {
             "query": kw,
             "orientation": "portrait",  # Portrait for vertical video
             "size": "large",
             "per_page": images_per_keyword
         }
-        
-        try:
-            resp = requests.get(API_URL, headers=headers, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            for photo in data.get("photos", []):
-                if img_index > num_images:
-                    break
-                    
-                # Get portrait image
-                img_url = photo["src"]["portrait"]
-                img_data = requests.get(img_url, timeout=10).content
-                img_path = output_dir / f"img_{img_index:04d}.jpg"
-                img_path.write_bytes(img_data)
-                print(f"  ✓ Saved {img_path.name} ({kw})")
-                img_index += 1
-                
-        except Exception as e:
-            print(f"  ⚠ Warning: Failed to fetch '{kw}': {e}")
-            continue
+        for kw in keywords
+    ]
+    
+    downloader = PexelsDownloader(
+        concurrency=concurrency, session=session, scheduler=scheduler, timeout=10, strict=False,
+        store=ImageStore() if use_store else None,
+        cache=SearchCache() if use_search_cache else None,
+    )
+    saved = downloader.fetch(searches, output_dir, src_key="portrait", limit=num_images)
     
-    total_downloaded = img_index - 1
+    total_downloaded = len(saved)
     print(f"\n✓ Downloaded {total_downloaded} images to {output_dir}")
     return output_dir
 
@@ -0,0 +1,129 @@
+# pipeline/rate_limiter.py
+"""Rate-limit-aware request scheduler for the Pexels API.
+A token bucket paces requests at ``max_rate``. Pexels' ``X-Ratelimit-Reset``
+is the monthly rollover, so the remaining quota is only spread over that
+window once ``X-Ratelimit-Remaining`` falls below a low-water mark; until
+then requests go out at full speed. 429 and 5xx responses are retried with
+jittered exponential backoff instead of failing the keyword.
+"""
+import random
+import threading
+import time
+from .config import PEXELS_CONCURRENCY, PEXELS_LOW_WATER, PEXELS_MAX_RPS
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimitedScheduler:
+    """Thread-safe token bucket plus retry loop around ``session.request``.
+
+    Args:
+        rate (float): Starting/maximum requests per second.
+        burst (int): Bucket capacity (requests allowed back to back).
+        max_retries (int): Retries for 429/5xx before giving up.
+        base_delay (float): First backoff delay in seconds.
+        max_delay (float): Cap for any single backoff wait.
+        headroom (float): Fraction of the advertised quota to actually use.
+        low_water (int): Remaining quota below which requests are paced to last until the reset.
+    """
+
+    def __init__(self, rate: float = PEXELS_MAX_RPS, burst: int = PEXELS_CONCURRENCY,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 headroom: float = 0.9, low_water: int = PEXELS_LOW_WATER):
+        self.max_rate = max(rate, 0.01)
+        self.rate = self.max_rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.headroom = headroom
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._updated = time.monotonic()
+        self._started = None
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.quota_remaining = None
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._started is None:
+                    self._started = now
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def observe(self, resp):
+        """Slow down once the quota advertised in the response headers runs low."""
+        remaining = resp.headers.get("X-Ratelimit-Remaining")
+        reset = resp.headers.get("X-Ratelimit-Reset")
+        if remaining is None or not remaining.isdigit():
+            return
+        with self._lock:
+            self.quota_remaining = int(remaining)
+            if self.quota_remaining > self.low_water:
+                self.rate = self.max_rate
+            elif reset and reset.isdigit():
+                window = max(int(reset) - time.time(), 1.0)
+                self.rate = min(self.max_rate, max(self.quota_remaining * self.headroom / window, 0.01))
+
+    def backoff(self, resp, attempt: int) -> float:
+        """Seconds to wait before retrying ``resp``."""
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_delay)
+        reset = resp.headers.get("X-Ratelimit-Reset")
+        if resp.status_code == 429 and reset and reset.isdigit():
+            return min(max(int(reset) - time.time(), self.base_delay), self.max_delay)
+        delay = min(self.base_delay * 2 ** attempt, self.max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def request(self, session, method: str, url: str, **kwargs):
+        """Send a request through the bucket, retrying 429/5xx responses."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            resp = session.request(method, url, **kwargs)
+            with self._lock:
+                self.requests += 1
+            self.observe(resp)
+            if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return resp
+            delay = self.backoff(resp, attempt)
+            with self._lock:
+                self.retries += 1
+                if resp.status_code == 429:
+                    self.throttled += 1
+            print(f"  ↻ HTTP {resp.status_code}, retrying in {delay:.1f}s")
+            resp.close()
+            time.sleep(delay)
+        return resp
+
+    def stats(self) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self._started if self._started else 0.0
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "elapsed_seconds": round(elapsed, 2),
+                "effective_rps": round(self.requests / elapsed, 2) if elapsed > 0 else 0.0,
+                "current_rate": round(self.rate, 2),
+                "quota_remaining": self.quota_remaining,
+            }
+
+    def report(self):
+        s = self.stats()
+        quota = f", quota left {s['quota_remaining']}" if s["quota_remaining"] is not None else ""
+        print(
+            f"📈 Pexels API: {s['requests']} requests in {s['elapsed_seconds']}s "
+            f"({s['effective_rps']} req/s), {s['retries']} retries, {s['throttled']} throttled{quota}"
+        )
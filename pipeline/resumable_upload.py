@@ -0,0 +1,235 @@
+# pipeline/resumable_upload.py
+"""Resumable YouTube uploads that survive restarts and network errors.
+Implements the resumable upload protocol directly on an (authorized)
+``requests`` session:
+
+    POST <endpoint>?uploadType=resumable     -> session URI (Location header)
+    PUT  <session URI>  Content-Range: bytes a-b/size   -> 308 + Range, or 200/201 when done
+    PUT  <session URI>  Content-Range: bytes */size     -> how much the server has
+
+The session URI is saved next to the video (``final_video.upload.json``),
+so a new process picks the upload up where the last one stopped instead of
+starting from byte zero. Chunk sizes follow the measured throughput (each
+chunk takes about ``UPLOAD_CHUNK_SECONDS``, in multiples of 256 KiB as the
+protocol requires), 5xx and connection errors are retried with exponential
+backoff, and progress is reported with throughput and ETA.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from pathlib import Path
+import requests
+from .config import UPLOAD_CHUNK_SECONDS, YOUTUBE_UPLOAD_URL
+
+CHUNK_QUANTUM = 256 * 1024  # chunk sizes must be multiples of this (except the last)
+INITIAL_CHUNK = 8 * 1024 * 1024
+MAX_CHUNK = 128 * 1024 * 1024
+MAX_RETRIES = 8
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+RETRY_STATUSES = (500, 502, 503, 504)
+TIMEOUT = (15, 300)  # connect, read
+
+
+class RetryableError(Exception):
+    """A 5xx answer; the upload continues after a backoff."""
+
+
+class SessionExpired(Exception):
+    """The server no longer knows the session URI (404/410); start a new one."""
+
+
+def state_path_for(video_path: Path) -> Path:
+    """Where the session of ``video_path`` is saved (``final_video.mp4`` -> ``final_video.upload.json``)."""
+    return video_path.with_suffix(".upload.json")
+
+
+def quantize(size: float) -> int:
+    """``size`` rounded down to a multiple of 256 KiB, kept within ``[256 KiB, MAX_CHUNK]``."""
+    return int(min(max(size // CHUNK_QUANTUM, 1) * CHUNK_QUANTUM, MAX_CHUNK))
+
+
+class ResumableUpload:
+    """Upload ``path`` with ``body`` (the video resource) through ``session``.
+
+    Args:
+        path (Path): Video file.
+        body (dict): ``snippet``/``status`` resource sent when the session starts.
+        session (requests.Session): Session that adds auth (``AuthorizedSession`` for YouTube).
+        endpoint (str): Upload URL (default: ``YOUTUBE_UPLOAD_URL``; point it at a stub to test).
+        state_path (Path): Saved session (default: ``state_path_for(path)``).
+        mimetype (str): Content type of the file.
+    """
+
+    def __init__(self, path: Path, body: dict, session: requests.Session, endpoint: str = YOUTUBE_UPLOAD_URL,
+                 state_path: Path = None, mimetype: str = "video/mp4"):
+        self.path = Path(path)
+        self.body = body
+        self.session = session
+        self.endpoint = endpoint
+        self.state_path = state_path or state_path_for(self.path)
+        self.mimetype = mimetype
+        self.size = self.path.stat().st_size
+        self.chunk_size = INITIAL_CHUNK
+        self.rate = None  # bytes/second, smoothed
+        self.retries = 0
+        self.sessions_started = 0  # each new session is one (quota-charged) insert call
+        self.session_uri = self._load_state()
+
+    # --- saved session -------------------------------------------------------
+
+    def _identity(self) -> dict:
+        stat = self.path.stat()
+        body = json.dumps(self.body, sort_keys=True).encode("utf-8")
+        return {
+            "endpoint": self.endpoint,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "body": hashlib.sha256(body).hexdigest(),
+        }
+
+    def _load_state(self):
+        """The saved session URI, if it belongs to this exact file, metadata and endpoint."""
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if state.get("identity") != self._identity():
+            return None
+        return state.get("session_uri")
+
+    def _save_state(self):
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "session_uri": self.session_uri,
+            "identity": self._identity(),
+            "started": time.time(),
+        }), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def _clear_state(self):
+        self.session_uri = None
+        self.state_path.unlink(missing_ok=True)
+
+    # --- protocol --------------------------------------------------------------
+
+    def _check(self, response: requests.Response):
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableError(f"HTTP {response.status_code}")
+        if response.status_code in (404, 410):
+            raise SessionExpired(f"HTTP {response.status_code}")
+        if response.status_code not in (200, 201, 308):
+            raise RuntimeError(f"Upload failed with HTTP {response.status_code}: {response.text[:500]}")
+
+    def _start(self):
+        response = self.session.post(
+            self.endpoint,
+            params={"uploadType": "resumable", "part": ",".join(self.body)},
+            json=self.body,
+            headers={"X-Upload-Content-Length": str(self.size), "X-Upload-Content-Type": self.mimetype},
+            timeout=TIMEOUT,
+        )
+        if response.status_code in (404, 410):
+            raise RuntimeError(f"Upload endpoint returned HTTP {response.status_code}")
+        self._check(response)
+        if "Location" not in response.headers:
+            raise RuntimeError("Upload endpoint returned no session URI")
+        self.session_uri = response.headers["Location"]
+        self.sessions_started += 1
+        self._save_state()
+
+    def _result(self, response: requests.Response):
+        """``(resource, None)`` when the upload is complete, else ``(None, next offset)``."""
+        self._check(response)
+        if response.status_code in (200, 201):
+            return response.json(), None
+        match = re.match(r"bytes=0-(\d+)", response.headers.get("Range", ""))
+        return None, int(match.group(1)) + 1 if match else 0
+
+    def _query(self):
+        response = self.session.put(
+            self.session_uri, headers={"Content-Range": f"bytes */{self.size}", "Content-Length": "0"},
+            timeout=TIMEOUT,
+        )
+        return self._result(response)
+
+    def _send(self, offset: int):
+        length = min(self.chunk_size, self.size - offset)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        started = time.perf_counter()
+        response = self.session.put(
+            self.session_uri,
+            data=data,
+            headers={
+                "Content-Range": f"bytes {offset}-{offset + length - 1}/{self.size}",
+                "Content-Type": self.mimetype,
+            },
+            timeout=TIMEOUT,
+        )
+        resource, next_offset = self._result(response)
+        self._adapt(length, time.perf_counter() - started)
+        return resource, next_offset
+
+    def _adapt(self, sent: int, seconds: float):
+        """Size the next chunk so it takes about ``UPLOAD_CHUNK_SECONDS`` at the measured rate."""
+        rate = sent / max(seconds, 1e-3)
+        self.rate = rate if self.rate is None else 0.5 * self.rate + 0.5 * rate
+        self.chunk_size = quantize(self.rate * UPLOAD_CHUNK_SECONDS)
+
+    def _report(self, offset: int):
+        remaining = self.size - offset
+        eta = remaining / self.rate if self.rate else float("nan")
+        print(
+            f"Uploaded {offset * 100 // max(self.size, 1)}% ({offset / 1e6:.0f}/{self.size / 1e6:.0f} MB) "
+            f"at {(self.rate or 0) / 1e6:.1f} MB/s, chunk {self.chunk_size // 1024} KiB, ETA {eta:.0f}s"
+        )
+
+    def run(self) -> dict:
+        """Upload (or resume) to completion; returns the created video resource."""
+        started = time.perf_counter()
+        offset = None if self.session_uri else 0
+        if self.session_uri:
+            print("↻ Resuming saved upload session")
+        start_offset = None
+        failures = 0
+        while True:
+            try:
+                if self.session_uri is None:
+                    self._start()
+                    offset = 0
+                if offset is None:
+                    resource, offset = self._query()
+                    if resource is not None:
+                        break
+                if start_offset is None:
+                    start_offset = offset
+                    if offset:
+                        print(f"  server already has {offset / 1e6:.1f} MB")
+                resource, offset = self._send(offset)
+                failures = 0
+                if resource is not None:
+                    break
+                self._report(offset)
+            except SessionExpired:
+                print("⚠ Upload session expired, starting over")
+                self._clear_state()
+            except (RetryableError, requests.ConnectionError, requests.Timeout) as e:
+                failures += 1
+                self.retries += 1
+                if failures > MAX_RETRIES:
+                    raise RuntimeError(f"Upload gave up after {MAX_RETRIES} retries: {e}")
+                delay = min(BASE_DELAY * 2 ** (failures - 1), MAX_DELAY) * random.uniform(0.5, 1.0)
+                print(f"  ↻ {type(e).__name__}: {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+                offset = None  # ask the server how much it has
+        self._clear_state()
+        seconds = time.perf_counter() - started
+        sent = self.size - (start_offset or 0)
+        print(f"✓ Uploaded {self.size / 1e6:.1f} MB in {seconds:.1f}s "
+              f"({sent / max(seconds, 1e-3) / 1e6:.1f} MB/s, {self.retries} retries)")
+        return resource
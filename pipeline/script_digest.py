@@ -0,0 +1,103 @@
+# pipeline/script_digest.py
+"""Local extractive digest of a script for the metadata prompts.
+Instead of sending the first 1000 characters (or the whole script) to the
+model, the sentences that best represent the whole script are picked with
+TF-IDF scoring and joined, in script order, up to a fixed token budget.
+Prompt size, and so metadata latency and cost, stay the same however long
+the script is. Scoring is vectorized with NumPy; nothing leaves the machine.
+"""
+import math
+import re
+import sys
+from pathlib import Path
+import numpy as np
+from .config import SEO_DIGEST_TOKENS
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z][a-z']*")
+CHARS_PER_TOKEN = 4  # rough average for English text
+DUPLICATE_SIMILARITY = 0.8  # skip sentences this close to one already picked
+STOPWORDS = frozenset("""
+a about after again all am an and any are as at be because been before being but by can could did do
+does doing down for from had has have having he her here hers him his how i if in into is it its just
+me more most my no nor not now of off on once only or other our out over own same she should so some
+such than that the their them then there these they this those through to too under until up very was
+we were what when where which while who whom why will with would you your yours yourself
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str):
+    return [" ".join(s.split()) for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def sentence_scores(sentences):
+    """TF-IDF cosine similarity of each sentence to the whole script.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Scores and the L2-normalized sentence vectors.
+    """
+    words = [[w for w in _WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    lengths = np.array([len(w) for w in words])
+    if not lengths.sum():
+        return np.zeros(len(sentences)), np.zeros((len(sentences), 0))
+    vocabulary, term_ids = np.unique(np.concatenate([np.array(w) for w in words if w]),
+                                     return_inverse=True)
+    sentence_ids = np.repeat(np.arange(len(sentences)), lengths)
+    tf = np.zeros((len(sentences), len(vocabulary)))
+    np.add.at(tf, (sentence_ids, term_ids), 1.0)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    vectors = tf * idf
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    centroid = vectors.sum(axis=0)
+    centroid /= max(np.linalg.norm(centroid), 1e-12)
+    return vectors @ centroid, vectors
+
+
+def digest(text: str, max_tokens: int = SEO_DIGEST_TOKENS) -> str:
+    """The most representative sentences of ``text``, in order, within ``max_tokens``.
+    A script that already fits is returned whole (whitespace-normalized).
+    The opening sentence (the hook) is always kept. If no sentence fits the
+    budget (unpunctuated text, or delimiters such as "।" that are not split
+    on), the best-ranked sentence is cut to fit instead.
+    """
+    sentences = split_sentences(text)
+    if estimate_tokens(" ".join(sentences)) <= max_tokens:
+        return " ".join(sentences)
+    scores, vectors = sentence_scores(sentences)
+    scores[0] = np.inf
+    budget = max_tokens * CHARS_PER_TOKEN
+    picked = []
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = len(sentences[i]) + 1
+        if used + cost > budget:
+            continue
+        if picked and (vectors[picked] @ vectors[i]).max() > DUPLICATE_SIMILARITY:
+            continue
+        picked.append(i)
+        used += cost
+    if not picked:
+        return truncate(sentences[0], budget)
+    return " ".join(sentences[i] for i in sorted(picked))
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """``text`` cut to ``max_chars``, at a word boundary when there is one."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+if __name__ == "__main__":
+    # python -m pipeline.script_digest [script.txt]  -> print the digest the SEO prompts use
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("output/script.txt")
+    script = path.read_text(encoding="utf-8")
+    summary = digest(script)
+    print(summary)
+    print(f"\n📊 {estimate_tokens(script)} → {estimate_tokens(summary)} estimated tokens")
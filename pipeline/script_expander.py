@@ -1,10 +1,7 @@
 # pipeline/script_expander.py
 """Expand the provided motivational text to reach 20 minutes."""
 from pathlib import Path
-from openai import OpenAI
-from .config import CHATGPT_API_KEY
-
-client = OpenAI(api_key=CHATGPT_API_KEY)
+from .llm_client import chat
 
 CORE_TEXT = Path("output/script.txt").read_text(encoding="utf-8")
 
@@ -31,13 +28,12 @@ Instructions:
 
 def expand_script(output_path: Path = Path("output/script_long.txt")):
     print("Expanding script to 20 minutes...")
-    response = client.chat.completions.create(
+    long_script = chat(
+        [{"role": "system", "content": PROMPT}],
         model="gpt-4o-mini",
-        messages=[{"role": "system", "content": PROMPT}],
         temperature=0.7,
         max_tokens=4000,
-    )
-    long_script = response.choices[0].message.content.strip()
+    ).strip()
     output_path.write_text(long_script, encoding="utf-8")
     print(f"✓ Long script saved to {output_path}")
 
@@ -4,13 +4,8 @@ The script length should be 1800‑2200 words and follow the specified structure
 """
 import os
 import json
-from openai import OpenAI
 from pathlib import Path
-
-# Load API key from config or environment
-from .config import CHATGPT_API_KEY
-
-client = OpenAI(api_key=CHATGPT_API_KEY)
+from .llm_client import chat, stream_chat
 
 PROMPT = """
 Write a cinematic motivational script of 1800-2200 words in English.
@@ -24,17 +19,26 @@ Structure:
 Use simple, brutal, real language. No emojis, clichés, or fluff.
 """
 
-def generate_script(output_path: Path = Path("output/script.txt")):
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": PROMPT}],
-        temperature=0.8,
-        max_tokens=3000,
-    )
-    script = response.choices[0].message.content.strip()
+COMPLETION_ARGS = {"model": "gpt-4o-mini", "temperature": 0.8, "max_tokens": 3000}
+
+def script_request(prompt: str = PROMPT) -> dict:
+    """``llm_client.chat`` arguments for a script (shared with ``llm_batch``)."""
+    return {"messages": [{"role": "system", "content": prompt}], **COMPLETION_ARGS}
+
+def save_script(content: str, output_path: Path = Path("output/script.txt")):
+    script = content.strip()
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(script, encoding="utf-8")
     print(f"Script saved to {output_path}")
+    return output_path
+
+def generate_script(output_path: Path = Path("output/script.txt"), prompt: str = PROMPT, openai_client=None):
+    """Write a script for ``prompt``. ``openai_client`` lets batch jobs share one client."""
+    save_script(chat(client=openai_client, **script_request(prompt)), output_path)
+
+def stream_script(prompt: str = PROMPT, openai_client=None):
+    """Async iterator over the script text as the model generates it."""
+    return stream_chat(client=openai_client, **script_request(prompt))
 
 if __name__ == "__main__":
     generate_script()
@@ -0,0 +1,100 @@
+# pipeline/script_to_voice.py
+"""Generate the script and its narration in one overlapped pass.
+The chat completion is consumed as a token stream; every chunk of the
+script is handed to Edge TTS the moment it is complete (see
+``tts_engine.ScriptChunker``), and the synthesized audio is streamed into
+the narration file while the model is still writing. ``script.txt`` is
+written once the completion ends, for the stages that read it.
+
+Streamed chunks are exactly the ones ``split_script`` makes of the finished
+script, so a later ``voice_generator`` run on the same script is served
+entirely from the TTS cache.
+"""
+import asyncio
+import time
+from pathlib import Path
+from .config import TTS_CONCURRENCY
+from .tts_cache import TTSCache
+from .tts_engine import print_stats, stream_chunks, synthesize_in_order, write_narration
+from .voice_generator import PITCH, RATE, VOICE
+
+
+async def stream_script_to_voice_async(
+    script_path: Path = Path("output/script.txt"),
+    audio_path: Path = Path("output/audio.mp3"),
+    prompt: str = None,
+    voice: str = VOICE,
+    openai_client=None,
+    concurrency: int = TTS_CONCURRENCY,
+    use_cache: bool = True,
+):
+    """Stream a script from the LLM straight into TTS; returns the script text.
+
+    Args:
+        script_path: Where the finished script is saved.
+        audio_path: Destination for the narration.
+        prompt: Script prompt (default: ``script_generator.PROMPT``).
+        voice: Edge TTS voice name.
+        openai_client: Shared OpenAI client (default: ``llm_client.get_client()``).
+        concurrency: Maximum number of chunks synthesized at once.
+        use_cache: Read and fill the TTS cache.
+    """
+    from .script_generator import PROMPT, stream_script
+
+    started = time.perf_counter()
+    marks = {}
+    parts = []
+
+    async def tokens():
+        stream = stream_script(prompt or PROMPT, openai_client)
+        try:
+            async for piece in stream:
+                marks.setdefault("first_token", time.perf_counter() - started)
+                parts.append(piece)
+                yield piece
+        finally:
+            await stream.aclose()
+
+    async def timed(results):
+        try:
+            async for result in results:
+                marks.setdefault("first_audio", time.perf_counter() - started)
+                yield result
+        finally:
+            await results.aclose()
+
+    cache = TTSCache() if use_cache else None
+    chunks = synthesize_in_order(stream_chunks(tokens()), voice, RATE, PITCH, concurrency, cache)
+    results = await write_narration(timed(chunks), audio_path)
+    total = time.perf_counter() - started
+
+    script = "".join(parts).strip()
+    script_path.parent.mkdir(parents=True, exist_ok=True)
+    script_path.write_text(script, encoding="utf-8")
+    print(f"Script saved to {script_path}")
+    print(f"✓ Narration streamed to {audio_path}")
+    print(
+        f"  first token {marks.get('first_token', 0):.1f}s, first audio {marks.get('first_audio', 0):.1f}s, "
+        f"done in {total:.1f}s"
+    )
+    print_stats(results, total)
+    return script
+
+
+def stream_script_to_voice(
+    script_path: Path = Path("output/script.txt"),
+    audio_path: Path = Path("output/audio.mp3"),
+    prompt: str = None,
+    voice: str = VOICE,
+    openai_client=None,
+    concurrency: int = TTS_CONCURRENCY,
+    use_cache: bool = True,
+):
+    """Synchronous wrapper for the async function."""
+    return asyncio.run(stream_script_to_voice_async(
+        script_path, audio_path, prompt, voice, openai_client, concurrency, use_cache
+    ))
+
+
+if __name__ == "__main__":
+    stream_script_to_voice()
@@ -0,0 +1,92 @@
+# pipeline/search_cache.py
+"""On-disk TTL cache for Pexels search responses.
+Entries are keyed by (query, orientation, size, per_page, page) and shared
+by every fetcher, so a repeat run with the same keyword plan needs no
+search round-trips until the entries expire.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from .config import CACHE_DIR, PEXELS_SEARCH_TTL_HOURS
+
+KEY_FIELDS = ("query", "orientation", "size", "per_page", "page")
+
+
+class SearchCache:
+    """Cache of ``/v1/search`` photo lists, one JSON file per key.
+
+    Args:
+        root (Path): Cache directory (default: ``<CACHE_DIR>/pexels_search``).
+        ttl_seconds (float): Entry lifetime; ``0`` disables reads and writes.
+    """
+
+    def __init__(self, root: Path = None, ttl_seconds: float = PEXELS_SEARCH_TTL_HOURS * 3600):
+        self.root = Path(root) if root else Path(CACHE_DIR) / "pexels_search"
+        self.ttl_seconds = ttl_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(params: dict) -> dict:
+        """Normalise search params to the fields that define a result page."""
+        key = {field: params.get(field) for field in KEY_FIELDS}
+        key["query"] = str(key["query"] or "").strip().lower()
+        key["page"] = int(key["page"] or 1)
+        return key
+
+    def _path(self, key: dict) -> Path:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+        return self.root / f"{digest}.json"
+
+    def get(self, params: dict):
+        """Return cached photos for ``params``, or ``None`` on a miss/expiry."""
+        if self.ttl_seconds <= 0:
+            return None
+        path = self._path(self.key(params))
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - entry["stored_at"] > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return entry["photos"]
+
+    def put(self, params: dict, photos):
+        if self.ttl_seconds <= 0:
+            return
+        key = self.key(params)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"stored_at": time.time(), "key": key, "photos": photos}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def invalidate(self, query: str = None) -> int:
+        """Delete entries for ``query`` (any orientation/page), or all entries.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        removed = 0
+        wanted = query.strip().lower() if query is not None else None
+        for path in self.root.glob("*.json"):
+            if wanted is not None:
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, json.JSONDecodeError):
+                    entry = {"key": {}}
+                if entry["key"].get("query") != wanted:
+                    continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+if __name__ == "__main__":
+    # python -m pipeline.search_cache [query]  -> clear one query, or everything
+    target = " ".join(sys.argv[1:]) or None
+    count = SearchCache().invalidate(target)
+    print(f"✓ Removed {count} cached search result(s)")
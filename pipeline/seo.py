@@ -3,53 +3,62 @@
 Creates a click-bait title and a description with tags using OpenAI.
 """
 import json
-from openai import OpenAI
 from pathlib import Path
-from .config import CHATGPT_API_KEY
+from .llm_client import chat
+from .script_digest import digest
 
-client = OpenAI(api_key=CHATGPT_API_KEY)
-
-def generate_metadata(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/metadata.json")):
-    """Read the script and generate title/description."""
-    if not script_path.exists():
-        print(f"Script not found at {script_path}, skipping metadata generation.")
-        return
-
-    script_excerpt = script_path.read_text(encoding="utf-8")[:1000]  # First 1000 chars for context
+def metadata_request(script_path: Path = Path("output/script.txt")) -> dict:
+    """``llm_client.chat`` arguments for the metadata of a script (shared with ``llm_batch``)."""
+    script_digest = digest(script_path.read_text(encoding="utf-8"))  # Key sentences of the whole script
     
     prompt = f"""
-    Based on the following motivational script excerpt, generate:
+    Based on the following key lines from a motivational script, generate:
     1. A high-CTR, clickbait YouTube title (max 60 chars) specifically targeted at a US audience (American English idioms, emotionally resonant).
     2. An SEO-optimized video description (max 200 words) for US viewers, including keywords like #motivation, #discipline, #success.
     
-    Script Excerpt:
-    "{script_excerpt}..."
+    Key Lines:
+    "{script_digest}"
     
     Return the result as valid JSON with keys: "title", "description".
     """
+    return {"messages": [{"role": "system", "content": prompt}], "model": "gpt-4o-mini", "temperature": 0.7}
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": prompt}],
-        temperature=0.7,
-    )
-    
-    content = response.choices[0].message.content.strip()
+def generate_metadata(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/metadata.json"), openai_client=None):
+    """Read the script and generate title/description.
+    ``openai_client`` lets batch jobs share one client.
+    """
+    if not script_path.exists():
+        print(f"Script not found at {script_path}, skipping metadata generation.")
+        return
+    content = chat(client=openai_client, validate=parse_metadata, **metadata_request(script_path))
+    return save_metadata(content, output_path)
+
+def parse_metadata(content: str):
+    """The model's JSON answer as a dict, or ``None`` if it does not parse."""
+    content = content.strip()
+    # cleanup markdown code blocks if present
+    if content.startswith("```json"):
+        content = content.strip("```json").strip("```")
+    elif content.startswith("```"):
+        content = content.strip("```")
     try:
-        # cleanup markdown code blocks if present
-        if content.startswith("```json"):
-            content = content.strip("```json").strip("```")
-        elif content.startswith("```"):
-            content = content.strip("```")
-            
         data = json.loads(content)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        print(f"Metadata saved to {output_path}")
     except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def save_metadata(content: str, output_path: Path = Path("output/metadata.json")):
+    """Parse the model's JSON answer and save it to ``output_path``."""
+    data = parse_metadata(content)
+    if data is None:
         print("Failed to parse SEO metadata JSON. Raw output:")
         print(content)
+        return None
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Metadata saved to {output_path}")
+    return output_path
 
 if __name__ == "__main__":
     generate_metadata()
@@ -0,0 +1,48 @@
+# pipeline/shared_index.py
+"""JSON index file shared by threads and processes.
+The caches (``image_store``, ``tts_cache``) each keep one index; batch jobs
+open their own instances of them at the same time. Every change re-reads
+the file under an exclusive ``flock``, applies the change and writes it
+back through a temp file unique to the writer, so concurrent writers merge
+instead of overwriting each other's entries.
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SharedIndex:
+    """A JSON object on disk, changed only through ``update``.
+
+    Args:
+        path (Path): Index file; ``<path>.lock`` guards it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f"{self.path.name}.lock")
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """The index as last written (an empty dict if missing or unreadable)."""
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def update(self):
+        """Yield the current index for changing in place; it is saved on exit."""
+        with self._lock, open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self.load()
+                yield index
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(json.dumps(index), encoding="utf-8")
+                os.replace(tmp, self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -4,13 +4,8 @@
 Focus on patience and gratitude with simple, clear English.
 """
 import os
-from openai import OpenAI
 from pathlib import Path
-
-# Load API key from config or environment
-from .config import CHATGPT_API_KEY
-
-client = OpenAI(api_key=CHATGPT_API_KEY)
+from .llm_client import chat
 
 PROMPT = """
 Write a motivational script for a 60-second YouTube Shorts video about PATIENCE and GRATITUDE.
@@ -32,15 +27,23 @@ Structure:
 Write ONLY the script text, no titles, no formatting, just the words to be spoken.
 """
 
-def generate_shorts_script(output_path: Path = Path("output/shorts_script.txt")):
-    """Generate a 60-second script about patience and gratitude."""
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": PROMPT}],
-        temperature=0.7,
-        max_tokens=300,
-    )
-    script = response.choices[0].message.content.strip()
+def shorts_script_request(prompt: str = PROMPT) -> dict:
+    """``llm_client.chat`` arguments for a Shorts script (shared with ``llm_batch``)."""
+    return {
+        "messages": [{"role": "system", "content": prompt}],
+        "model": "gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 300,
+    }
+
+def generate_shorts_script(output_path: Path = Path("output/shorts_script.txt"), prompt: str = PROMPT, openai_client=None):
+    """Generate a 60-second script (about patience and gratitude by default).
+    ``openai_client`` lets batch jobs share one client.
+    """
+    return save_shorts_script(chat(client=openai_client, **shorts_script_request(prompt)), output_path)
+
+def save_shorts_script(content: str, output_path: Path = Path("output/shorts_script.txt")):
+    script = content.strip()
     
     # Create output directory if needed
     output_path.parent.mkdir(parents=True, exist_ok=True)
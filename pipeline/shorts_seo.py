@@ -2,23 +2,13 @@
 # pipeline/shorts_seo.py
 """Generate SEO-optimized metadata for YouTube Shorts."""
 import os
-from openai import OpenAI
 from pathlib import Path
-from .config import CHATGPT_API_KEY
+from .llm_client import chat
+from .script_digest import digest
 
-client = OpenAI(api_key=CHATGPT_API_KEY)
-
-def generate_shorts_seo(
-    script_path: Path = Path("output/shorts_script.txt"),
-    output_path: Path = Path("output/shorts_metadata.txt")
-):
-    """Generate YouTube Shorts optimized title, description, and tags.
-    
-    Args:
-        script_path: Path to the script file
-        output_path: Path to save metadata
-    """
-    script = script_path.read_text(encoding="utf-8")
+def shorts_seo_request(script_path: Path = Path("output/shorts_script.txt")) -> dict:
+    """``llm_client.chat`` arguments for Shorts metadata (shared with ``llm_batch``)."""
+    script = digest(script_path.read_text(encoding="utf-8"))  # Bounded, whatever the script length
     
     prompt = f"""Based on this YouTube Shorts script about patience and gratitude, generate:
 
@@ -38,15 +28,29 @@ DESCRIPTION:
 TAGS:
 [comma-separated tags]
 """
+    return {
+        "messages": [{"role": "user", "content": prompt}],
+        "model": "gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 500,
+    }
+
+def generate_shorts_seo(
+    script_path: Path = Path("output/shorts_script.txt"),
+    output_path: Path = Path("output/shorts_metadata.txt"),
+    openai_client=None
+):
+    """Generate YouTube Shorts optimized title, description, and tags.
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=500
-    )
-    
-    metadata = response.choices[0].message.content.strip()
+    Args:
+        script_path: Path to the script file
+        output_path: Path to save metadata
+        openai_client: Shared OpenAI client (default: ``llm_client.get_client()``)
+    """
+    return save_shorts_seo(chat(client=openai_client, **shorts_seo_request(script_path)), output_path)
+
+def save_shorts_seo(content: str, output_path: Path = Path("output/shorts_metadata.txt")):
+    metadata = content.strip()
     
     # Save metadata
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -5,11 +5,15 @@ Combines portrait images with audio narration.
 """
 import subprocess
 from pathlib import Path
+from .config import SHORTS_RESOLUTION
+from .image_normalizer import normalize_images, normalized_dir, scale_filter
+from .media_probe import media_duration
 
 def make_shorts_video(
     image_dir: Path = Path("output/shorts_images"),
-    audio_path: Path = Path("output/shorts_audio.wav"),
-    output_path: Path = Path("output/shorts_final.mp4")
+    audio_path: Path = Path("output/shorts_audio.m4a"),
+    output_path: Path = Path("output/shorts_final.mp4"),
+    normalize: bool = True
 ):
     """Create a vertical YouTube Shorts video.
     
@@ -17,6 +21,7 @@ def make_shorts_video(
         image_dir: Directory containing portrait images
         audio_path: Path to audio narration
         output_path: Output video file path
+        normalize: Pre-size images to 1080x1920 before rendering
     """
     images = sorted(image_dir.glob("*.jpg"))
     
@@ -33,14 +38,7 @@ def make_shorts_video(
     print(f"  Audio: {audio_path}")
     
     # Get audio duration
-    probe_cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(audio_path)
-    ]
-    duration_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-    audio_duration = float(duration_result.stdout.strip())
+    audio_duration = media_duration(audio_path)
     
     print(f"  Audio duration: {audio_duration:.1f} seconds")
     
@@ -48,8 +46,16 @@ def make_shorts_video(
     duration_per_image = audio_duration / len(images)
     print(f"  Duration per image: {duration_per_image:.2f} seconds")
     
-    # Create concat file for ffmpeg
-    concat_file = Path("output/shorts_concat.txt")
+    # Pre-sized frames only need the fps filter
+    if normalize:
+        images = normalize_images(images, normalized_dir(image_dir, SHORTS_RESOLUTION, "pad"), SHORTS_RESOLUTION)
+        video_filter = "fps=30"
+    else:
+        video_filter = scale_filter(SHORTS_RESOLUTION, "pad") + ",fps=30"
+    
+    # Create concat file for ffmpeg, beside the output so concurrent jobs never share one
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    concat_file = output_path.parent / f"{output_path.stem}_concat.txt"
     with open(concat_file, "w") as f:
         for img in images:
             f.write(f"file '{img.absolute()}'\n")
@@ -57,6 +63,12 @@ def make_shorts_video(
         # Repeat last image
         f.write(f"file '{images[-1].absolute()}'\n")
     
+    # Narration from shorts_voice_generator is already AAC; copy it instead of re-encoding
+    if audio_path.suffix.lower() in (".m4a", ".aac"):
+        audio_codec = ["-c:a", "copy"]
+    else:
+        audio_codec = ["-c:a", "aac", "-b:a", "128k"]
+    
     # FFmpeg command for vertical video (1080x1920)
     cmd = [
         "ffmpeg", "-y",
@@ -64,13 +76,12 @@ def make_shorts_video(
         "-safe", "0",
         "-i", str(concat_file),
         "-i", str(audio_path),
-        "-vf", "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black,fps=30",
+        "-vf", video_filter,
         "-c:v", "libx264",
         "-preset", "medium",
         "-crf", "23",  # Good quality
         "-pix_fmt", "yuv420p",
-        "-c:a", "aac",
-        "-b:a", "128k",
+        *audio_codec,
         "-shortest",
         "-movflags", "+faststart",
         str(output_path)
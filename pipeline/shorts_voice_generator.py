@@ -2,8 +2,10 @@
 # pipeline/shorts_voice_generator.py
 """Generate male voice narration for YouTube Shorts using Microsoft Edge TTS."""
 import asyncio
-import edge_tts
 from pathlib import Path
+from .config import TTS_CONCURRENCY
+from .media_probe import media_duration
+from .tts_engine import synthesize_to_file
 
 # Male voices - calm and clear for patience/gratitude theme
 VOICE = "en-US-GuyNeural"  # Calm, warm male voice
@@ -11,60 +13,43 @@ VOICE = "en-US-GuyNeural"  # Calm, warm male voice
 # "en-US-DavisNeural" - Calm, authoritative
 # "en-GB-RyanNeural" - British, deep
 # "en-US-EricNeural" - Deep, dramatic
+RATE = "-5%"  # Slightly slower for clarity
+PITCH = "+0Hz"  # Natural pitch
 
 async def generate_shorts_voice_async(
     script_path: Path = Path("output/shorts_script.txt"),
-    output_path: Path = Path("output/shorts_audio.wav")
+    output_path: Path = Path("output/shorts_audio.m4a"),
+    concurrency: int = TTS_CONCURRENCY,
+    use_cache: bool = True,
+    voice: str = VOICE
 ):
     """Convert script to speech using Edge TTS with male voice.
     
     Args:
         script_path: Path to the script text file.
         output_path: Destination for the generated audio.
+        concurrency: Maximum number of chunks synthesized at once.
+        use_cache: Reuse previously synthesized chunks from the TTS cache.
+        voice: Edge TTS voice name.
     """
     script = script_path.read_text(encoding="utf-8")
     
-    # Create output directory if it doesn't exist
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
     print(f"Generating male voice narration...")
-    print(f"  Voice: {VOICE}")
+    print(f"  Voice: {voice}")
     
     # Generate speech using Edge TTS
-    communicate = edge_tts.Communicate(
-        text=script,
-        voice=VOICE,
-        rate="-5%",  # Slightly slower for clarity
-        pitch="+0Hz"  # Natural pitch
+    await synthesize_to_file(
+        script,
+        output_path,
+        voice=voice,
+        rate=RATE,
+        pitch=PITCH,
+        concurrency=concurrency,
+        use_cache=use_cache,
     )
     
-    # Save directly as MP3 first
-    temp_mp3 = output_path.parent / "temp_shorts_audio.mp3"
-    await communicate.save(str(temp_mp3))
-    
-    # Convert MP3 to WAV using ffmpeg
-    import subprocess
-    cmd = [
-        "ffmpeg", "-y", "-i", str(temp_mp3),
-        "-ar", "44100",  # Sample rate
-        "-ac", "2",  # Stereo
-        str(output_path)
-    ]
-    
-    result = subprocess.run(cmd, check=True, capture_output=True)
-    
-    # Clean up temp file
-    temp_mp3.unlink()
-    
     # Get audio duration
-    probe_cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(output_path)
-    ]
-    duration_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-    duration = float(duration_result.stdout.strip())
+    duration = media_duration(output_path)
     
     print(f"✓ Male voice audio generated: {output_path}")
     print(f"  Duration: {duration:.1f} seconds")
@@ -73,10 +58,13 @@ async def generate_shorts_voice_async(
 
 def generate_shorts_voice(
     script_path: Path = Path("output/shorts_script.txt"),
-    output_path: Path = Path("output/shorts_audio.wav")
+    output_path: Path = Path("output/shorts_audio.m4a"),
+    concurrency: int = TTS_CONCURRENCY,
+    use_cache: bool = True,
+    voice: str = VOICE
 ):
     """Synchronous wrapper for the async function."""
-    return asyncio.run(generate_shorts_voice_async(script_path, output_path))
+    return asyncio.run(generate_shorts_voice_async(script_path, output_path, concurrency, use_cache, voice))
 
 if __name__ == "__main__":
     generate_shorts_voice()
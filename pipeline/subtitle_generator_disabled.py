@@ -3,24 +3,54 @@
 import subprocess
 from pathlib import Path
 import re
+from .media_probe import media_duration
+from .word_timings import load_timings, timings_path
 
-def create_subtitles(
-    script_path: Path = Path("output/script.txt"),
-    audio_path: Path = Path("output/audio.wav"),
-    output_path: Path = Path("output/subtitles.srt")
-):
-    """Create SRT subtitle file with word-level timing."""
-    
-    # Read script
+# Cue grouping for word-timed subtitles
+MAX_CUE_WORDS = 6
+MAX_CUE_SECONDS = 3.0
+PAUSE_SECONDS = 0.45  # a silence this long starts a new cue
+SENTENCE_END = (".", "!", "?", ";", ":")
+
+# Shared look for burned-in and ASS subtitles
+SUBTITLE_STYLE = {
+    "FontName": "Impact",
+    "FontSize": "32",
+    "PrimaryColour": "&H00FFFFFF",  # White text
+    "OutlineColour": "&H00000000",  # Black outline
+    "BackColour": "&H80000000",     # Semi-transparent background
+    "Bold": "1",
+    "Outline": "3",
+    "Shadow": "2",
+    "Alignment": "2",  # Bottom center
+}
+
+def build_cues(words):
+    """Group ``(start, duration, text)`` words into ``(start, end, text)`` cues.
+    A cue ends at sentence punctuation, a pause, or the word/length limits.
+    """
+    cues = []
+    current = []
+    for i, (start, duration, text) in enumerate(words):
+        current.append((start, duration, text))
+        cue_start = current[0][0]
+        end = start + duration
+        next_start = words[i + 1][0] if i + 1 < len(words) else None
+        if (
+            next_start is None
+            or text.endswith(SENTENCE_END)
+            or len(current) >= MAX_CUE_WORDS
+            or next_start - end >= PAUSE_SECONDS
+            or next_start + words[i + 1][1] - cue_start > MAX_CUE_SECONDS
+        ):
+            cues.append((cue_start, end, " ".join(w[2] for w in current)))
+            current = []
+    return cues
+
+def estimate_cues(script_path: Path, audio_path: Path):
+    """Legacy fallback: spread the script's sentences evenly over the audio."""
     script = script_path.read_text(encoding="utf-8")
-    
-    # Get audio duration
-    result = subprocess.run(
-        ["ffprobe", "-v", "error", "-show_entries", "format=duration", 
-         "-of", "default=noprint_wrappers=1:nokey=1", str(audio_path)],
-        capture_output=True, text=True
-    )
-    duration = float(result.stdout.strip())
+    duration = media_duration(audio_path)
     
     # Split script into sentences
     sentences = [s.strip() for s in re.split(r'[.!?]+', script) if s.strip()]
@@ -31,66 +61,109 @@ def create_subtitles(
     
     # Calculate timing per sentence
     time_per_sentence = duration / len(full_sentences)
+    return [
+        (i * time_per_sentence, (i + 1) * time_per_sentence, sentence)
+        for i, sentence in enumerate(full_sentences)
+    ]
+
+def create_subtitles(
+    script_path: Path = Path("output/script.txt"),
+    audio_path: Path = Path("output/audio.mp3"),
+    output_path: Path = Path("output/subtitles.srt")
+):
+    """Create an SRT (or ``.ass``) subtitle file with word-level timing.
+    Timings come from the word-timing index the voice generator saved next
+    to ``audio_path``; without one, sentences are spread evenly.
+    """
+    index_path = timings_path(audio_path)
+    if index_path.exists():
+        cues = build_cues(load_timings(index_path))
+    else:
+        print(f"⚠ No word timings at {index_path}, estimating from the script")
+        cues = estimate_cues(script_path, audio_path)
     
-    # Create SRT content
-    srt_content = []
-    current_time = 0
-    
-    for i, sentence in enumerate(full_sentences, 1):
-        start_time = current_time
-        end_time = current_time + time_per_sentence
-        
-        # Format timestamps (SRT format: HH:MM:SS,mmm)
-        start_str = format_timestamp(start_time)
-        end_str = format_timestamp(end_time)
-        
-        # Add subtitle entry
-        srt_content.append(f"{i}")
-        srt_content.append(f"{start_str} --> {end_str}")
-        srt_content.append(sentence.upper())  # Uppercase for impact
-        srt_content.append("")  # Blank line
-        
-        current_time = end_time
+    # Uppercase for impact
+    cues = [(start, end, text.upper()) for start, end, text in cues]
+    if output_path.suffix.lower() == ".ass":
+        content = cues_to_ass(cues)
+    else:
+        content = cues_to_srt(cues)
     
-    # Write SRT file
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(srt_content), encoding="utf-8")
+    output_path.write_text(content, encoding="utf-8")
     
-    print(f"✓ Subtitles created: {output_path}")
+    print(f"✓ Subtitles created: {output_path} ({len(cues)} cues)")
     return output_path
 
+def cues_to_srt(cues) -> str:
+    srt_content = []
+    for i, (start, end, text) in enumerate(cues, 1):
+        srt_content.append(f"{i}")
+        srt_content.append(f"{format_timestamp(start)} --> {format_timestamp(end)}")
+        srt_content.append(text)
+        srt_content.append("")  # Blank line
+    return "\n".join(srt_content)
+
+def cues_to_ass(cues) -> str:
+    fields = ", ".join(SUBTITLE_STYLE)
+    values = ",".join(SUBTITLE_STYLE.values())
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        "",
+        "[V4+ Styles]",
+        f"Format: Name, {fields}",
+        f"Style: Default,{values}",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Text",
+    ]
+    for start, end, text in cues:
+        text = text.replace("{", "(").replace("}", ")")
+        lines.append(f"Dialogue: 0,{format_ass_timestamp(start)},{format_ass_timestamp(end)},Default,{text}")
+    return "\n".join(lines) + "\n"
+
 def format_timestamp(seconds):
     """Convert seconds to SRT timestamp format."""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
+    millis = round(seconds * 1000)
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
+def format_ass_timestamp(seconds):
+    """Convert seconds to ASS timestamp format (centiseconds)."""
+    centis = round(seconds * 100)
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+def subtitle_filter(subtitle_path: Path) -> str:
+    """FFmpeg filter that draws ``subtitle_path`` onto the video.
+    ``.ass`` files carry their own style; SRT gets ``SUBTITLE_STYLE`` forced on.
+    """
+    path = str(Path(subtitle_path).absolute()).replace("'", "'\\''")
+    if Path(subtitle_path).suffix.lower() == ".ass":
+        return f"ass=filename='{path}'"
+    subtitle_style = ",".join(f"{k}={v}" for k, v in SUBTITLE_STYLE.items())
+    return f"subtitles=filename='{path}':force_style='{subtitle_style}'"
+
 def add_subtitles_to_video(
     video_path: Path = Path("output/final_video.mp4"),
     subtitle_path: Path = Path("output/subtitles.srt"),
     output_path: Path = Path("output/final_video_subtitled.mp4")
 ):
-    """Add animated subtitles to video using ffmpeg."""
-    
-    # Create subtitle style with animations
-    subtitle_style = (
-        "FontName=Impact,"
-        "FontSize=32,"
-        "PrimaryColour=&H00FFFFFF,"  # White text
-        "OutlineColour=&H00000000,"  # Black outline
-        "BackColour=&H80000000,"     # Semi-transparent background
-        "Bold=1,"
-        "Outline=3,"
-        "Shadow=2,"
-        "Alignment=2"  # Bottom center
-    )
+    """Add animated subtitles to an already rendered video using ffmpeg.
+    This re-encodes the whole video; for new renders pass ``subtitles`` to
+    ``video_assembler.assemble_video`` (or ``assemble_video_fast``) instead so
+    captions are drawn in the same encode. Kept for legacy files.
+    """
     
     cmd = [
         "ffmpeg", "-y",
         "-i", str(video_path),
-        "-vf", f"subtitles={subtitle_path}:force_style='{subtitle_style}'",
+        "-vf", subtitle_filter(subtitle_path),
         "-c:a", "copy",  # Copy audio without re-encoding
         "-c:v", "libx264",
         "-preset", "veryfast",
@@ -0,0 +1,154 @@
+# pipeline/tts_cache.py
+"""Persistent cache of synthesized speech segments.
+Each entry holds the audio for one script chunk and is keyed by a hash of
+the whitespace-normalized text plus everything else that changes the sound:
+voice, rate, pitch, backend and output format. Re-running a pipeline on an
+unchanged script costs no synthesis at all, and editing one paragraph only
+re-synthesizes that paragraph's chunks. The cache is kept under a size
+budget by evicting the least recently used entries. Word timings captured
+with a segment are kept beside it in a small JSON sidecar.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from .config import CACHE_DIR, TTS_CACHE_MAX_MB
+from .shared_index import SharedIndex
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-wrapped but otherwise identical text hits the cache."""
+    return " ".join(text.split())
+
+
+class TTSCache:
+    """Disk cache of synthesized audio segments with LRU eviction.
+
+    Args:
+        root (Path): Cache directory (default: ``<CACHE_DIR>/tts``).
+        max_bytes (int): Size budget; older segments are evicted above it.
+    """
+
+    def __init__(self, root: Path = None, max_bytes: int = TTS_CACHE_MAX_MB * 1024 * 1024):
+        self.root = Path(root) if root else Path(CACHE_DIR) / "tts"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index = SharedIndex(self.index_path)  # shared with other caches on the same root
+
+    @staticmethod
+    def key(text: str, voice: str, rate: str, pitch: str, backend: str, output_format: str) -> str:
+        spec = {
+            "text": normalize_text(text),
+            "voice": voice,
+            "rate": rate,
+            "pitch": pitch,
+            "backend": backend,
+            "format": output_format,
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def segment_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def words_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.words.json"
+
+    def get(self, key: str):
+        """Return the cached audio bytes for ``key``, or ``None`` on a miss."""
+        entry = self._index.load().get(key)
+        path = self.segment_path(key)
+        try:
+            data = path.read_bytes() if entry is not None else None
+        except OSError:
+            data = None
+        if data is None or len(data) != entry["size"]:
+            with self._lock:
+                self.misses += 1
+            if entry is not None:
+                with self._index.update() as index:
+                    index.pop(key, None)
+            return None
+        with self._lock:
+            self.hits += 1
+        with self._index.update() as index:
+            if key in index:
+                index[key]["last_used"] = time.time()
+        return data
+
+    def get_words(self, key: str):
+        """Return the word timings stored with ``key``, or ``None`` if there are none."""
+        if key not in self._index.load():
+            return None
+        try:
+            return json.loads(self.words_path(key).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write(self, path: Path, data: bytes):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put(self, key: str, data: bytes, words=None):
+        """Store ``data`` (and optional ``words`` timings) under ``key``.
+        Files are written to a temp name, then renamed.
+        """
+        if not data:
+            return
+        path = self.segment_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"size": len(data), "last_used": time.time()}
+        if words is not None:
+            sidecar = json.dumps(words, ensure_ascii=False).encode("utf-8")
+            self._write(self.words_path(key), sidecar)
+            entry["words_size"] = len(sidecar)
+        self._write(path, data)
+        with self._index.update() as index:
+            index[key] = entry
+            self._evict(index)
+
+    def entries(self) -> dict:
+        return self._index.load()
+
+    def total_bytes(self) -> int:
+        return self._total(self._index.load())
+
+    @staticmethod
+    def _total(index: dict) -> int:
+        return sum(e["size"] + e.get("words_size", 0) for e in index.values())
+
+    def clear(self):
+        with self._index.update() as index:
+            for key in list(index):
+                self.segment_path(key).unlink(missing_ok=True)
+                self.words_path(key).unlink(missing_ok=True)
+            index.clear()
+
+    def _evict(self, index: dict):
+        """Drop least recently used segments until the cache fits ``max_bytes``."""
+        total = self._total(index)
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            del index[key]
+            self.segment_path(key).unlink(missing_ok=True)
+            self.words_path(key).unlink(missing_ok=True)
+            total -= entry["size"] + entry.get("words_size", 0)
+
+
+if __name__ == "__main__":
+    # python -m pipeline.tts_cache [--clear]  -> show usage, optionally empty the cache
+    cache = TTSCache()
+    print(f"TTS cache at {cache.root}: {len(cache.entries())} segment(s), {cache.total_bytes() / 1e6:.1f} MB")
+    if "--clear" in sys.argv[1:]:
+        cache.clear()
+        print("✓ Cleared")
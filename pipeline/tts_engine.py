@@ -0,0 +1,389 @@
+# pipeline/tts_engine.py
+"""Chunked, concurrent Edge TTS synthesis shared by the voice modules.
+Long scripts are split at paragraph and sentence boundaries, the chunks are
+synthesized concurrently under an asyncio semaphore, and their MP3 frames
+are joined with runs of silent frames in the same format. Every join gets
+the same gap, and the audio decodes without clicks at the seams. Chunks are
+read from and written to the persistent ``TTSCache``, so only new or edited
+text is sent to the service.
+
+Finished chunks are piped in script order into one long-lived FFmpeg
+process that writes the narration track directly, so no temporary MP3 or
+full-size WAV is ever written. The WordBoundary events of every chunk are
+shifted onto the same timeline and saved as a word-timing index next to
+the audio (see ``word_timings``).
+"""
+import asyncio
+import re
+import tempfile
+import time
+from pathlib import Path
+import aiohttp
+import edge_tts
+from .config import TTS_CHUNK_CHARS, TTS_CHUNK_GAP_SECONDS, TTS_CONCURRENCY
+from .media_probe import MP3_BITRATES, MP3_SAMPLE_RATES, mp3_stream_duration
+from .tts_cache import TTSCache
+from .word_timings import TICKS_PER_SECOND, save_timings, timings_path
+
+SYNTHESIS_ATTEMPTS = 3
+BACKEND = f"edge-tts/{edge_tts.__version__}"
+OUTPUT_FORMAT = "audio-24khz-48kbitrate-mono-mp3"  # what edge_tts requests from the service
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+class ScriptChunker:
+    """Incremental form of ``split_script`` for text that arrives in pieces.
+    ``feed`` returns the chunks completed by the new text and ``close`` the
+    rest. A chunk is only cut once it can no longer grow (its paragraph has
+    ended, or the next sentence would not fit), so streamed text splits into
+    exactly the chunks the whole text would, and hits the same cache entries.
+    """
+
+    def __init__(self, max_chars: int = TTS_CHUNK_CHARS):
+        self.max_chars = max_chars
+        self._paragraph = ""  # raw text of the open paragraph
+        self._sentences = 0   # its sentences already packed
+        self._current = ""
+
+    def feed(self, text: str):
+        self._paragraph += text
+        chunks = []
+        *finished, self._paragraph = _PARAGRAPH_BREAK.split(self._paragraph)
+        for paragraph in finished:
+            chunks.extend(self._pack(_SENTENCE_END.split(paragraph)[self._sentences:]))
+            chunks.extend(self._flush())
+            self._sentences = 0
+        # Sentences followed by whitespace are complete; the last one may still grow
+        sentences = _SENTENCE_END.split(self._paragraph)[self._sentences:-1]
+        self._sentences += len(sentences)
+        chunks.extend(self._pack(sentences))
+        return chunks
+
+    def close(self):
+        chunks = self._pack(_SENTENCE_END.split(self._paragraph)[self._sentences:])
+        chunks.extend(self._flush())
+        self._paragraph, self._sentences = "", 0
+        return chunks
+
+    def _pack(self, sentences):
+        chunks = []
+        for sentence in sentences:
+            sentence = " ".join(sentence.split())
+            if not sentence:
+                continue
+            pieces = [sentence]
+            if len(sentence) > self.max_chars:
+                pieces, piece = [], ""
+                for word in sentence.split():
+                    if piece and len(piece) + 1 + len(word) > self.max_chars:
+                        pieces.append(piece)
+                        piece = word
+                    else:
+                        piece = f"{piece} {word}".strip()
+                pieces.append(piece)
+            for piece in pieces:
+                if self._current and len(self._current) + 1 + len(piece) > self.max_chars:
+                    chunks.append(self._current)
+                    self._current = piece
+                else:
+                    self._current = f"{self._current} {piece}".strip()
+        return chunks
+
+    def _flush(self):
+        chunk, self._current = self._current, ""
+        return [chunk] if chunk else []
+
+
+def split_script(text: str, max_chars: int = TTS_CHUNK_CHARS):
+    """Split ``text`` into chunks of at most ``max_chars`` characters.
+    Paragraphs are kept whole when they fit; otherwise they are split
+    between sentences, and overlong sentences between words.
+    """
+    chunker = ScriptChunker(max_chars)
+    return chunker.feed(text) + chunker.close()
+
+
+async def stream_chunks(pieces, max_chars: int = TTS_CHUNK_CHARS):
+    """Regroup an async stream of text pieces (e.g. LLM tokens) into TTS chunks as they complete."""
+    chunker = ScriptChunker(max_chars)
+    async for piece in pieces:
+        for chunk in chunker.feed(piece):
+            yield chunk
+    for chunk in chunker.close():
+        yield chunk
+
+
+async def synthesize_chunk(index: int, text: str, voice: str, rate: str, pitch: str, semaphore,
+                           cache: TTSCache = None):
+    """Synthesize one chunk; returns its MP3 bytes, word timings and latency stats.
+    Word timings are ``[start, duration, text]`` in seconds from the chunk start.
+    With a ``cache``, a previously synthesized chunk is returned without a request.
+    """
+    key = cache.key(text, voice, rate, pitch, BACKEND, OUTPUT_FORMAT) if cache else None
+    words = cache.get_words(key) if cache else None
+    audio = cache.get(key) if words is not None else None
+    if audio is not None:
+        return _chunk_result(index, text, audio, words, 0.0, cached=True)
+
+    async with semaphore:
+        for attempt in range(1, SYNTHESIS_ATTEMPTS + 1):
+            started = time.perf_counter()
+            audio = bytearray()
+            words = []
+            try:
+                communicate = edge_tts.Communicate(
+                    text=text, voice=voice, rate=rate, pitch=pitch, boundary="WordBoundary"
+                )
+                async for message in communicate.stream():
+                    if message["type"] == "audio":
+                        audio.extend(message["data"])
+                    elif message["type"] == "WordBoundary":
+                        words.append([
+                            message["offset"] / TICKS_PER_SECOND,
+                            message["duration"] / TICKS_PER_SECOND,
+                            message["text"],
+                        ])
+                break
+            except (edge_tts.exceptions.EdgeTTSException, aiohttp.ClientError, OSError) as e:
+                if attempt == SYNTHESIS_ATTEMPTS:
+                    raise
+                print(f"  ↻ Chunk {index} failed ({e}), retrying...")
+                await asyncio.sleep(attempt)
+        latency = time.perf_counter() - started
+    audio = bytes(audio)
+    if cache:
+        cache.put(key, audio, words)
+    return _chunk_result(index, text, audio, words, latency, cached=False)
+
+
+def _chunk_result(index: int, text: str, audio: bytes, words, latency: float, cached: bool) -> dict:
+    return {
+        "index": index,
+        "text": text,
+        "audio": audio,
+        "words": words,
+        "chars": len(text),
+        "latency": latency,
+        "duration": mp3_stream_duration(audio),
+        "cached": cached,
+    }
+
+
+async def synthesize_chunks(chunks, voice: str, rate: str = "+0%", pitch: str = "+0Hz",
+                            concurrency: int = TTS_CONCURRENCY, cache: TTSCache = None):
+    """Synthesize ``chunks`` concurrently; results come back in script order."""
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    return await asyncio.gather(*(
+        synthesize_chunk(i, text, voice, rate, pitch, semaphore, cache) for i, text in enumerate(chunks)
+    ))
+
+
+def silent_frames(template: bytes, seconds: float) -> bytes:
+    """MP3 frames of digital silence matching the format of ``template``'s first frame.
+    A frame whose side info and main data are all zero decodes to silence.
+    """
+    pos = 0
+    while pos + 4 <= len(template):
+        if template[pos] == 0xFF and (template[pos + 1] & 0xE0) == 0xE0:
+            break
+        pos += 1
+    else:
+        return b""
+    b1, b2, b3 = template[pos + 1], template[pos + 2], template[pos + 3]
+    version = (b1 >> 3) & 0x03
+    mpeg1 = version == 3
+    bitrate = MP3_BITRATES[(mpeg1, 4 - ((b1 >> 1) & 0x03))][b2 >> 4] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][(b2 >> 2) & 0x03]
+    frame_samples = 1152 if mpeg1 else 576
+    header = bytes([0xFF, b1 | 0x01, b2 & ~0x02 & 0xFF, b3])  # no CRC, no padding
+    frame = header + bytes(frame_samples // 8 * bitrate // sample_rate - 4)
+    count = round(seconds * sample_rate / frame_samples)
+    return frame * count
+
+
+def join_chunks(results, gap: float = TTS_CHUNK_GAP_SECONDS) -> bytes:
+    """Concatenate chunk MP3s with ``gap`` seconds of silent frames between them."""
+    audio = [r["audio"] for r in results if r["audio"]]
+    if not audio:
+        return b""
+    silence = silent_frames(audio[0], gap)
+    return silence.join(audio)
+
+
+def latency_stats(results) -> dict:
+    """Summary of per-chunk synthesis latency (cache hits excluded)."""
+    latencies = sorted(r["latency"] for r in results if not r.get("cached"))
+    cached = sum(1 for r in results if r.get("cached"))
+    if not latencies:
+        return {"chunks": 0, "cached": cached}
+    return {
+        "chunks": len(latencies),
+        "cached": cached,
+        "min": latencies[0],
+        "median": latencies[len(latencies) // 2],
+        "max": latencies[-1],
+        "total": sum(latencies),
+        "audio_seconds": sum(r["duration"] for r in results),
+    }
+
+
+def print_stats(results, wall_seconds: float):
+    stats = latency_stats(results)
+    if stats["cached"]:
+        print(f"  TTS cache: {stats['cached']} of {len(results)} chunk(s) reused")
+    if not stats["chunks"]:
+        return
+    print(
+        f"  TTS: {stats['chunks']} chunks, latency min/median/max "
+        f"{stats['min']:.1f}/{stats['median']:.1f}/{stats['max']:.1f}s, "
+        f"{stats['total']:.1f}s of requests in {wall_seconds:.1f}s wall clock, "
+        f"{stats['audio_seconds']:.1f}s of audio"
+    )
+
+
+async def synthesize_script(text: str, voice: str, rate: str = "+0%", pitch: str = "+0Hz",
+                            concurrency: int = TTS_CONCURRENCY, max_chars: int = TTS_CHUNK_CHARS,
+                            gap: float = TTS_CHUNK_GAP_SECONDS, use_cache: bool = True):
+    """Synthesize a whole script in concurrent chunks.
+    With ``use_cache`` unchanged chunks come from the persistent ``TTSCache``.
+
+    Returns:
+        tuple[bytes, list[dict]]: The joined MP3 and the per-chunk results.
+    """
+    started = time.perf_counter()
+    cache = TTSCache() if use_cache else None
+    results = await synthesize_chunks(split_script(text, max_chars), voice, rate, pitch, concurrency, cache)
+    print_stats(results, time.perf_counter() - started)
+    return join_chunks(results, gap), results
+
+
+# FFmpeg output options per narration container. The service delivers MP3,
+# so ``.mp3`` is a pure stream copy: no decode or encode at all.
+NARRATION_CODEC_ARGS = {
+    ".mp3": ["-c:a", "copy"],
+    ".m4a": ["-c:a", "aac", "-b:a", "128k"],
+    ".wav": ["-ar", "44100", "-ac", "2"],
+}
+
+
+def encoder_command(output_path: Path, max_seconds: float = None):
+    """FFmpeg command that reads MP3 frames on stdin and writes ``output_path``."""
+    codec_args = NARRATION_CODEC_ARGS.get(output_path.suffix.lower())
+    if codec_args is None:
+        raise RuntimeError(f"Unsupported narration format: {output_path.suffix}")
+    cmd = ["ffmpeg", "-y", "-v", "error", "-f", "mp3", "-i", "pipe:0", *codec_args]
+    if max_seconds:
+        cmd.extend(["-t", str(max_seconds)])
+    cmd.append(str(output_path))
+    return cmd
+
+
+async def synthesize_in_order(chunks, voice: str, rate: str = "+0%", pitch: str = "+0Hz",
+                              concurrency: int = TTS_CONCURRENCY, cache: TTSCache = None):
+    """Start every chunk (``concurrency`` at a time) and yield the results in script order.
+    ``chunks`` may be a list or an async iterator (see ``stream_chunks``);
+    chunks are started as they arrive, while earlier ones are still synthesizing.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    queue = asyncio.Queue()
+    tasks = []
+
+    async def start_all():
+        try:
+            if hasattr(chunks, "__aiter__"):
+                index = 0
+                async for text in chunks:
+                    queue.put_nowait(_start(index, text))
+                    index += 1
+            else:
+                for index, text in enumerate(chunks):
+                    queue.put_nowait(_start(index, text))
+        finally:
+            queue.put_nowait(None)
+
+    def _start(index, text):
+        task = asyncio.create_task(synthesize_chunk(index, text, voice, rate, pitch, semaphore, cache))
+        tasks.append(task)
+        return task
+
+    producer = asyncio.create_task(start_all())
+    try:
+        while (task := await queue.get()) is not None:
+            yield await task
+        await producer  # re-raise a failure of the chunk source
+    finally:
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
+
+
+async def write_narration(results, output_path: Path, gap: float = TTS_CHUNK_GAP_SECONDS,
+                          max_seconds: float = None, words_path: Path = None):
+    """Pipe chunk ``results`` (an async iterator in script order) into one FFmpeg process.
+    Each chunk is written the moment it and everything before it has arrived,
+    so encoding overlaps synthesis and no temporary audio file is written.
+    Word timings are offset by the audio and silence written before each
+    chunk and saved to ``words_path`` (default: ``timings_path(output_path)``).
+    Returns the results that were written.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    written = []
+    words = []
+    position = 0.0
+    with tempfile.TemporaryFile() as stderr:
+        encoder = await asyncio.create_subprocess_exec(
+            *encoder_command(output_path, max_seconds), stdin=asyncio.subprocess.PIPE, stderr=stderr
+        )
+        try:
+            try:
+                silence = None
+                async for result in results:
+                    written.append(result)
+                    if not result["audio"]:
+                        continue
+                    if silence is None:
+                        silence = silent_frames(result["audio"], gap)
+                        silence_seconds = mp3_stream_duration(silence)
+                    else:
+                        encoder.stdin.write(silence)
+                        position += silence_seconds
+                    words.extend((position + start, duration, word) for start, duration, word in result["words"])
+                    position += result["duration"]
+                    encoder.stdin.write(result["audio"])
+                    await encoder.stdin.drain()
+            finally:
+                await results.aclose()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The encoder stopped reading (``max_seconds`` reached, or it failed)
+        except BaseException:
+            encoder.kill()
+            await encoder.wait()
+            output_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if encoder.returncode is None:
+                encoder.stdin.close()
+                await encoder.wait()
+        if encoder.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"FFmpeg failed: {stderr.read().decode(errors='replace')}")
+    if max_seconds:
+        words = [w for w in words if w[0] < max_seconds]
+    save_timings(words, words_path or timings_path(output_path))
+    return written
+
+
+async def synthesize_to_file(text: str, output_path: Path, voice: str, rate: str = "+0%", pitch: str = "+0Hz",
+                             concurrency: int = TTS_CONCURRENCY, use_cache: bool = True,
+                             gap: float = TTS_CHUNK_GAP_SECONDS):
+    """Synthesize ``text`` and stream it straight into ``output_path``; returns chunk results.
+    The container follows the suffix (see ``NARRATION_CODEC_ARGS``); the
+    word-timing index is saved beside it.
+    """
+    started = time.perf_counter()
+    cache = TTSCache() if use_cache else None
+    chunks = synthesize_in_order(split_script(text), voice, rate, pitch, concurrency, cache)
+    results = await write_narration(chunks, output_path, gap)
+    print_stats(results, time.perf_counter() - started)
+    return results
@@ -0,0 +1,336 @@
+# pipeline/upload_queue.py
+"""Persistent background upload queue.
+Finished videos are added to a queue (SQLite, in ``UPLOAD_QUEUE_DIR``) and
+the pipeline moves on; one long-lived worker process uploads them while
+the next video renders. The worker signs in once and reuses that
+authorized session (the token is only refreshed when it expires) for every
+item, and resumes interrupted uploads from their saved sessions (see
+``resumable_upload``), including after a crash.
+
+Each item records its attempts, retried chunks and the API quota it used.
+The worker keeps the day's total under ``YOUTUBE_DAILY_QUOTA`` and waits
+for the Pacific-time reset instead of failing uploads.
+
+    python -m pipeline.upload_queue add VIDEO METADATA   # queue (and start a worker)
+    python -m pipeline.upload_queue worker [--idle-exit SECONDS]
+    python -m pipeline.upload_queue status
+    python -m pipeline.upload_queue retry ID
+    python -m pipeline.upload_queue authorize            # sign in (opens a browser) for the worker
+"""
+import argparse
+import datetime
+import fcntl
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+from .config import UPLOAD_QUEUE_DIR, YOUTUBE_DAILY_QUOTA, YOUTUBE_UPLOAD_URL
+from .image_store import link_or_copy
+
+INSERT_COST = 1600  # quota units charged per videos.insert (upload session)
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 120.0  # seconds before a failed item is tried again (doubles per attempt)
+POLL_SECONDS = 5.0
+IDLE_EXIT_SECONDS = 600.0
+ADDING_TIMEOUT = 3600.0  # an item still being added after this long was left by a crashed run
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    retries INTEGER NOT NULL DEFAULT 0,
+    quota_units INTEGER NOT NULL DEFAULT 0,
+    video_id TEXT,
+    error TEXT,
+    enqueued REAL NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS quota (spent REAL NOT NULL, units INTEGER NOT NULL);
+"""
+
+
+def quota_day_start(now: float = None) -> float:
+    """Timestamp of the last YouTube quota reset (midnight Pacific time)."""
+    try:
+        from zoneinfo import ZoneInfo
+        zone = ZoneInfo("America/Los_Angeles")
+    except Exception:
+        zone = datetime.timezone.utc
+    local = datetime.datetime.fromtimestamp(now or time.time(), zone)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+class UploadQueue:
+    """Queue of videos to upload, shared by pipeline runs and the worker.
+
+    Args:
+        root (Path): Queue directory (default: ``UPLOAD_QUEUE_DIR``).
+    """
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root or UPLOAD_QUEUE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.root / "queue.db", timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def item_dir(self, item_id: int) -> Path:
+        return self.root / str(item_id)
+
+    def add(self, video: Path, metadata: Path) -> int:
+        """Queue ``video``; it is hard-linked (copied across file systems) with
+        ``metadata`` into the queue, so the next render can replace them. A
+        render must write a new file rather than rewrite the old one in place
+        (``dag_runner`` removes a stage's outputs before running it).
+        """
+        with self._connect() as db:
+            item_id = db.execute(
+                "INSERT INTO uploads (source, status, enqueued) VALUES (?, 'adding', ?)",
+                (str(video), time.time()),
+            ).lastrowid
+        spool = self.item_dir(item_id)
+        spool.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(metadata, spool / "metadata.json")
+        link_or_copy(Path(video), spool / "video.mp4")
+        with self._connect() as db:
+            db.execute("UPDATE uploads SET status = 'pending' WHERE id = ?", (item_id,))
+        print(f"📤 Queued {video} for upload (#{item_id})")
+        return item_id
+
+    def claim(self):
+        """Mark the next due item as uploading and return it, or ``None``."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT * FROM uploads WHERE status = 'pending' AND not_before <= ? ORDER BY id LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE uploads SET status = 'uploading', attempts = attempts + 1 WHERE id = ?", (row["id"],))
+            db.execute("COMMIT")
+            return row
+        finally:
+            db.close()
+
+    def recover(self):
+        """Return items left 'uploading' by a crashed worker to the queue, and
+        drop items whose ``add`` never finished (with their partial spool).
+        """
+        with self._connect() as db:
+            db.execute("UPDATE uploads SET status = 'pending' WHERE status = 'uploading'")
+            stale = db.execute(
+                "SELECT id FROM uploads WHERE status = 'adding' AND enqueued < ?",
+                (time.time() - ADDING_TIMEOUT,),
+            ).fetchall()
+            for row in stale:
+                db.execute("DELETE FROM uploads WHERE id = ?", (row["id"],))
+                shutil.rmtree(self.item_dir(row["id"]), ignore_errors=True)
+        if stale:
+            print(f"⚠ Dropped {len(stale)} upload(s) left half-queued by a crashed run")
+
+    def record_usage(self, item_id: int, retries: int, units: int):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE uploads SET retries = retries + ?, quota_units = quota_units + ? WHERE id = ?",
+                (retries, units, item_id),
+            )
+            if units:
+                db.execute("INSERT INTO quota (spent, units) VALUES (?, ?)", (time.time(), units))
+
+    def finish(self, item_id: int, video_id: str):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE uploads SET status = 'done', video_id = ?, error = NULL, finished = ? WHERE id = ?",
+                (video_id, time.time(), item_id),
+            )
+        shutil.rmtree(self.item_dir(item_id), ignore_errors=True)
+
+    def fail(self, item_id: int, error: str, not_before: float = None, final: bool = False):
+        """Put an item back with a delay, or mark it failed (after ``MAX_ATTEMPTS``, or at once if ``final``)."""
+        with self._connect() as db:
+            attempts = db.execute("SELECT attempts FROM uploads WHERE id = ?", (item_id,)).fetchone()["attempts"]
+            if final or (not_before is None and attempts >= MAX_ATTEMPTS):
+                db.execute("UPDATE uploads SET status = 'failed', error = ? WHERE id = ?", (error, item_id))
+                return
+            if not_before is None:
+                not_before = time.time() + RETRY_DELAY * 2 ** (attempts - 1)
+            db.execute(
+                "UPDATE uploads SET status = 'pending', error = ?, not_before = ? WHERE id = ?",
+                (error, not_before, item_id),
+            )
+
+    def retry(self, item_id: int):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE uploads SET status = 'pending', attempts = 0, not_before = 0 WHERE id = ? AND status = 'failed'",
+                (item_id,),
+            )
+
+    def quota_used(self) -> int:
+        """Units spent since the last quota reset."""
+        with self._connect() as db:
+            row = db.execute("SELECT COALESCE(SUM(units), 0) FROM quota WHERE spent >= ?", (quota_day_start(),)).fetchone()
+        return row[0]
+
+    def item(self, item_id: int):
+        with self._connect() as db:
+            return db.execute("SELECT * FROM uploads WHERE id = ?", (item_id,)).fetchone()
+
+    def items(self):
+        with self._connect() as db:
+            return db.execute("SELECT * FROM uploads ORDER BY id").fetchall()
+
+
+# --- worker ------------------------------------------------------------------
+
+def worker_lock(queue: UploadQueue):
+    """Open file holding the single-worker lock, or ``None`` if another worker has it."""
+    handle = open(queue.root / "worker.lock", "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+def ensure_worker(queue: UploadQueue = None):
+    """Start a background worker unless one is already running."""
+    queue = queue or UploadQueue()
+    lock = worker_lock(queue)
+    if lock is None:
+        return False
+    lock.close()
+    log = open(queue.root / "worker.log", "a")
+    subprocess.Popen(
+        [sys.executable, "-m", "pipeline.upload_queue", "--queue-dir", str(queue.root), "worker"],
+        stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, start_new_session=True,
+    )
+    print(f"🚀 Started background upload worker (log: {queue.root / 'worker.log'})")
+    return True
+
+
+def upload_item(queue: UploadQueue, item, session, endpoint: str = YOUTUBE_UPLOAD_URL):
+    """Upload one claimed item through ``session``; returns the video id."""
+    from .resumable_upload import ResumableUpload
+    from .youtube_uploader import video_body
+
+    spool = queue.item_dir(item["id"])
+    upload = ResumableUpload(spool / "video.mp4", video_body(spool / "metadata.json"), session, endpoint,
+                             state_path=spool / "upload.json")
+    # Charged before starting, so the quota stays counted if this process dies mid-upload
+    charged = 0 if upload.session_uri else 1
+    queue.record_usage(item["id"], 0, charged * INSERT_COST)
+    try:
+        return upload.run()["id"]
+    finally:
+        extra = max(upload.sessions_started - charged, 0)
+        queue.record_usage(item["id"], upload.retries, extra * INSERT_COST)
+
+
+def needs_reauthorization(error: Exception) -> bool:
+    """Whether ``error`` means the OAuth token is gone (only a person can fix that)."""
+    from .youtube_uploader import ReauthorizationRequired
+    return isinstance(error, ReauthorizationRequired) or type(error).__name__ == "RefreshError"
+
+
+def run_worker(queue: UploadQueue = None, session=None, endpoint: str = YOUTUBE_UPLOAD_URL,
+               idle_exit: float = IDLE_EXIT_SECONDS, poll: float = POLL_SECONDS):
+    """Upload queued items until the queue has been empty for ``idle_exit`` seconds.
+    ``session`` defaults to one ``AuthorizedSession`` created on first use
+    from the saved token; the worker never opens the browser sign-in (see
+    the ``authorize`` command).
+    """
+    queue = queue or UploadQueue()
+    lock = worker_lock(queue)
+    if lock is None:
+        print("Another upload worker is already running")
+        return
+    queue.recover()
+    idle_since = time.time()
+    with lock:
+        while True:
+            if queue.quota_used() + INSERT_COST > YOUTUBE_DAILY_QUOTA:
+                resume_at = quota_day_start() + 86400 + 60
+                print(f"⏸ Daily quota used; waiting until {time.strftime('%H:%M', time.localtime(resume_at))}")
+                time.sleep(max(resume_at - time.time(), poll))
+                continue
+            item = queue.claim()
+            if item is None:
+                if time.time() - idle_since > idle_exit:
+                    print("Upload queue empty, worker exiting")
+                    return
+                time.sleep(poll)
+                continue
+            print(f"▶ Uploading #{item['id']} ({item['source']}), attempt {item['attempts'] + 1}")
+            try:
+                if session is None:
+                    from .youtube_uploader import authorized_session
+                    session = authorized_session(interactive=False)
+                video_id = upload_item(queue, item, session, endpoint)
+            except Exception as e:
+                if needs_reauthorization(e):
+                    # Every other item would fail the same way; stop until someone signs in again
+                    queue.fail(item["id"], f"re-authorize: {e}", final=True)
+                    print(f"❌ #{item['id']} failed: {e}")
+                    print("⏸ Worker stopped; run `python -m pipeline.upload_queue authorize`, then `retry`")
+                    return
+                quota_hit = "quotaExceeded" in str(e) or "uploadLimitExceeded" in str(e)
+                queue.fail(item["id"], str(e), quota_day_start() + 86400 + 60 if quota_hit else None)
+                print(f"❌ #{item['id']} failed: {e}")
+            else:
+                queue.finish(item["id"], video_id)
+                print(f"✓ #{item['id']} uploaded: https://youtu.be/{video_id}")
+            idle_since = time.time()
+
+
+def print_status(queue: UploadQueue):
+    items = queue.items()
+    print(f"📊 Upload queue at {queue.root}: quota used today {queue.quota_used()}/{YOUTUBE_DAILY_QUOTA}")
+    for item in items:
+        detail = item["video_id"] or (item["error"] or "")[:60]
+        print(f"  #{item['id']:<4d} {item['status']:9s} attempts {item['attempts']} retries {item['retries']:<3d} "
+              f"quota {item['quota_units']:<5d} {item['source']} {detail}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background YouTube upload queue.")
+    parser.add_argument("--queue-dir", type=Path, default=Path(UPLOAD_QUEUE_DIR))
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="queue a video and start a worker if none is running")
+    add.add_argument("video", type=Path)
+    add.add_argument("metadata", type=Path)
+    worker = commands.add_parser("worker", help="upload queued videos")
+    worker.add_argument("--idle-exit", type=float, default=IDLE_EXIT_SECONDS, help="exit after this long idle")
+    commands.add_parser("status", help="list queued uploads")
+    retry = commands.add_parser("retry", help="queue a failed upload again")
+    retry.add_argument("id", type=int)
+    commands.add_parser("authorize", help="sign in to YouTube and save the token the worker uses")
+    args = parser.parse_args()
+
+    if args.command == "authorize":
+        from .youtube_uploader import get_credentials
+        get_credentials(Path("client_secret.json"))
+        print("✓ Token saved to token.json")
+        raise SystemExit(0)
+
+    upload_queue = UploadQueue(args.queue_dir)
+    if args.command == "add":
+        upload_queue.add(args.video, args.metadata)
+        ensure_worker(upload_queue)
+    elif args.command == "worker":
+        run_worker(upload_queue, idle_exit=args.idle_exit)
+    elif args.command == "status":
+        print_status(upload_queue)
+    else:
+        upload_queue.retry(args.id)
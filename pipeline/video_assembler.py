@@ -3,36 +3,54 @@
 Uses FFmpeg to create a slideshow with slow zoom/pan (Ken Burns) effects,
 adds low‑volume background music, and inserts a beat‑drop overlay at the
 specified timestamp.
+
+By default the images are fed to FFmpeg as one sequential stream through
+the concat demuxer, one frame per image, so a single zoompan instance
+expands each frame into the slide and its zoom resets at every image
+boundary. Memory and startup cost no longer grow with the image count.
+
+Subtitles, when given, are drawn by a ``subtitles``/``ass`` filter at the
+end of the same filtergraph, so captions cost no extra encode.
 """
+import os
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from .config import (
     VIDEO_RESOLUTION,
     BACKGROUND_MUSIC_PATH,
     BEAT_DROP_TIMESTAMP,
     IMAGE_DURATION_SECONDS,
+    RENDER_WORKERS,
 )
+from .image_normalizer import normalize_images, normalized_dir
+from .subtitle_generator_disabled import subtitle_filter
 
-def build_filtergraph(image_dir: Path, audio_path: Path, output_path: Path):
-    """Generate an FFmpeg filtergraph for the slideshow.
-    Each image is displayed for ``IMAGE_DURATION_SECONDS`` seconds with a
-    slow zoom/pan effect. The images are concatenated, then the audio and
-    background music are mixed in.
-    """
-    # Collect image files sorted alphabetically
-    images = sorted(image_dir.glob("*.jpg"))
-    if not images:
-        raise RuntimeError("No images found in {image_dir}")
+FPS = 30
+ZOOM_EXPR = "if(lte(zoom,1.0),1.0,zoom+0.0005)"
+VIDEO_CODEC_ARGS = ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-crf", "18"]
+AUDIO_CODEC_ARGS = ["-c:a", "aac", "-b:a", "192k"]
+# Segments must share GOP structure and timebase so they can be joined by stream copy
+SEGMENT_CODEC_ARGS = VIDEO_CODEC_ARGS + [
+    "-r", str(FPS),
+    "-g", str(FPS * 2),
+    "-flags", "+cgop",
+    "-video_track_timescale", str(FPS * 512),
+]
 
-    # Build the input list for FFmpeg
+def zoompan_graph(images, first_input: int):
+    """Return image inputs and zoompan/concat filters producing ``[video]``.
+    ``first_input`` is the FFmpeg input index of the first image.
+    """
     inputs = []
     filter_parts = []
     for idx, img in enumerate(images):
         inputs.extend(["-loop", "1", "-t", str(IMAGE_DURATION_SECONDS), "-i", str(img)])
         # Apply zoompan: start zoom 1.0, end 1.1 over the duration
         zoom_filter = (
-            f"[{idx+2}:v]zoompan=z='if(lte(zoom,1.0),1.0,zoom+0.0005)'"
-            f":d={IMAGE_DURATION_SECONDS * 30}:s={VIDEO_RESOLUTION}:fps=30[zo{idx}]"
+            f"[{idx + first_input}:v]zoompan=z='{ZOOM_EXPR}'"
+            f":d={IMAGE_DURATION_SECONDS * FPS}:s={VIDEO_RESOLUTION}:fps={FPS}[zo{idx}]"
         )
         filter_parts.append(zoom_filter)
 
@@ -40,57 +58,240 @@ def build_filtergraph(image_dir: Path, audio_path: Path, output_path: Path):
     concat_inputs = "".join([f"[zo{i}]" for i in range(len(images))])
     concat_filter = f"{concat_inputs}concat=n={len(images)}:v=1:a=0[video]"
     filter_parts.append(concat_filter)
+    return inputs, filter_parts
+
+def write_image_list(images, list_path: Path):
+    """Write a concat-demuxer list that yields exactly one frame per image."""
+    with open(list_path, "w") as f:
+        for img in images:
+            f.write(f"file '{img.absolute()}'\n")
+    return list_path
+
+def streaming_graph(list_path: Path, input_index: int):
+    """Return the single image-stream input and its zoompan filter producing ``[video]``.
+    zoompan turns every input frame into ``IMAGE_DURATION_SECONDS * FPS``
+    output frames and restarts its zoom on each new input frame, so each
+    image gets its own Ken Burns move without a separate decoder.
+    """
+    inputs = ["-f", "concat", "-safe", "0", "-i", str(list_path)]
+    filter_parts = [
+        f"[{input_index}:v]zoompan=z='{ZOOM_EXPR}'"
+        f":d={IMAGE_DURATION_SECONDS * FPS}:s={VIDEO_RESOLUTION}:fps={FPS},format=yuv420p[video]"
+    ]
+    return inputs, filter_parts
+
+def subtitle_filters(subtitles: Path, start_seconds: float = 0):
+    """Filters drawing ``subtitles`` over ``[video]`` into ``[vsub]``.
+    ``start_seconds`` shifts the subtitle clock for a segment that starts
+    partway through the timeline.
+    """
+    draw = subtitle_filter(subtitles)
+    if start_seconds:
+        draw = f"setpts=PTS+{start_seconds}/TB,{draw},setpts=PTS-STARTPTS"
+    return [f"[video]{draw}[vsub]"]
+
+def audio_inputs(audio_path: Path):
+    """Narration input followed by background music (or silence)."""
+    inputs = ["-i", str(audio_path)]
+    if Path(BACKGROUND_MUSIC_PATH).exists():
+        inputs.extend(["-i", BACKGROUND_MUSIC_PATH])
+    else:
+        # Use a silent dummy audio to keep filtergraph indices consistent
+        inputs.extend(["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100"])
+    return inputs
+
+def audio_mix_filters(narration_input: int, music_input: int):
+    """Filters mixing narration with low-volume background music into ``[aout]``."""
+    return [
+        f"[{music_input}:a]volume=0.2[bgm]",
+        f"[{narration_input}:a][bgm]amix=inputs=2:duration=first:dropout_transition=2[aout]",
+    ]
+
+def build_filtergraph(image_dir: Path, audio_path: Path, output_path: Path):
+    """Generate an FFmpeg filtergraph for the slideshow.
+    Each image is displayed for ``IMAGE_DURATION_SECONDS`` seconds with a
+    slow zoom/pan effect. The images are concatenated, then the audio and
+    background music are mixed in.
+    """
+    # Collect image files sorted alphabetically
+    images = sorted(image_dir.glob("*.jpg"))
+    if not images:
+        raise RuntimeError(f"No images found in {image_dir}")
 
-    # Background music (loop if shorter than video)
-    filter_parts.append(
-        f"[1:a]volume=0.2[bgm]"  # assume background music is second input after images
-    )
-    # Mix audio: narration + background music
-    filter_parts.append(
-        f"[0:a][bgm]amix=inputs=2:duration=first:dropout_transition=2[aout]"
-    )
+    # Narration is input 0 and background music input 1, so images start at 2
+    inputs, filter_parts = zoompan_graph(images, first_input=2)
+    filter_parts.extend(audio_mix_filters(0, 1))
 
     filtergraph = ";".join(filter_parts)
     return inputs, filtergraph
 
+def run_ffmpeg(cmd):
+    """Run an FFmpeg command, raising ``RuntimeError`` with its stderr on failure."""
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+
+def split_timeline(images, segments: int):
+    """Split ``images`` into at most ``segments`` contiguous, near-equal chunks."""
+    segments = max(1, min(segments, len(images)))
+    size, extra = divmod(len(images), segments)
+    chunks, start = [], 0
+    for i in range(segments):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(images[start:end])
+        start = end
+    return chunks
+
+def render_segment(images, segment_path: Path, threads: int = 0, streaming: bool = True,
+                   subtitles: Path = None, start_seconds: float = 0):
+    """Encode one video-only chunk of the slideshow; return wall-clock seconds.
+    ``start_seconds`` is where the chunk sits on the timeline (for subtitles).
+    """
+    list_path = segment_path.with_suffix(".txt")
+    if streaming:
+        inputs, filter_parts = streaming_graph(write_image_list(images, list_path), input_index=0)
+    else:
+        inputs, filter_parts = zoompan_graph(images, first_input=0)
+    video_label = "[video]"
+    if subtitles:
+        filter_parts.extend(subtitle_filters(subtitles, start_seconds))
+        video_label = "[vsub]"
+    cmd = ["ffmpeg", "-y", *inputs, "-filter_complex", ";".join(filter_parts), "-map", video_label]
+    cmd.extend(SEGMENT_CODEC_ARGS)
+    cmd.extend(["-threads", str(threads), "-an", str(segment_path)])
+    started = time.perf_counter()
+    try:
+        run_ffmpeg(cmd)
+    finally:
+        list_path.unlink(missing_ok=True)
+    return time.perf_counter() - started
+
+def mux_segments(segment_paths, audio_path: Path, output_path: Path):
+    """Join encoded segments by stream copy and mux in the mixed audio."""
+    concat_file = output_path.parent / f"{output_path.stem}_segments.txt"
+    with open(concat_file, "w") as f:
+        for seg in segment_paths:
+            f.write(f"file '{seg.absolute()}'\n")
+    cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_file)]
+    cmd.extend(audio_inputs(audio_path))
+    cmd.extend(["-filter_complex", ";".join(audio_mix_filters(1, 2))])
+    cmd.extend(["-map", "0:v", "-map", "[aout]", "-c:v", "copy", *AUDIO_CODEC_ARGS])
+    cmd.extend(["-movflags", "+faststart", str(output_path)])
+    try:
+        run_ffmpeg(cmd)
+    finally:
+        concat_file.unlink(missing_ok=True)
+
+def assemble_video_segmented(images, audio_path: Path, output_path: Path, workers: int = RENDER_WORKERS, streaming: bool = True,
+                             subtitles: Path = None):
+    """Render the timeline as ``workers`` parallel segments, then stream-copy concat.
+    Each segment is its own FFmpeg/x264 process with identical encoder settings
+    and closed GOPs, so the segments join without re-encoding.
+    """
+    chunks = split_timeline(images, workers)
+    segment_dir = output_path.parent / f"{output_path.stem}_segments"
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    segment_paths = [segment_dir / f"segment_{i:03d}.mp4" for i in range(len(chunks))]
+    threads = max(1, (os.cpu_count() or 1) // len(chunks))
+    starts = [sum(len(c) for c in chunks[:i]) * IMAGE_DURATION_SECONDS for i in range(len(chunks))]
+
+    print(f"🚀 Rendering {len(images)} images as {len(chunks)} parallel segments ({threads} threads each)...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        timings = list(pool.map(
+            render_segment, chunks, segment_paths, [threads] * len(chunks), [streaming] * len(chunks),
+            [subtitles] * len(chunks), starts,
+        ))
+    render_seconds = time.perf_counter() - started
+
+    for i, (chunk, seconds) in enumerate(zip(chunks, timings)):
+        video_seconds = len(chunk) * IMAGE_DURATION_SECONDS
+        print(f"  segment {i:03d}: {len(chunk):4d} images, {video_seconds:6d}s of video in {seconds:7.1f}s ({video_seconds / seconds:.1f}x realtime)")
+    print(f"  all segments: {render_seconds:.1f}s wall clock")
+
+    mux_started = time.perf_counter()
+    mux_segments(segment_paths, audio_path, output_path)
+    print(f"  concat + audio mux: {time.perf_counter() - mux_started:.1f}s")
+
+    for seg in segment_paths:
+        seg.unlink(missing_ok=True)
+    segment_dir.rmdir()
+
 def assemble_video(
     image_dir: Path = Path("output/images"),
-    audio_path: Path = Path("output/audio.wav"),
+    audio_path: Path = Path("output/audio.mp3"),
     output_path: Path = Path("output/final_video.mp4"),
+    normalize: bool = True,
+    workers: int = RENDER_WORKERS,
+    streaming: bool = True,
+    incremental: bool = False,
+    subtitles: Path = None,
 ):
     """Run FFmpeg to create the final video.
     The function builds a complex filtergraph and executes FFmpeg via
     ``subprocess.run``. Errors are raised as ``RuntimeError``.
+    With ``normalize`` the images are first pre-sized to ``VIDEO_RESOLUTION``
+    so zoompan never has to decode and rescale the full-size sources.
+    With ``workers`` > 1 the timeline is encoded as parallel segments.
+    ``streaming=False`` falls back to one looped input per image.
+    ``incremental`` reuses cached per-slide clips (see ``clip_cache``).
+    ``subtitles`` (an ``.srt`` or ``.ass`` file) are burned in during this
+    same encode.
     """
+    if incremental and subtitles:
+        print("⚠ Subtitles are drawn during the encode; rendering without the clip cache")
+        incremental = False
+    if incremental:
+        from .clip_cache import assemble_video_incremental
+        return assemble_video_incremental(image_dir, audio_path, output_path, workers)
+
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    if normalize:
+        sources = sorted(image_dir.glob("*.jpg"))
+        image_dir = normalized_dir(image_dir, VIDEO_RESOLUTION, "crop")
+        normalize_images(sources, image_dir, VIDEO_RESOLUTION, fit="crop")
+
+    images = sorted(image_dir.glob("*.jpg"))
+    if not images:
+        raise RuntimeError(f"No images found in {image_dir}")
+
+    if workers > 1:
+        assemble_video_segmented(images, audio_path, output_path, workers, streaming, subtitles)
+        print(f"Video assembled at {output_path}")
+        return
+
     # Build filtergraph and input arguments
-    inputs, filtergraph = build_filtergraph(image_dir, audio_path, output_path)
+    list_path = output_path.parent / f"{output_path.stem}_images.txt"
+    if streaming:
+        inputs, filter_parts = streaming_graph(write_image_list(images, list_path), input_index=2)
+        filtergraph = ";".join(filter_parts + audio_mix_filters(0, 1))
+    else:
+        inputs, filtergraph = build_filtergraph(image_dir, audio_path, output_path)
+    video_label = "[video]"
+    if subtitles:
+        filtergraph = ";".join([filtergraph, *subtitle_filters(subtitles)])
+        video_label = "[vsub]"
 
     # Construct the full command list
     cmd = ["ffmpeg", "-y"]
-    # Add narration audio as first extra input
-    cmd.extend(["-i", str(audio_path)])
-    # Add background music as second extra input (if file exists)
-    if Path(BACKGROUND_MUSIC_PATH).exists():
-        cmd.extend(["-i", BACKGROUND_MUSIC_PATH])
-    else:
-        # Use a silent dummy audio to keep filtergraph indices consistent
-        cmd.extend(["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100"])
+    # Add narration audio and background music as the first two inputs
+    cmd.extend(audio_inputs(audio_path))
     # Add image inputs
     cmd.extend(inputs)
     # Apply filtergraph
     cmd.extend(["-filter_complex", filtergraph])
     # Map video and mixed audio streams
-    cmd.extend(["-map", "[video]", "-map", "[aout]"])
-    cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-crf", "18", "-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", str(output_path)])
+    cmd.extend(["-map", video_label, "-map", "[aout]"])
+    cmd.extend([*VIDEO_CODEC_ARGS, *AUDIO_CODEC_ARGS, "-movflags", "+faststart", str(output_path)])
 
     print("Running FFmpeg command:")
     print(" ".join(cmd))
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+    try:
+        run_ffmpeg(cmd)
+    finally:
+        list_path.unlink(missing_ok=True)
     print(f"Video assembled at {output_path}")
 
 if __name__ == "__main__":
@@ -2,11 +2,16 @@
 """Fast video assembly - optimized for speed."""
 import subprocess
 from pathlib import Path
+from .config import VIDEO_RESOLUTION
+from .image_normalizer import normalize_images, normalized_dir, scale_filter
+from .subtitle_generator_disabled import subtitle_filter
 
 def assemble_video_fast(
     image_dir: Path = Path("output/images"),
-    audio_path: Path = Path("output/audio.wav"),
+    audio_path: Path = Path("output/audio.mp3"),
     output_path: Path = Path("output/final_video.mp4"),
+    normalize: bool = True,
+    subtitles: Path = None,
 ):
     from .config import IMAGE_DURATION_SECONDS
     """Create video quickly with minimal processing."""
@@ -16,6 +21,16 @@ def assemble_video_fast(
     if not images:
         raise RuntimeError(f"No images found in {image_dir}")
     
+    # Pre-sized frames only need the fps filter; raw sources are scaled in the encode loop
+    if normalize:
+        images = normalize_images(images, normalized_dir(image_dir, VIDEO_RESOLUTION, "pad"), VIDEO_RESOLUTION)
+        video_filter = "fps=30"
+    else:
+        video_filter = scale_filter(VIDEO_RESOLUTION, "pad") + ",fps=30"
+    # Captions are drawn in this encode, not in a second pass
+    if subtitles:
+        video_filter += "," + subtitle_filter(subtitles)
+    
     # Create a simple concat file for ffmpeg
     concat_file = output_path.parent / "concat.txt"
     with open(concat_file, "w") as f:
@@ -36,7 +51,7 @@ def assemble_video_fast(
         "-preset", "veryfast",  # Much faster encoding
         "-pix_fmt", "yuv420p",
         "-crf", "23",  # Slightly lower quality for speed
-        "-vf", "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2,fps=30",
+        "-vf", video_filter,
         "-c:a", "aac",
         "-b:a", "128k",
         "-shortest",
@@ -2,11 +2,13 @@
 """Ultra-fast video maker - uses only first 10 images for speed."""
 import subprocess
 from pathlib import Path
+from .image_normalizer import normalize_images, normalized_dir
+from .media_probe import media_duration
 
 def make_video_ultrafast():
     """Create video FAST - only use 10 images, repeat them."""
     image_dir = Path("output/images")
-    audio_path = Path("output/audio.wav")
+    audio_path = Path("output/audio.mp3")
     output_path = Path("output/final_video.mp4")
     
     images = sorted(image_dir.glob("*.jpg"))  # USE ALL IMAGES!
@@ -15,11 +17,14 @@ def make_video_ultrafast():
         print("❌ No images found!")
         return
     
+    # Pre-size to 720p once so the encode loop does no scaling
+    images = normalize_images(images, normalized_dir(image_dir, "1280x720", "pad"), "1280x720")
+    
     print(f"✓ Using {len(images)} images (ALL unique)")
     print(f"✓ Audio: {audio_path.stat().st_size / 1024 / 1024:.1f} MB")
     
     # Calculate duration per image to match audio
-    audio_duration = 1943.64  # ~32 minutes
+    audio_duration = media_duration(audio_path)
     duration_per_image = audio_duration / len(images)
     
     # Create concat file - use each image once
@@ -42,7 +47,7 @@ def make_video_ultrafast():
         "-tune", "stillimage",   # Optimized for still images
         "-pix_fmt", "yuv420p",
         "-crf", "28",  # Lower quality = faster
-        "-vf", "scale=1280:720,fps=15",  # Lower res, lower fps = MUCH faster
+        "-vf", "fps=15",  # Pre-sized 720p, lower fps = MUCH faster
         "-c:a", "aac",
         "-b:a", "96k",
         "-shortest",
@@ -3,8 +3,9 @@
 Provides high-quality, realistic voices for free.
 """
 import asyncio
-import edge_tts
 from pathlib import Path
+from .config import TTS_CONCURRENCY
+from .tts_engine import synthesize_to_file
 
 # Deep, authoritative male voices - choose the best one
 # Deep, authoritative female voice
@@ -13,49 +14,39 @@ VOICE = "en-US-AriaNeural"  # Professional female voice
 # "en-US-DavisNeural" - Calm, authoritative
 # "en-GB-RyanNeural" - British, deep
 # "en-US-EricNeural" - Deep, dramatic
+RATE = "-15%"  # Slow down by 15% for dramatic effect
+PITCH = "-5Hz"  # Slightly lower pitch for more authority
 
-async def generate_voice_async(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.wav")):
-    """Convert script to speech using Edge TTS and save as WAV.
+async def generate_voice_async(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.mp3"), concurrency: int = TTS_CONCURRENCY, use_cache: bool = True, voice: str = VOICE):
+    """Convert script to speech using Edge TTS and save it as a compact MP3.
+    The script is synthesized in sentence/paragraph chunks, ``concurrency``
+    at a time, and streamed in order into one FFmpeg process as they finish.
     Args:
         script_path: Path to the script text file.
         output_path: Destination for the generated audio.
+        concurrency: Maximum number of chunks synthesized at once.
+        use_cache: Reuse previously synthesized chunks from the TTS cache.
+        voice: Edge TTS voice name.
     """
     script = script_path.read_text(encoding="utf-8")
     
-    # Create output directory if it doesn't exist
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
     # Generate speech using Edge TTS
-    communicate = edge_tts.Communicate(
-        text=script,
-        voice=VOICE,
-        rate="-15%",  # Slow down by 15% for dramatic effect
-        pitch="-5Hz"  # Slightly lower pitch for more authority
+    results = await synthesize_to_file(
+        script,
+        output_path,
+        voice=voice,
+        rate=RATE,
+        pitch=PITCH,
+        concurrency=concurrency,
+        use_cache=use_cache,
     )
     
-    # Save directly as MP3 first
-    temp_mp3 = output_path.parent / "temp_audio.mp3"
-    await communicate.save(str(temp_mp3))
-    
-    # Convert MP3 to WAV using ffmpeg
-    import subprocess
-    cmd = [
-        "ffmpeg", "-y", "-i", str(temp_mp3),
-        "-ar", "44100",  # Sample rate
-        "-ac", "2",  # Stereo
-        str(output_path)
-    ]
-    
-    subprocess.run(cmd, check=True, capture_output=True)
-    
-    # Clean up temp file
-    temp_mp3.unlink()
-    
     print(f"✓ High-quality audio generated: {output_path}")
+    return results
 
-def generate_voice(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.wav")):
+def generate_voice(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.mp3"), concurrency: int = TTS_CONCURRENCY, use_cache: bool = True, voice: str = VOICE):
     """Synchronous wrapper for the async function."""
-    asyncio.run(generate_voice_async(script_path, output_path))
+    return asyncio.run(generate_voice_async(script_path, output_path, concurrency, use_cache, voice))
 
 if __name__ == "__main__":
     generate_voice()
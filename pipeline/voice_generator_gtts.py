@@ -1,47 +1,61 @@
 # pipeline/voice_generator_gtts.py
 """Generate audio narration using Google Text-to-Speech (gTTS).
-Converts the full script into a single WAV file.
+Converts the full script into a single audio file.
 """
-import os
+import io
 import subprocess
 from pathlib import Path
+import gtts
 from gtts import gTTS
+from .tts_cache import TTSCache
+from .tts_engine import encoder_command, split_script
+from .word_timings import timings_path
 
-def generate_voice(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.wav")):
-    """Convert script to speech using gTTS and save as WAV.
+BACKEND = f"gtts/{gtts.__version__}"
+
+def synthesize_chunk(text: str, cache: TTSCache = None) -> bytes:
+    """MP3 bytes for one chunk of the script, read from ``cache`` when possible."""
+    key = cache.key(text, "en", "slow", "", BACKEND, "mp3") if cache else None
+    audio = cache.get(key) if cache else None
+    if audio is None:
+        buf = io.BytesIO()
+        gTTS(text=text, lang='en', slow=True).write_to_fp(buf)
+        audio = buf.getvalue()
+        if cache:
+            cache.put(key, audio)
+    return audio
+
+def generate_voice(script_path: Path = Path("output/script.txt"), output_path: Path = Path("output/audio.mp3"), use_cache: bool = True):
+    """Convert script to speech using gTTS and save it (MP3 by default).
     Args:
         script_path: Path to the script text file.
         output_path: Destination for the generated audio.
+        use_cache: Reuse previously synthesized chunks from the TTS cache.
     """
     script = script_path.read_text(encoding="utf-8")
     
     # Create output directory if it doesn't exist
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Generate speech using gTTS with slow speed for dramatic effect
-    tts = gTTS(text=script, lang='en', slow=True)
-    
-    # Save as MP3 first (gTTS default)
-    temp_mp3 = output_path.parent / "temp_audio.mp3"
-    tts.save(str(temp_mp3))
+    # Generate speech using gTTS with slow speed for dramatic effect,
+    # one cached chunk at a time (gTTS joins its own requests the same way)
+    cache = TTSCache() if use_cache else None
+    mp3 = b"".join(synthesize_chunk(chunk, cache) for chunk in split_script(script))
     
-    # Convert MP3 to WAV using ffmpeg and slow down by 10%
+    # Pipe the MP3 through ffmpeg and slow down by 10%
     cmd = [
-        "ffmpeg", "-y", "-i", str(temp_mp3),
+        "ffmpeg", "-y", "-f", "mp3", "-i", "pipe:0",
         "-filter:a", "atempo=0.9",  # Slow down by 10%
-        "-ar", "44100",  # Sample rate
-        "-ac", "2",  # Stereo
         str(output_path)
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, input=mp3, capture_output=True)
     if result.returncode != 0:
-        # If slowing down fails, just convert without speed change
-        cmd = ["ffmpeg", "-y", "-i", str(temp_mp3), "-ar", "44100", "-ac", "2", str(output_path)]
-        subprocess.run(cmd, check=True)
+        # If slowing down fails, just write the audio without speed change
+        subprocess.run(encoder_command(output_path), input=mp3, check=True)
     
-    # Clean up temp file
-    temp_mp3.unlink()
+    # gTTS reports no word timings; drop any index left by an Edge TTS run
+    timings_path(output_path).unlink(missing_ok=True)
     
     print(f"Audio saved to {output_path}")
 
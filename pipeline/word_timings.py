@@ -0,0 +1,41 @@
+# pipeline/word_timings.py
+"""Compact word-timing index captured during TTS synthesis.
+Edge TTS reports a WordBoundary event (offset, duration, text) for every
+spoken word. The voice generators place those events on the narration
+timeline and save them next to the audio, so subtitles can be timed exactly
+without aligning or transcribing the audio afterwards.
+
+The index is JSON: ``{"version": 1, "words": [[start_ms, duration_ms, "word"], ...]}``.
+"""
+import json
+import os
+from pathlib import Path
+
+TICKS_PER_SECOND = 10_000_000  # edge_tts offsets and durations are in 100 ns ticks
+INDEX_VERSION = 1
+
+
+def timings_path(audio_path: Path) -> Path:
+    """Index location for a narration file (``audio.mp3`` -> ``audio.words.json``)."""
+    return audio_path.with_suffix(".words.json")
+
+
+def save_timings(words, path: Path):
+    """Write ``(start, duration, text)`` tuples (seconds) to ``path``."""
+    data = {
+        "version": INDEX_VERSION,
+        "words": [[round(start * 1000), round(duration * 1000), text] for start, duration, text in words],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_timings(path: Path):
+    """Read an index back as ``(start, duration, text)`` tuples in seconds."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != INDEX_VERSION:
+        raise RuntimeError(f"Unsupported word-timing index version in {path}")
+    return [(start / 1000, duration / 1000, text) for start, duration, text in data["words"]]
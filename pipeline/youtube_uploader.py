@@ -1,20 +1,30 @@
 # pipeline/youtube_uploader.py
-"""Upload the generated video to YouTube."""
+"""Upload the generated video to YouTube.
+Uploads are resumable across restarts (see ``resumable_upload``).
+"""
 import json
 import os
 from pathlib import Path
 import google.auth
-from google.auth.transport.requests import Request
+import google.auth.exceptions
+from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from .config import YOUTUBE_UPLOAD_URL
+from .resumable_upload import ResumableUpload
 
 # Scopes required for uploading
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 
-def get_authenticated_service(client_secret_file: Path):
-    """Authenticate and return the YouTube service."""
+class ReauthorizationRequired(RuntimeError):
+    """The saved token is missing or can no longer be refreshed."""
+
+def get_credentials(client_secret_file: Path, interactive: bool = True):
+    """Load, refresh or create the OAuth credentials (cached in ``token.json``).
+    With ``interactive=False`` (background workers, which have no browser)
+    a missing or unrefreshable token raises ``ReauthorizationRequired``
+    instead of starting the consent flow.
+    """
     creds = None
     token_file = Path("token.json")
     
@@ -25,8 +35,15 @@ def get_authenticated_service(client_secret_file: Path):
     # Refresh or create new token
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
+            try:
+                creds.refresh(Request())
+            except google.auth.exceptions.RefreshError as e:
+                if not interactive:
+                    raise ReauthorizationRequired(f"YouTube token could not be refreshed ({e}); re-authorize") from e
+                creds = None
+        if not interactive and (not creds or not creds.valid):
+            raise ReauthorizationRequired("No valid YouTube token; re-authorize with `python -m pipeline.upload_queue authorize`")
+        if not creds or not creds.valid:
             if not client_secret_file.exists():
                 raise FileNotFoundError(f"Client secret not found at {client_secret_file}")
                 
@@ -39,37 +56,22 @@ def get_authenticated_service(client_secret_file: Path):
         with open(token_file, "w") as token:
             token.write(creds.to_json())
             
-    return build("youtube", "v3", credentials=creds)
+    return creds
 
-def upload_video(
-    video_path: Path = Path("output/final_video.mp4"),
-    metadata_path: Path = Path("output/metadata.json"),
-    client_secret_path: Path = Path("client_secret.json")
-):
-    """Upload video to YouTube."""
-    if not video_path.exists():
-        print(f"Video not found at {video_path}")
-        return
-    if not metadata_path.exists():
-        print(f"Metadata not found at {metadata_path}")
-        return
+def authorized_session(client_secret_file: Path = Path("client_secret.json"), interactive: bool = True):
+    """A ``requests`` session that signs requests and refreshes the token when it expires."""
+    return AuthorizedSession(get_credentials(client_secret_file, interactive))
 
-    # Load metadata
+def video_body(metadata_path: Path = Path("output/metadata.json")) -> dict:
+    """The ``snippet``/``status`` resource for a video, from its metadata JSON."""
     with open(metadata_path, "r") as f:
         metadata = json.load(f)
         
     title = metadata.get("title", "Motivational Video")
     description = metadata.get("description", "Daily motivation.")
     tags = metadata.get("tags", ["motivation", "inspiration"])
-    
-    try:
-        youtube = get_authenticated_service(client_secret_path)
-    except Exception as e:
-        print(f"Authentication failed: {e}")
-        print("Please ensure 'client_secret.json' is present in the project root.")
-        return
 
-    body = {
+    return {
         "snippet": {
             "title": title,
             "description": description,
@@ -82,28 +84,41 @@ def upload_video(
         }
     }
 
-    media = MediaFileUpload(
-        str(video_path),
-        chunksize=1024*1024,
-        resumable=True,
-        mimetype="video/mp4"
-    )
+def upload_video(
+    video_path: Path = Path("output/final_video.mp4"),
+    metadata_path: Path = Path("output/metadata.json"),
+    client_secret_path: Path = Path("client_secret.json"),
+    session=None,
+    endpoint: str = YOUTUBE_UPLOAD_URL
+):
+    """Upload video to YouTube; returns the video id, or ``None`` if it was not uploaded.
+    An interrupted upload is resumed from the session saved beside the video.
+    ``session`` replaces the OAuth session (e.g. a plain one for a local stub).
+    """
+    if not video_path.exists():
+        print(f"Video not found at {video_path}")
+        return
+    if not metadata_path.exists():
+        print(f"Metadata not found at {metadata_path}")
+        return
+
+    body = video_body(metadata_path)
+    title = body["snippet"]["title"]
+    
+    if session is None:
+        try:
+            session = authorized_session(client_secret_path)
+        except Exception as e:
+            print(f"Authentication failed: {e}")
+            print("Please ensure 'client_secret.json' is present in the project root.")
+            return
 
     print(f"Uploading '{title}'...")
-    request = youtube.videos().insert(
-        part="snippet,status",
-        body=body,
-        media_body=media
-    )
-
-    response = None
-    while response is None:
-        status, response = request.next_chunk()
-        if status:
-            print(f"Uploaded {int(status.progress() * 100)}%")
+    response = ResumableUpload(video_path, body, session, endpoint).run()
 
     print(f"Upload complete! Video ID: {response.get('id')}")
     print(f"Video Link: https://youtu.be/{response.get('id')}")
+    return response.get("id")
 
 if __name__ == "__main__":
     try:
@@ -16,14 +16,9 @@ echo "=========================================="
 echo "Starting Custom YouTube Video Pipeline"
 echo "=========================================="
 
-echo "[1/3] Fetching Images..."
-python3 -m pipeline.image_fetcher
-
-echo "[2/3] Generating Voiceover (Rachel - Female)..."
-python3 -m pipeline.voice_generator
-
-echo "[3/3] Assembling Video (Fast, No Subtitles)..."
-python3 -m pipeline.video_assembler_fast
+# Images and voiceover run in parallel, then the fast (no subtitles) assembly
+# Every run starts fresh; --incremental skips unchanged stages via output/manifest_custom.json (--rebuild STAGE)
+python3 -m pipeline.dag_runner custom "$@"
 
 echo "=========================================="
 echo "Done! check output/final_video.mp4"
@@ -28,24 +28,19 @@ if ! command -v ffmpeg &> /dev/null; then
     exit 1
 fi
 
-echo "[1/5] Generating Script..."
-python3 -m pipeline.script_generator
-
-echo "[2/5] Fetching Images..."
-# The image_fetcher uses a default list if not provided, which matches the brief.
-python3 -m pipeline.image_fetcher
-
-echo "[3/5] Generating Voiceover..."
-python3 -m pipeline.voice_generator
-
-echo "[4/5] Assembling Video..."
-python3 -m pipeline.video_assembler
-
-echo "[5/5] Generating Metadata..."
-python3 -m pipeline.seo
+# The upload worker runs without a browser, so the YouTube sign-in must be saved beforehand
+if [ ! -f token.json ] && [[ " $* " != *" --no-upload "* ]]; then
+    echo "Error: no YouTube sign-in found (token.json)."
+    echo "Run 'python3 -m pipeline.upload_queue authorize' once, or pass --no-upload to skip the upload."
+    exit 1
+fi
 
-echo "[6/5] Uploading to YouTube..."
-python3 -m pipeline.youtube_uploader
+# Stages run as a dependency graph: script -> {voice, seo}, images -> assemble -> upload
+# Every run makes a new video. Pass --incremental to skip stages whose inputs are unchanged since
+# the last run (see output/manifest_long.json), e.g. to resume after a failure; --rebuild STAGE forces one.
+# The upload is handed to a background worker (see `python -m pipeline.upload_queue status`),
+# so the next video can start rendering at once.
+python3 -m pipeline.dag_runner long --queue-upload "$@"
 
 echo "=========================================="
 echo "Pipeline Finished Successfully!"
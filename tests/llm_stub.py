@@ -0,0 +1,150 @@
+# tests/llm_stub.py
+"""Local stand-in for the OpenAI chat and Batch APIs.
+Serves ``/v1/chat/completions``, ``/v1/files`` (upload and content) and
+``/v1/batches`` (create and retrieve). A batch reports ``in_progress`` for
+``polls_before_done`` retrievals before it completes, and its output lists
+results in reverse order, so callers must map them by ``custom_id``.
+A message containing ``FAIL`` gets an error result; ``TRUNCATE`` gets
+``finish_reason == "length"``.
+
+    python tests/llm_stub.py [PORT]   # then OPENAI_BASE_URL=http://127.0.0.1:PORT/v1
+"""
+import itertools
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def completion(body: dict) -> dict:
+    text = body["messages"][-1]["content"]
+    if "valid JSON" in text:
+        content = json.dumps({"title": f"Title {len(text)}", "description": "Description"})
+    else:
+        content = f"Script for: {text.strip().splitlines()[-1]}\n\nSecond paragraph."
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body["model"],
+        "choices": [{
+            "index": 0,
+            "finish_reason": "length" if "TRUNCATE" in text else "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+    }
+
+
+class LLMStub:
+    """The stub server and what it has seen.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one).
+        polls_before_done (int): Batch retrievals answered with ``in_progress``.
+    """
+
+    def __init__(self, port: int = 0, polls_before_done: int = 1):
+        self.polls_before_done = polls_before_done
+        self.files, self.batches, self.polls = {}, {}, {}
+        self.chat_requests = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, obj=None, raw=None, status=200):
+                data = raw if raw is not None else json.dumps(obj).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.endswith("/chat/completions"):
+                    with stub._lock:
+                        stub.chat_requests += 1
+                    return self.reply(completion(json.loads(body)))
+                if self.path.endswith("/files"):
+                    return self.reply(stub.upload_file(body))
+                if self.path.endswith("/batches"):
+                    return self.reply(stub.create_batch(json.loads(body)))
+                self.reply({"error": "not found"}, status=404)
+
+            def do_GET(self):
+                match = re.search(r"/batches/([^/]+)$", self.path)
+                if match:
+                    return self.reply(stub.retrieve_batch(match.group(1)))
+                match = re.search(r"/files/([^/]+)/content$", self.path)
+                if match:
+                    return self.reply(raw=stub.files[match.group(1)])
+                self.reply({"error": "not found"}, status=404)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids)}"
+
+    def upload_file(self, body: bytes) -> dict:
+        """Keep the JSONL part of a multipart ``files.create`` upload."""
+        match = re.search(rb'filename="[^"]*"\r\n(?:[^\r\n]*\r\n)*?\r\n(.*?)\r\n--', body, re.S)
+        file_id = self._new_id("file")
+        self.files[file_id] = match.group(1)
+        return {"id": file_id, "object": "file", "bytes": len(match.group(1)), "created_at": 0,
+                "filename": "requests.jsonl", "purpose": "batch", "status": "processed"}
+
+    def create_batch(self, request: dict) -> dict:
+        output, errors = [], []
+        for line in self.files[request["input_file_id"]].decode("utf-8").splitlines():
+            item = json.loads(line)
+            if "FAIL" in item["body"]["messages"][-1]["content"]:
+                errors.append({"id": "req", "custom_id": item["custom_id"], "response": None,
+                               "error": {"code": "invalid_request", "message": "rejected by stub"}})
+            else:
+                output.append({"id": "req", "custom_id": item["custom_id"], "error": None,
+                               "response": {"status_code": 200, "body": completion(item["body"])}})
+        batch_id = self._new_id("batch")
+        output_id, error_id = self._new_id("file"), self._new_id("file")
+        self.files[output_id] = "\n".join(json.dumps(r) for r in reversed(output)).encode("utf-8")
+        self.files[error_id] = "\n".join(json.dumps(r) for r in errors).encode("utf-8")
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+            "created_at": 0, "status": "in_progress", "output_file_id": None, "error_file_id": None,
+            "request_counts": {"total": len(output) + len(errors), "completed": 0, "failed": 0},
+            "_files": (output_id, error_id if errors else None, len(output), len(errors)),
+        }
+        self.polls[batch_id] = 0
+        return self._public(batch_id)
+
+    def retrieve_batch(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        self.polls[batch_id] += 1
+        if self.polls[batch_id] > self.polls_before_done:
+            output_id, error_id, completed, failed = batch["_files"]
+            batch.update(status="completed", output_file_id=output_id, error_file_id=error_id,
+                         request_counts={"total": completed + failed, "completed": completed, "failed": failed})
+        return self._public(batch_id)
+
+    def _public(self, batch_id: str) -> dict:
+        return {k: v for k, v in self.batches[batch_id].items() if not k.startswith("_")}
+
+
+if __name__ == "__main__":
+    stub = LLMStub(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"LLM stub at {stub.base_url}")
+    stub.server.serve_forever()
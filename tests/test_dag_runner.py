@@ -0,0 +1,26 @@
+# tests/test_dag_runner.py
+import os
+import pytest
+from pipeline.build_manifest import BuildManifest
+from pipeline.dag_runner import Stage, run_stages
+
+
+def test_stale_output_is_not_recorded_as_success(tmp_path):
+    video = tmp_path / "shorts_final.mp4"
+    video.write_text("previous run")
+    os.utime(video, (1, 1))
+    manifest = BuildManifest(tmp_path / "manifest.json")
+
+    def render_fails():
+        return None  # baseline helpers print an error and return None
+
+    with pytest.raises(RuntimeError):
+        run_stages([Stage("video", render_fails, outputs=[video])], manifest=manifest)
+    stages = run_stages([Stage("video", lambda: video.write_text("new"), outputs=[video])], manifest=manifest)
+    assert stages[0].status == "done"
+
+
+def test_empty_output_directory_fails(tmp_path):
+    images = tmp_path / "images"
+    with pytest.raises(RuntimeError):
+        run_stages([Stage("images", lambda: images.mkdir(), outputs=[images])])
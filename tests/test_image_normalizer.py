@@ -0,0 +1,32 @@
+# tests/test_image_normalizer.py
+import os
+import shutil
+import subprocess
+import pytest
+from pipeline.image_normalizer import normalize_images
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+
+def test_identical_sources_normalize_concurrently(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    first = src / "photo_00.jpg"
+    subprocess.run(["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=320x200", "-frames:v", "1",
+                    str(first)], check=True)
+    images = [first]
+    for i in range(1, 12):
+        copy = src / f"photo_{i:02d}.jpg"
+        if i % 2:
+            os.link(first, copy)  # the image store hard-links repeated photos
+        else:
+            shutil.copyfile(first, copy)
+        images.append(copy)
+
+    cache = tmp_path / "cache"
+    out = normalize_images(images, tmp_path / "out", size="160x90", workers=12, cache_dir=cache)
+
+    assert [p.name for p in out] == [p.name for p in images]
+    assert all(p.stat().st_size > 0 for p in out)
+    entries = [p.name for p in cache.iterdir()]
+    assert len(entries) == 1 and entries[0].endswith("_160x90_pad.jpg")  # no temp files left behind
@@ -0,0 +1,37 @@
+# tests/test_image_store.py
+import multiprocessing
+from pipeline.image_store import ImageStore
+
+ADDS = 200
+
+
+def add_images(root, writer):
+    store = ImageStore(root, max_bytes=10**9)
+    source = root / f"src{writer}"
+    source.mkdir(exist_ok=True)
+    for i in range(ADDS):
+        path = source / f"{i}.jpg"
+        path.write_bytes(f"{writer}-{i}".encode())
+        store.add(f"{writer}-{i}", "large", path)
+
+
+def test_concurrent_stores_keep_every_entry(tmp_path):
+    writers = [multiprocessing.Process(target=add_images, args=(tmp_path, w)) for w in range(2)]
+    for p in writers:
+        p.start()
+    for p in writers:
+        p.join()
+        assert p.exitcode == 0
+    store = ImageStore(tmp_path, max_bytes=10**9)
+    assert all(store.lookup(f"{w}-{i}", "large") for w in range(2) for i in range(ADDS))
+    assert len(list((tmp_path / "objects").glob("*/*.jpg"))) == 2 * ADDS
+
+
+def test_eviction_bounds_store_across_instances(tmp_path):
+    first, second = ImageStore(tmp_path, max_bytes=100), ImageStore(tmp_path, max_bytes=100)
+    for i in range(20):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(bytes([i]) * 30)
+        (first if i % 2 else second).add(i, "large", path)
+    assert first.total_bytes() <= 100
+    assert len(list((tmp_path / "objects").glob("*/*.jpg"))) == 3
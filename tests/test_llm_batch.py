@@ -0,0 +1,59 @@
+# tests/test_llm_batch.py
+import pytest
+from pipeline import llm_batch, llm_client
+from pipeline.llm_batch import LLMTask, submit
+from pipeline.llm_client import LLMCache
+from llm_stub import LLMStub
+
+pytest.importorskip("openai")  # the client library talks to the stub
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    server = LLMStub(polls_before_done=2).start()
+    monkeypatch.setattr(llm_client, "OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setattr(llm_client, "CHATGPT_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(llm_client, "_client", None)
+    monkeypatch.setattr(llm_batch, "BATCH_POLL_SECONDS", 0)
+    yield server
+    server.stop()
+
+
+def tasks(*prompts):
+    saved = {}
+
+    def save(name):
+        return lambda text: saved.setdefault(name, text)
+
+    return [
+        LLMTask(prompt, {"messages": [{"role": "user", "content": prompt}], "model": "gpt-4o-mini",
+                         "temperature": 0.7}, save(prompt))
+        for prompt in prompts
+    ], saved
+
+
+@pytest.mark.parametrize("via", ["batch", "concurrent"])
+def test_answers_are_mapped_back_to_their_tasks(stub, via):
+    batch, saved = tasks("topic one", "topic two", "topic three")
+    assert submit(batch, via=via) == {}
+    assert saved == {p: f"Script for: {p}\n\nSecond paragraph." for p in saved}
+    assert len(saved) == 3
+    if via == "batch":
+        assert list(stub.polls.values()) == [3]  # two in_progress polls, then completed
+
+
+def test_failed_and_truncated_results(stub):
+    batch, saved = tasks("topic one", "FAIL this one", "TRUNCATE this one")
+    failures = submit(batch, via="batch")
+    assert list(failures) == ["FAIL this one"]
+    assert set(saved) == {"topic one", "TRUNCATE this one"}
+    # Only the complete answer is cached; the truncated one is asked for again next time
+    assert len(LLMCache().entries()) == 1
+
+
+def test_unsaved_answer_is_not_cached(stub):
+    batch, _ = tasks("topic one")
+    batch[0].save = lambda text: None
+    assert list(submit(batch, via="batch")) == ["topic one"]
+    assert LLMCache().entries() == []
@@ -0,0 +1,66 @@
+# tests/test_llm_client.py
+import types
+import pytest
+from pipeline import llm_client
+from pipeline.llm_client import LLMCache, chat
+from pipeline.seo import parse_metadata
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class FakeClient:
+    """Answers with the queued (text, finish_reason) pairs and counts calls."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        text, finish_reason = self.answers.pop(0)
+        message = types.SimpleNamespace(content=text)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_client, "CACHE_DIR", str(tmp_path))
+
+
+def test_valid_response_is_replayed():
+    client = FakeClient(('{"title": "t"}', "stop"))
+    assert chat(MESSAGES, client=client, validate=parse_metadata) == '{"title": "t"}'
+    assert chat(MESSAGES, client=client, validate=parse_metadata) == '{"title": "t"}'
+    assert client.calls == 1
+
+
+def test_rejected_response_is_not_cached():
+    client = FakeClient(("not json", "stop"), ('{"title": "t"}', "stop"))
+    assert chat(MESSAGES, client=client, validate=parse_metadata) == "not json"
+    assert chat(MESSAGES, client=client, validate=parse_metadata) == '{"title": "t"}'
+    assert client.calls == 2
+
+
+def test_truncated_response_is_not_cached():
+    client = FakeClient(("cut o", "length"), ("complete", "stop"))
+    assert chat(MESSAGES, client=client) == "cut o"
+    assert chat(MESSAGES, client=client) == "complete"
+    assert len(LLMCache().entries()) == 1
+
+
+def test_rejected_cache_entry_counts_as_miss():
+    request = LLMCache.request(MESSAGES, llm_client.DEFAULT_MODEL, 0.7)
+    LLMCache().put(request, "stale, not json")
+    client = FakeClient(('{"title": "t"}', "stop"))
+    assert chat(MESSAGES, client=client, validate=parse_metadata) == '{"title": "t"}'
+    assert client.calls == 1
+
+
+def test_fresh_responses_bypasses_read_cache():
+    client = FakeClient(("first", "stop"), ("second", "stop"))
+    assert chat(MESSAGES, client=client) == "first"
+    with llm_client.fresh_responses():
+        assert chat(MESSAGES, client=client) == "second"
+    assert chat(MESSAGES, client=client) == "second"
+    assert client.calls == 2
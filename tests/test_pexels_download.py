@@ -0,0 +1,143 @@
+# tests/test_pexels_download.py
+import os
+import re
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from pipeline.pexels_downloader import DOWNLOAD_ATTEMPTS, RETRYABLE_ERRORS, PexelsDownloader
+
+PHOTO = b"\xff\xd8" + os.urandom(300_000) + b"\xff\xd9"
+
+
+class PhotoServer:
+    """Serves ``PHOTO``; ``script`` says how each successive GET misbehaves.
+
+    ``"drop"``: full headers, half the body, then the connection dies.
+    ``"ignore_range"``: answers 200 with the whole photo despite a Range header.
+    ``"short"``: a cut-off file, served with a matching Content-Length.
+    Anything else (or running out of script) honours Range normally.
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.ranges = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mode = server.script.pop(0) if server.script else "ok"
+                requested = self.headers.get("Range")
+                server.ranges.append(requested)
+                start = int(re.match(r"bytes=(\d+)-", requested).group(1)) if requested else 0
+                if mode == "short":
+                    return self.send(200, PHOTO[:len(PHOTO) // 2])
+                if mode == "ignore_range" or not start:
+                    body, status = PHOTO, 200
+                else:
+                    body, status = PHOTO[start:], 206
+                if mode == "drop":
+                    return self.send(status, body, start, cut=len(body) // 2)
+                self.send(status, body, start)
+
+            def send(self, status, body, start=0, cut=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{len(PHOTO) - 1}/{len(PHOTO)}")
+                self.end_headers()
+                self.wfile.write(body[:cut])
+                if cut is not None:
+                    self.wfile.flush()
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/photo.jpg"
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(*script):
+        servers.append(PhotoServer(*script))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_dropped_connection_resumes_with_range(serve, tmp_path):
+    server = serve("drop")
+    dest = PexelsDownloader(concurrency=1).download(server.url, tmp_path / "img_0001.jpg")
+    assert dest.read_bytes() == PHOTO
+    assert server.ranges[0] is None
+    resumed_at = int(re.match(r"bytes=(\d+)-$", server.ranges[1]).group(1))
+    assert 0 < resumed_at <= len(PHOTO) // 2  # whole chunks written before the drop are kept
+    assert not (tmp_path / "img_0001.jpg.part").exists()
+
+
+def test_server_ignoring_range_rewrites_from_start(serve, tmp_path):
+    server = serve("drop", "ignore_range")
+    dest = PexelsDownloader(concurrency=1).download(server.url, tmp_path / "img_0001.jpg")
+    assert server.ranges[1] is not None  # a resume was asked for, and answered with 200
+    assert dest.read_bytes() == PHOTO  # not the first half twice
+
+
+def test_truncated_body_is_rejected(serve, tmp_path):
+    server = serve("short")
+    dest = tmp_path / "img_0001.jpg"
+    with pytest.raises(RuntimeError, match="truncated"):
+        PexelsDownloader(concurrency=1).download(server.url, dest)
+    assert not dest.exists()
+    assert not (tmp_path / "img_0001.jpg.part").exists()
+
+
+def test_connection_dropping_every_time_gives_up(serve, tmp_path):
+    server = serve(*["drop"] * 10)
+    dest = tmp_path / "img_0001.jpg"
+    with pytest.raises(RETRYABLE_ERRORS):
+        PexelsDownloader(concurrency=1).download(server.url, dest)
+    assert not dest.exists()
+    assert len(server.ranges) == DOWNLOAD_ATTEMPTS
+
+
+class CountingDownloader(PexelsDownloader):
+    """Answers every search with ``per_page`` made-up photos and counts the searches."""
+
+    def __init__(self, **kwargs):
+        super().__init__(session=object(), **kwargs)
+        self.searched = []
+
+    def search(self, params):
+        self.searched.append(params["query"])
+        return [{"id": f"{params['query']}-{i}", "src": {"large": "url"}} for i in range(params["per_page"])]
+
+
+def test_plan_stops_searching_at_limit(tmp_path):
+    downloader = CountingDownloader(concurrency=4)
+    searches = [{"query": f"kw{i}", "per_page": 2} for i in range(50)]
+    jobs = downloader.plan(searches, tmp_path, "large", limit=5)
+    assert [job[3] for job in jobs] == ["kw0-0", "kw0-1", "kw1-0", "kw1-1", "kw2-0"]
+    assert [job[1].name for job in jobs] == [f"img_{i:04d}.jpg" for i in range(1, 6)]
+    assert sorted(downloader.searched) == ["kw0", "kw1", "kw2"]
+
+
+def test_plan_without_limit_keeps_keyword_order(tmp_path):
+    downloader = CountingDownloader(concurrency=4)
+    searches = [{"query": f"kw{i}", "per_page": 1} for i in range(20)]
+    jobs = downloader.plan(searches, tmp_path, "large")
+    assert [job[2] for job in jobs] == [f"kw{i}" for i in range(20)]
@@ -0,0 +1,33 @@
+# tests/test_rate_limiter.py
+import time
+from pipeline.rate_limiter import RateLimitedScheduler
+
+DAY = 86400
+
+
+class FakeResponse:
+    def __init__(self, remaining, reset, status_code=200):
+        self.status_code = status_code
+        self.headers = {"X-Ratelimit-Remaining": str(remaining), "X-Ratelimit-Reset": str(int(reset))}
+
+
+def test_comfortable_quota_keeps_max_rate():
+    # What Pexels sends mid-month: plenty left, reset at the monthly rollover
+    scheduler = RateLimitedScheduler(rate=5, low_water=200)
+    scheduler.observe(FakeResponse(19500, time.time() + 20 * DAY))
+    assert scheduler.rate == 5
+    assert scheduler.quota_remaining == 19500
+
+
+def test_low_quota_is_spread_until_reset():
+    scheduler = RateLimitedScheduler(rate=5, low_water=200, headroom=0.9)
+    scheduler.observe(FakeResponse(100, time.time() + 1000))
+    assert abs(scheduler.rate - 100 * 0.9 / 1000) < 1e-3
+
+
+def test_rate_recovers_after_reset():
+    scheduler = RateLimitedScheduler(rate=5, low_water=200)
+    scheduler.observe(FakeResponse(10, time.time() + 20 * DAY))
+    assert scheduler.rate == 0.01
+    scheduler.observe(FakeResponse(20000, time.time() + 30 * DAY))
+    assert scheduler.rate == 5
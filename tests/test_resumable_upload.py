@@ -0,0 +1,100 @@
+# tests/test_resumable_upload.py
+import os
+import pytest
+import requests
+from pipeline import resumable_upload
+from pipeline.resumable_upload import CHUNK_QUANTUM, ResumableUpload, state_path_for
+from upload_stub import UploadStub
+
+BODY = {"snippet": {"title": "t"}, "status": {"privacyStatus": "private"}}
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(resumable_upload, "BASE_DELAY", 0.0)
+    monkeypatch.setattr(resumable_upload, "INITIAL_CHUNK", 4 * CHUNK_QUANTUM)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "final_video.mp4"
+    path.write_bytes(os.urandom(30 * CHUNK_QUANTUM + 1234))
+    return path
+
+
+def received(stub):
+    (session,) = stub.sessions.values()
+    return bytes(session["data"])
+
+
+def test_interrupted_chunk_resumes_from_server_offset(video):
+    stub = UploadStub(interrupt={2}).start()
+    try:
+        upload = ResumableUpload(video, BODY, requests.Session(), stub.endpoint)
+        resource = upload.run()
+    finally:
+        stub.stop()
+    assert resource["id"] == "video-0"
+    assert upload.retries == 1
+    assert upload.sessions_started == 1
+    assert received(stub) == video.read_bytes()
+    assert not state_path_for(video).exists()
+
+
+class DropAfter(requests.Session):
+    """A session whose connection dies after ``puts`` chunk uploads, like a killed process."""
+
+    def __init__(self, puts: int):
+        super().__init__()
+        self.puts = puts
+
+    def put(self, *args, **kwargs):
+        if self.puts == 0:
+            raise KeyboardInterrupt
+        self.puts -= 1
+        return super().put(*args, **kwargs)
+
+
+def test_new_process_resumes_saved_session(video):
+    stub = UploadStub().start()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            ResumableUpload(video, BODY, DropAfter(1), stub.endpoint).run()
+        assert state_path_for(video).exists()
+        sent_before = len(received(stub))
+
+        upload = ResumableUpload(video, BODY, requests.Session(), stub.endpoint)
+        upload.run()
+    finally:
+        stub.stop()
+    assert sent_before == 4 * CHUNK_QUANTUM  # the first (INITIAL_CHUNK) chunk
+    assert upload.sessions_started == 0  # reused the saved session URI
+    assert received(stub) == video.read_bytes()
+
+
+def test_chunk_size_follows_measured_throughput(video, monkeypatch):
+    monkeypatch.setattr(resumable_upload, "UPLOAD_CHUNK_SECONDS", 0.1)
+    stub = UploadStub(bytes_per_second=32 * CHUNK_QUANTUM).start()  # 8 MiB/s
+    try:
+        ResumableUpload(video, BODY, requests.Session(), stub.endpoint).run()
+    finally:
+        stub.stop()
+    sizes = stub.chunk_sizes
+    assert sizes[0] == 4 * CHUNK_QUANTUM
+    assert all(size % CHUNK_QUANTUM == 0 for size in sizes[:-1])
+    # A tenth of a second at 8 MiB/s is about 3 quanta, down from the initial 4
+    assert all(CHUNK_QUANTUM <= size < 4 * CHUNK_QUANTUM for size in sizes[1:-1])
+    assert received(stub) == video.read_bytes()
+
+
+def test_adapt_scales_and_quantizes():
+    upload = ResumableUpload.__new__(ResumableUpload)
+    upload.rate = None
+    upload._adapt(10 * 1024 * 1024, 1.0)  # 10 MiB/s for UPLOAD_CHUNK_SECONDS
+    assert upload.chunk_size % CHUNK_QUANTUM == 0
+    assert upload.chunk_size == resumable_upload.quantize(10 * 1024 * 1024 * resumable_upload.UPLOAD_CHUNK_SECONDS)
+    upload._adapt(1, 10.0)  # a stalled chunk halves the smoothed rate
+    assert upload.rate < 6 * 1024 * 1024
+    for _ in range(30):
+        upload._adapt(1, 10.0)
+    assert upload.chunk_size == CHUNK_QUANTUM  # never below one quantum
@@ -0,0 +1,20 @@
+# tests/test_script_digest.py
+from pipeline.script_digest import estimate_tokens, digest
+
+
+def test_long_script_is_bounded():
+    script = " ".join(f"Sentence number {i} talks about discipline and habit {i % 7}." for i in range(2000))
+    summary = digest(script, max_tokens=120)
+    assert summary.startswith("Sentence number 0")
+    assert 0 < estimate_tokens(summary) <= 120
+
+
+def test_unsplittable_script_falls_back_to_truncated_text():
+    summary = digest("नमस्ते। " * 500, max_tokens=50)
+    assert summary.startswith("नमस्ते।")
+    assert 0 < estimate_tokens(summary) <= 50
+
+
+def test_single_unpunctuated_run_is_truncated():
+    summary = digest("x" * 10000, max_tokens=25)
+    assert summary == "x" * 100
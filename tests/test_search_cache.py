@@ -0,0 +1,18 @@
+# tests/test_search_cache.py
+from concurrent.futures import ThreadPoolExecutor
+from pipeline.search_cache import SearchCache
+
+PARAMS = {"query": "rain night city", "orientation": "landscape", "per_page": 15}
+
+
+def test_concurrent_puts_of_one_key(tmp_path):
+    cache = SearchCache(tmp_path, ttl_seconds=3600)
+
+    def put(i):
+        cache.put(PARAMS, [{"id": i}])
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(put, range(800)))  # raises if any writer lost its temp file
+
+    assert len(cache.get(PARAMS)) == 1
+    assert [p.suffix for p in tmp_path.iterdir()] == [".json"]
@@ -0,0 +1,32 @@
+# tests/test_tts_cache.py
+import multiprocessing
+from pipeline.tts_cache import TTSCache
+
+ADDS = 200
+
+
+def put_segments(root, writer):
+    cache = TTSCache(root, max_bytes=10**9)
+    for i in range(ADDS):
+        cache.put(f"{writer}-{i}", f"audio {writer}-{i}".encode())
+
+
+def test_concurrent_caches_keep_every_entry(tmp_path):
+    writers = [multiprocessing.Process(target=put_segments, args=(tmp_path, w)) for w in range(2)]
+    for p in writers:
+        p.start()
+    for p in writers:
+        p.join()
+        assert p.exitcode == 0
+    cache = TTSCache(tmp_path, max_bytes=10**9)
+    assert len(cache.entries()) == 2 * ADDS
+    assert cache.get("1-7") == b"audio 1-7"
+    assert cache.hits == 1
+
+
+def test_eviction_keeps_cache_under_budget(tmp_path):
+    cache = TTSCache(tmp_path, max_bytes=100)
+    for i in range(10):
+        cache.put(str(i), b"x" * 30)
+    assert cache.total_bytes() <= 100
+    assert cache.get("0") is None and cache.get("9") == b"x" * 30
@@ -0,0 +1,45 @@
+# tests/test_upload_queue.py
+import json
+import os
+import time
+from pipeline import upload_queue
+from pipeline.build_manifest import BuildManifest
+from pipeline.dag_runner import run_stages, upload_stage
+from pipeline.upload_queue import UploadQueue
+
+
+def make_video(tmp_path):
+    video, metadata = tmp_path / "final_video.mp4", tmp_path / "metadata.json"
+    video.write_bytes(b"video")
+    metadata.write_text(json.dumps({"title": "t"}))
+    return video, metadata
+
+
+def test_add_links_video_and_recover_drops_half_added(tmp_path):
+    queue = UploadQueue(tmp_path / "queue")
+    video, metadata = make_video(tmp_path)
+    item_id = queue.add(video, metadata)
+    assert os.stat(video).st_ino == os.stat(queue.item_dir(item_id) / "video.mp4").st_ino
+    with queue._connect() as db:
+        db.execute("INSERT INTO uploads (source, status, enqueued) VALUES ('x', 'adding', ?)", (time.time() - 7200,))
+    queue.recover()
+    assert [(row["id"], row["status"]) for row in queue.items()] == [(item_id, "pending")]
+
+
+def test_failed_queued_upload_is_queued_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_queue, "UPLOAD_QUEUE_DIR", str(tmp_path / "queue"))
+    monkeypatch.setattr(upload_queue, "ensure_worker", lambda queue=None: False)
+    video, metadata = make_video(tmp_path)
+    receipt = tmp_path / "upload.json"
+    manifest = BuildManifest(tmp_path / "manifest.json")
+
+    def stages():
+        return [upload_stage(video, metadata, receipt, deps=[], queued=True)]
+
+    run_stages(stages(), manifest=manifest)
+    first = json.loads(receipt.read_text())["queued"]
+    assert run_stages(stages(), manifest=manifest)[0].status == "cached"
+
+    UploadQueue().fail(first, "boom", final=True)
+    assert run_stages(stages(), manifest=manifest)[0].status == "done"
+    assert json.loads(receipt.read_text())["queued"] != first
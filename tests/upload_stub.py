@@ -0,0 +1,116 @@
+# tests/upload_stub.py
+"""Local stand-in for the YouTube resumable upload endpoint.
+``POST`` opens a session (``Location`` header). A chunk ``PUT`` answers
+``308`` with a ``Range`` header, or ``200`` with the video resource once
+every byte has arrived. A ``bytes */size`` query reports progress the same
+way. ``interrupt`` makes chosen chunk PUTs keep only part of their bytes
+and answer 503, the way an upload cut off mid-chunk looks. ``bytes_per_second``
+throttles the link.
+
+    python tests/upload_stub.py [PORT]   # then YOUTUBE_UPLOAD_URL=http://127.0.0.1:PORT/upload
+"""
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTUM = 256 * 1024
+
+
+class UploadStub:
+    """The stub server and what it has received.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one).
+        bytes_per_second (float): Simulated link speed (``None``: unthrottled).
+        interrupt (set[int]): Chunk PUT numbers (1-based) that are cut off halfway.
+    """
+
+    def __init__(self, port: int = 0, bytes_per_second: float = None, interrupt=()):
+        self.bytes_per_second = bytes_per_second
+        self.interrupt = set(interrupt)
+        self.sessions = {}
+        self.chunk_sizes = []
+        self.chunk_puts = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, headers=None, body=b""):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                session_id = str(next(stub._ids))
+                stub.sessions[session_id] = {"size": int(self.headers["X-Upload-Content-Length"]), "data": bytearray()}
+                self.reply(200, {"Location": f"{stub.base_url}/session/{session_id}"})
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                session = stub.sessions.get(self.path.rsplit("/", 1)[-1])
+                if session is None:
+                    return self.reply(404)
+                if body:
+                    status = stub.receive(session, self.headers["Content-Range"], body)
+                    if status is not None:
+                        return self.reply(status)
+                if len(session["data"]) == session["size"]:
+                    resource = {"id": f"video-{self.path.rsplit('/', 1)[-1]}", "kind": "youtube#video"}
+                    return self.reply(200, {"Content-Type": "application/json"}, json.dumps(resource).encode())
+                headers = {"Range": f"bytes=0-{len(session['data']) - 1}"} if session["data"] else {}
+                self.reply(308, headers)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/upload"
+
+    def receive(self, session: dict, content_range: str, body: bytes):
+        """Take a chunk; returns an error status to answer with, or ``None``."""
+        start = int(re.match(r"bytes (\d+)-", content_range).group(1))
+        if start != len(session["data"]) or (start % QUANTUM and start + len(body) != session["size"]):
+            return 400
+        with self._lock:
+            self.chunk_puts += 1
+            cut_off = self.chunk_puts in self.interrupt
+        if self.bytes_per_second:
+            time.sleep(len(body) / self.bytes_per_second)
+        if cut_off:
+            session["data"] += body[:len(body) // 2 // QUANTUM * QUANTUM]
+            return 503
+        session["data"] += body
+        self.chunk_sizes.append(len(body))
+        return None
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    stub = UploadStub(int(sys.argv[1]) if len(sys.argv) > 1 else 8766)
+    print(f"Upload stub at {stub.endpoint}")
+    stub.server.serve_forever()